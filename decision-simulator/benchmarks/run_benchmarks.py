@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Benchmarks for the agent runtime and simulator hot paths.
+
+Runs entirely offline against the fake provider backend with injected latency,
+so results are reproducible and cost nothing.
+
+Usage (from the decision-simulator directory):
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --latency lognormal:0.2,0.5 --only simulate
+    python benchmarks/run_benchmarks.py --compare before.json --output after.json
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.decision_simulator.agent import AgentRuntime, LLMConfig, Interaction
+from src.decision_simulator.personas import extract_persona
+from src.decision_simulator.simulator import DecisionSimulator
+
+SIMULATION_REPLY = """DECISION: Accept the offer
+OUTCOME: Higher salary with a longer commute
+REASONING: The financial upside outweighs the time cost"""
+
+PERSONA_JSON = json.dumps({
+    "name": "Ada",
+    "background": "Retired systems engineer who now teaches night classes.",
+    "personality_traits": ["methodical", "dry humor", "impatient with vagueness"],
+    "goals": ["mentor new engineers", "finish her memoir"],
+    "communication_style": "Short sentences, concrete examples",
+    "expertise": "Distributed systems",
+    "values": {"honesty": "Says what she thinks", "craft": "Does things properly"},
+    "quirks": "Names her houseplants after programming languages",
+})
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Parse a latency distribution spec.
+
+    Formats:
+        const:SECONDS
+        uniform:LOW,HIGH
+        lognormal:MEDIAN,SIGMA
+    """
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",")] if args else []
+    if kind == "const" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        return lambda rng: rng.lognormvariate(math.log(values[0]), values[1])
+    raise ValueError(f"Invalid latency spec: {spec}")
+
+
+def make_runtime(latency: Callable[[random.Random], float], seed: int, responder=None,
+                 max_concurrency: int = 64) -> AgentRuntime:
+    """Create a runtime backed by the fake provider."""
+    options = {"latency": latency, "seed": seed}
+    if responder is not None:
+        options["responder"] = responder
+    config = LLMConfig(provider="fake", model="fake-model", options=options, max_in_flight=max_concurrency)
+    return AgentRuntime.create(config)
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def summarize(name: str, latencies: List[float], wall: float, operations: int, **extra) -> Dict:
+    """Build one benchmark result record."""
+    result = {
+        "name": name,
+        "operations": operations,
+        "wall_seconds": round(wall, 6),
+        "throughput_per_second": round(operations / wall, 3) if wall > 0 else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 2),
+    }
+    result.update(extra)
+    return result
+
+
+def timed(call: Callable[[], object]) -> float:
+    """Run call once and return its duration in seconds."""
+    started = time.perf_counter()
+    call()
+    return time.perf_counter() - started
+
+
+def bench_submit_overhead(args) -> List[Dict]:
+    """Runtime overhead per submit with a zero-latency backend."""
+    runtime = make_runtime(lambda rng: 0.0, args.seed)
+    agent = runtime.create_agent("Bench", "You are a benchmark agent.")
+    calls = args.submit_calls
+    started = time.perf_counter()
+    latencies = [timed(lambda: agent.send("ping", add_to_history=False)) for _ in range(calls)]
+    return [summarize("submit_overhead", latencies, time.perf_counter() - started, calls)]
+
+
+def bench_history_growth(args) -> List[Dict]:
+    """Per-turn latency as a single agent's history grows."""
+    runtime = make_runtime(lambda rng: 0.0, args.seed)
+    agent = runtime.create_agent("Bench", "You are a benchmark agent.")
+    turns = args.history_turns
+    started = time.perf_counter()
+    latencies = [timed(lambda: agent.send(f"Turn {i}: tell me more.")) for i in range(turns)]
+    wall = time.perf_counter() - started
+    tail = latencies[-max(1, turns // 10):]
+    return [summarize(
+        "history_growth", latencies, wall, turns,
+        history_messages=len(agent.history),
+        last_decile_p50_ms=round(percentile(tail, 50) * 1000, 3),
+    )]
+
+
+class TimedSimulator(DecisionSimulator):
+    """DecisionSimulator that records how long each iteration takes, queueing included."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies: List[float] = []
+
+    def _run_iteration(self, *args, **kwargs):
+        started = time.perf_counter()
+        result = super()._run_iteration(*args, **kwargs)
+        # list.append is atomic, so worker threads can record without a lock
+        self.latencies.append(time.perf_counter() - started)
+        return result
+
+
+def bench_simulate(args) -> List[Dict]:
+    """DecisionSimulator.simulate in parallel mode at increasing iteration counts."""
+    results = []
+    for iterations in args.simulate_iterations:
+        runtime = make_runtime(args.latency, args.seed, responder=lambda m, p: SIMULATION_REPLY,
+                               max_concurrency=args.concurrency)
+        simulator = TimedSimulator(runtime=runtime)
+        started = time.perf_counter()
+        simulator.simulate("Should I take the job offer?", iterations=iterations, parallel=True, seed=args.seed)
+        results.append(summarize(
+            f"simulate_{iterations}", simulator.latencies, time.perf_counter() - started, iterations
+        ))
+    return results
+
+
+def bench_finalize(args) -> List[Dict]:
+    """Interaction.finalize over a conversation of fixed length."""
+    runtime = make_runtime(args.latency, args.seed)
+    agent = runtime.create_agent("Bench", "You are a benchmark agent.")
+    for i in range(args.finalize_turns):
+        agent.add_message("user", f"Question {i}: what do you think about option {i}?")
+        agent.add_message("assistant", f"Answer {i}: option {i} has trade-offs worth discussing at length.")
+    interaction = Interaction(agent, runtime, "Summarize the key decisions in this conversation.")
+    calls = args.finalize_calls
+    started = time.perf_counter()
+    latencies = [timed(interaction.finalize) for _ in range(calls)]
+    return [summarize("interaction_finalize", latencies, time.perf_counter() - started, calls,
+                      conversation_messages=len(interaction.get_conversation()))]
+
+
+def bench_persona_extraction(args) -> List[Dict]:
+    """Structurer round-trip plus validated parsing into a Persona."""
+    runtime = make_runtime(lambda rng: 0.0, args.seed, responder=lambda m, p: PERSONA_JSON)
+    structurer = runtime.create_agent("Data Structurer", "Return ONLY valid JSON.")
+    calls = args.extraction_calls
+
+    def extract():
+        return extract_persona(structurer, "Extract the persona.")
+
+    started = time.perf_counter()
+    latencies = [timed(extract) for _ in range(calls)]
+    return [summarize("persona_extraction", latencies, time.perf_counter() - started, calls)]
+
+
+BENCHMARKS = {
+    "submit": bench_submit_overhead,
+    "history": bench_history_growth,
+    "simulate": bench_simulate,
+    "finalize": bench_finalize,
+    "extraction": bench_persona_extraction,
+}
+
+
+def git_revision() -> Optional[str]:
+    """Current git commit, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous: Dict, current: Dict):
+    """Print throughput and p95 changes against an earlier report."""
+    before = {r["name"]: r for r in previous.get("results", [])}
+    print(f"\nComparison against {previous.get('revision') or 'previous run'}:")
+    for result in current["results"]:
+        old = before.get(result["name"])
+        if old is None:
+            continue
+        changes = []
+        for field in ("throughput_per_second", "p95_ms", "peak_rss_mb"):
+            if old.get(field) and result.get(field) is not None:
+                changes.append(f"{field} {100 * (result[field] - old[field]) / old[field]:+.1f}%")
+        print(f"  {result['name']:<24} " + ", ".join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="Benchmarks to run")
+    parser.add_argument("--latency", default="lognormal:0.05,0.5", help="Fake backend latency distribution")
+    parser.add_argument("--seed", type=int, default=1234, help="Seed for latency sampling")
+    parser.add_argument("--concurrency", type=int, default=64, help="Max in-flight requests for simulate")
+    parser.add_argument("--submit-calls", type=int, default=2000)
+    parser.add_argument("--history-turns", type=int, default=500)
+    parser.add_argument("--simulate-iterations", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--finalize-turns", type=int, default=200)
+    parser.add_argument("--finalize-calls", type=int, default=20)
+    parser.add_argument("--extraction-calls", type=int, default=2000)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    parser.add_argument("--compare", help="Earlier JSON report to compare against")
+    args = parser.parse_args()
+    args.latency_spec = args.latency
+    args.latency = parse_latency(args.latency)
+
+    results = []
+    for name in args.only or BENCHMARKS:
+        for result in BENCHMARKS[name](args):
+            results.append(result)
+            print(f"{result['name']:<24} {result['throughput_per_second'] or 0:>10.1f}/s  "
+                  f"p50 {result['p50_ms']:>9.3f}ms  p95 {result['p95_ms']:>9.3f}ms  "
+                  f"p99 {result['p99_ms']:>9.3f}ms  rss {result['peak_rss_mb']:>7.1f}MiB")
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "latency": args.latency_spec,
+        "seed": args.seed,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,32 +2,62 @@
 """Main entry point for the decision simulator."""
 
 import os
-from typing import Dict
-from src.decision_simulator.personas import Persona
+import sys
+from typing import Optional
+from src.decision_simulator.personas import PersonaStore
+from src.decision_simulator.scenarios import ScenarioStore
+from src.decision_simulator.simulation import ResultStore
 from src.decision_simulator.cli import run_main_loop
+from src.decision_simulator.cli.headless import main as run_headless
 from src.decision_simulator.utils.error_handler import install_error_handler
-from src.decision_simulator.agent import AgentRuntime, LLMConfig
+from src.decision_simulator.agent import AgentRuntime, LLMConfig, ResponseCache, JsonlSink
 
-# Global storage for personas (in-memory for now)
-personas: Dict[str, Persona] = {}
+# SQLite database for persistent state (personas, response cache, ...)
+DB_PATH = os.getenv("DECISION_SIMULATOR_DB", os.path.join("data", "experiments.db"))
+
+
+def create_runtime(max_concurrency: Optional[int] = None, db_path: str = DB_PATH) -> AgentRuntime:
+    """Create the agent runtime configured from the environment."""
+    config = LLMConfig(
+        provider=os.getenv("DECISION_SIMULATOR_PROVIDER", "openai"),
+        model=os.getenv("DECISION_SIMULATOR_MODEL", "gpt-4"),
+        base_url=os.getenv("DECISION_SIMULATOR_BASE_URL"),
+        temperature=0.7
+    )
+    runtime = AgentRuntime.create(config, max_concurrency=max_concurrency, cache=ResponseCache(path=db_path))
+    
+    # Optionally log one JSON line per LLM call for latency and token analysis
+    metrics_path = os.getenv("DECISION_SIMULATOR_METRICS")
+    if metrics_path:
+        runtime.add_observer(JsonlSink(metrics_path))
+    return runtime
 
 
 def main():
-    """Main function with CLI loop."""
+    """Main function: the headless command line when given arguments, otherwise the CLI loop."""
+    if len(sys.argv) > 1:
+        # e.g. `decision-simulator simulate --spec job.json > results.jsonl`
+        run_headless(create_runtime, DB_PATH)
+        return
+    
     # Install the error handler first thing
     install_error_handler()
     
     # Create the agent runtime
-    config = LLMConfig(
-        provider="openai",
-        model="gpt-4",
-        api_key=os.getenv("OPENAI_API_KEY"),
-        temperature=0.7
-    )
-    runtime = AgentRuntime.create(config)
+    runtime = create_runtime()
+    
+    # Personas and scenarios persist between sessions
+    personas = PersonaStore(DB_PATH)
+    scenarios = ScenarioStore(DB_PATH)
+    results = ResultStore(DB_PATH)
     
     # Now run normally with runtime
-    run_main_loop(personas, runtime)
+    try:
+        run_main_loop(personas, runtime, scenarios, results)
+    finally:
+        personas.close()
+        scenarios.close()
+        results.close()
 
 
 if __name__ == "__main__":
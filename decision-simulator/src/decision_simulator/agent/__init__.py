@@ -1,14 +1,45 @@
 """Agent module for decision simulator."""
 
 from .agent import Agent
-from .provider import LLMConfig, LLMProvider
+from .provider import LLMConfig, LLMProvider, RequestScheduler, RetryPolicy
 from .runtime import AgentRuntime
 from .interaction import Interaction
+from .cache import ResponseCache
+from .backends import Backend, FakeBackend, register_backend, available_backends
+from .batch import BatchSession, PendingResponse
+from .metrics import CallEvent, MetricsCollector, JsonlSink, capture_calls
+from .context import HistoryPolicy, SlidingWindowPolicy, SummarizingPolicy, TokenCounter
+from .journal import SessionJournal, SessionState, session_exists
+from .transcript import TranscriptView
+from .history import History, Message
 
 __all__ = [
     "Agent",
     "LLMConfig",
     "LLMProvider",
+    "RequestScheduler",
+    "RetryPolicy",
     "AgentRuntime",
-    "Interaction"
+    "Interaction",
+    "ResponseCache",
+    "Backend",
+    "FakeBackend",
+    "register_backend",
+    "available_backends",
+    "BatchSession",
+    "PendingResponse",
+    "CallEvent",
+    "MetricsCollector",
+    "JsonlSink",
+    "capture_calls",
+    "HistoryPolicy",
+    "SlidingWindowPolicy",
+    "SummarizingPolicy",
+    "TokenCounter",
+    "SessionJournal",
+    "SessionState",
+    "session_exists",
+    "TranscriptView",
+    "History",
+    "Message"
 ]
\ No newline at end of file
@@ -1,12 +1,16 @@
 """Agent class for managing conversation state."""
 
-from typing import List, Dict, Optional
+import os
+from typing import AsyncIterator, Iterator, List, Dict, Optional
+
+from .history import History, Message, intern_text, to_openai
+from .journal import SessionJournal
 
 
 class Agent:
     """Agent class that manages conversation state."""
     
-    def __init__(self, name: str, instruction: str, runtime):
+    def __init__(self, name: str, instruction: str, runtime, history_policy=None):
         # Validate inputs
         if name is None:
             raise ValueError("Agent name cannot be None")
@@ -21,13 +25,96 @@ class Agent:
             raise ValueError("Agent instruction must be a non-empty string")
         
         self.name = name
-        self.instruction = instruction
+        # Interned, so the many agents compiled from one persona share a single prompt string
+        self.instruction = intern_text(instruction)
         self.runtime = runtime
-        self.history: List[Dict[str, str]] = []
+        # Compact message records, serialized to OpenAI format only when a request is built
+        self.history = History()
+        # Messages always sent right after the system prompt, never trimmed
+        self.pinned: List[Message] = []
+        # Optional HistoryPolicy deciding which history is sent; None sends everything
+        self.history_policy = history_policy
+        # Session journal recording every change to history, if a session was started
+        self.journal: Optional[SessionJournal] = None
     
-    def send(self, message: str, add_to_history: bool = True) -> str:
+    @classmethod
+    def resume(cls, session_id: str, runtime, directory: Optional[str] = None, history_policy=None) -> "Agent":
+        """Rebuild an agent from its session journal, without calling the LLM.
+        
+        The resumed agent keeps appending to the same journal.
+        
+        Args:
+            session_id: The session to resume
+            runtime: Runtime the agent sends through
+            directory: Directory of session journals (defaults to journal.DEFAULT_SESSION_DIR)
+            history_policy: History policy for the resumed agent
+        """
+        state = SessionJournal.load(session_id, directory)
+        agent = cls(state.name, state.instruction, runtime, history_policy=history_policy)
+        agent.pinned = [Message.of(message) for message in state.pinned]
+        agent.history = History(state.history)
+        agent.journal = SessionJournal(session_id, directory)
+        return agent
+    
+    def fork(self, name: Optional[str] = None) -> "Agent":
+        """Create an agent that continues from this agent's instruction, pinned messages and history.
+        
+        The history so far is shared with the new agent rather than copied (see
+        History.fork), and each agent records its own turns after it. The new
+        agent is not journaled.
+        
+        Args:
+            name: Name of the new agent (defaults to this agent's name)
+        """
+        agent = Agent(name or self.name, self.instruction, self.runtime, history_policy=self.history_policy)
+        agent.pinned = list(self.pinned)
+        agent.history = self.history.fork()
+        return agent
+    
+    def start_session(self, session_id: Optional[str] = None, directory: Optional[str] = None) -> str:
+        """Start journaling this agent's state so it can be resumed after a crash.
+        
+        Args:
+            session_id: Session identifier (a random one is generated if omitted);
+                an existing journal for it is continued from this agent's state
+            directory: Directory of session journals (defaults to journal.DEFAULT_SESSION_DIR)
+        
+        Returns:
+            The session id, for Agent.resume
+        """
+        self.end_session()
+        session_id = session_id or SessionJournal.new_session_id()
+        self.journal = SessionJournal(session_id, directory)
+        self.journal.snapshot(self)
+        return session_id
+    
+    def end_session(self, delete: bool = False):
+        """Stop journaling, optionally deleting the journal (e.g. once its work is saved)."""
+        if self.journal is None:
+            return
+        self.journal.close()
+        if delete:
+            os.remove(self.journal.path)
+        self.journal = None
+    
+    def send(self, message: str, add_to_history: bool = True, **overrides) -> str:
         """Send a message through the runtime."""
-        return self.runtime.submit(self, message, add_to_history)
+        return self.runtime.submit(self, message, add_to_history, **overrides)
+    
+    async def send_async(self, message: str, add_to_history: bool = True, **overrides) -> str:
+        """Send a message through the runtime without blocking the event loop."""
+        return await self.runtime.submit_async(self, message, add_to_history, **overrides)
+    
+    def send_stream(self, message: str, add_to_history: bool = True, **overrides) -> Iterator[str]:
+        """Send a message and yield the response as it streams in.
+        
+        History is updated only after the full response has been received.
+        """
+        return self.runtime.submit_stream(self, message, add_to_history, **overrides)
+    
+    def send_stream_async(self, message: str, add_to_history: bool = True, **overrides) -> AsyncIterator[str]:
+        """Async counterpart of send_stream."""
+        return self.runtime.submit_stream_async(self, message, add_to_history, **overrides)
     
     def interact(self, initial_question: Optional[str] = None, accumulator_instruction: Optional[str] = None):
         """Start an interactive chat session through the runtime.
@@ -35,7 +122,7 @@ class Agent:
         Args:
             initial_question: Optional question to start the conversation
             accumulator_instruction: Optional instruction for accumulating/processing the conversation
-            
+        
         Returns:
             An Interaction object containing the conversation
         """
@@ -43,20 +130,33 @@ class Agent:
     
     def add_message(self, role: str, content: str):
         """Add a message to history."""
-        self.history.append({"role": role, "content": content})
+        self.history.append(Message(role, content))
+        if self.journal is not None:
+            self.journal.message(role, content)
+    
+    def pin_message(self, role: str, content: str):
+        """Pin a message so it is sent with every request regardless of history policy."""
+        self.pinned.append(Message(role, content))
+        if self.journal is not None:
+            self.journal.message(role, content, pinned=True)
     
     def get_messages(self, include_system: bool = True) -> List[Dict[str, str]]:
-        """Get all messages with optional system prompt."""
+        """Get all messages with optional system prompt, in OpenAI chat format."""
         messages = []
         if include_system:
             messages.append({"role": "system", "content": self.instruction})
-        messages.extend(self.history)
+        messages.extend(to_openai(self.pinned))
+        messages.extend(to_openai(self.history))
         return messages
     
     def clear_history(self):
         """Clear conversation history."""
         self.history.clear()
+        if self.journal is not None:
+            self.journal.clear()
     
     def set_instruction(self, instruction: str):
         """Update the system instruction."""
-        self.instruction = instruction
\ No newline at end of file
+        self.instruction = intern_text(instruction)
+        if self.journal is not None:
+            self.journal.instruction(instruction)
\ No newline at end of file
@@ -0,0 +1,630 @@
+"""Provider backends and the registry that selects them by LLMConfig.provider."""
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+# HTTP statuses worth retrying: timeouts, lock conflicts, rate limits and server errors
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Anthropic requires max_tokens on every request
+ANTHROPIC_DEFAULT_MAX_TOKENS = 1024
+
+# Request parameter holding how many leading messages form the stable prompt
+# prefix (system prompt plus pinned messages); backends consume it and never
+# send it to the API
+CACHE_PREFIX_PARAM = "cache_prefix"
+
+
+# Structured output accepted by OpenAI models, matched by longest prefix:
+# "json_schema" (schema-constrained output) or "json_object" (JSON mode).
+# Models not listed, such as gpt-4, accept neither.
+OPENAI_RESPONSE_FORMATS = {
+    "gpt-5": "json_schema",
+    "gpt-4.1": "json_schema",
+    "gpt-4o": "json_schema",
+    "o1": "json_schema",
+    "o3": "json_schema",
+    "o4": "json_schema",
+    "gpt-4-turbo": "json_object",
+    "gpt-4-1106": "json_object",
+    "gpt-4-0125": "json_object",
+    "gpt-3.5-turbo": "json_object",
+    "gpt-3.5-turbo-0613": None,
+    "gpt-3.5-turbo-16k": None,
+}
+
+
+def prefix_messages(messages: List[Dict[str, str]], params: Dict[str, Any]) -> List[Dict[str, str]]:
+    """The stable prefix of a request, as marked by the runtime."""
+    return messages[:params.get(CACHE_PREFIX_PARAM) or 0]
+
+
+def prefix_key(messages: List[Dict[str, str]]) -> str:
+    """Short stable hash of a prompt prefix."""
+    return hashlib.sha256(json.dumps(messages, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+
+@dataclass
+class Usage:
+    """Token usage reported for one completion."""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # Prompt tokens served from the provider's prompt cache (included in prompt_tokens)
+    cached_tokens: int = 0
+
+
+@dataclass
+class Completion:
+    """Completion text plus the usage the provider reported for it."""
+    text: str
+    usage: Usage
+
+
+class Backend:
+    """Uniform sync/async/stream interface over one LLM provider.
+    
+    params always contains model, temperature and max_tokens (possibly None)
+    plus any per-call overrides such as seed, and cache_prefix when the
+    runtime marked a stable prompt prefix worth caching on the provider side.
+    """
+    
+    # Exceptions that mean the request never reached the server
+    connection_errors: Tuple[type, ...] = (ConnectionError, TimeoutError)
+    
+    def __init__(self, config):
+        self.config = config
+    
+    def response_format(self, model: str) -> Optional[str]:
+        """The structured output a model accepts: "json_schema", "json_object" or None.
+        
+        LLMConfig.options["response_format"] overrides the backend's answer
+        for every model (None disables structured output).
+        """
+        if "response_format" in self.config.options:
+            return self.config.options["response_format"]
+        return self._model_response_format(model)
+    
+    def _model_response_format(self, model: str) -> Optional[str]:
+        return None
+    
+    def complete(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Completion:
+        """Return the full completion."""
+        raise NotImplementedError
+    
+    async def complete_async(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Completion:
+        """Return the full completion without blocking the event loop."""
+        raise NotImplementedError
+    
+    def open_stream(self, messages: List[Dict[str, str]], params: Dict[str, Any], usage: Usage) -> Iterator[str]:
+        """Send a streaming request and return an iterator over text deltas.
+        
+        The request itself is made before returning, so failures to connect
+        surface here (where they can be retried) rather than mid-stream.
+        usage is filled in as the provider reports it.
+        """
+        raise NotImplementedError
+    
+    async def open_stream_async(self, messages: List[Dict[str, str]], params: Dict[str, Any],
+                                usage: Usage) -> AsyncIterator[str]:
+        """Async counterpart of open_stream."""
+        raise NotImplementedError
+    
+    def run_batch(self, requests: List[Tuple[str, List[Dict[str, str]], Dict[str, Any]]],
+                  poll_interval: float, completion_window: str,
+                  timeout: Optional[float]) -> Dict[str, Tuple[Optional[Completion], Optional[str]]]:
+        """Run (custom_id, messages, params) requests as one batch job.
+        
+        Returns:
+            Mapping of custom_id to (completion, error); exactly one of the two is set
+        """
+        raise ValueError(f"Batch jobs are not supported for provider: {self.config.provider}")
+    
+    def is_retryable(self, error: Exception) -> bool:
+        """Whether an error is transient and worth retrying."""
+        status = getattr(error, "status_code", None)
+        if status is not None:
+            return status in RETRYABLE_STATUS_CODES
+        # Connection failures and timeouts carry no status
+        return isinstance(error, self.connection_errors)
+
+
+class OpenAIBackend(Backend):
+    """OpenAI chat completions API."""
+    
+    # Whether requests carry a prompt_cache_key derived from the stable prefix,
+    # so requests sharing a prefix are routed to the same prompt cache
+    supports_prompt_cache_key = True
+    
+    def __init__(self, config):
+        super().__init__(config)
+        from openai import APIConnectionError
+        self.connection_errors = (APIConnectionError, ConnectionError, TimeoutError)
+        self._client = None
+        self._async_client = None
+    
+    def _client_kwargs(self) -> Dict[str, Any]:
+        # Retries are handled by the scheduler, not the SDK
+        return {"api_key": self.config.api_key, "base_url": self.config.base_url, "max_retries": 0}
+    
+    @property
+    def client(self):
+        """Lazy initialize the sync client."""
+        if self._client is None:
+            from openai import OpenAI
+            self._client = OpenAI(**self._client_kwargs())
+        return self._client
+    
+    @property
+    def async_client(self):
+        """Lazy initialize the async client."""
+        if self._async_client is None:
+            from openai import AsyncOpenAI
+            self._async_client = AsyncOpenAI(**self._client_kwargs())
+        return self._async_client
+    
+    def _model_response_format(self, model: str) -> Optional[str]:
+        for prefix in sorted(OPENAI_RESPONSE_FORMATS, key=len, reverse=True):
+            if model.startswith(prefix):
+                return OPENAI_RESPONSE_FORMATS[prefix]
+        return None
+    
+    def _body(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Dict[str, Any]:
+        body = {
+            key: value for key, value in params.items()
+            if value is not None and key != CACHE_PREFIX_PARAM
+        }
+        # The API caches prompt prefixes automatically; the key only improves routing
+        prefix = prefix_messages(messages, params)
+        if self.supports_prompt_cache_key and prefix and "prompt_cache_key" not in body:
+            body["prompt_cache_key"] = prefix_key(prefix)
+        return {"messages": messages, **body}
+    
+    def _request(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        """SDK keyword arguments for a request body.
+        
+        prompt_cache_key only became a keyword argument in recent SDK releases,
+        so it is sent through extra_body, which every 1.x release accepts.
+        """
+        if "prompt_cache_key" not in body:
+            return body
+        body = dict(body)
+        body["extra_body"] = {**body.get("extra_body", {}), "prompt_cache_key": body.pop("prompt_cache_key")}
+        return body
+    
+    def _usage(self, usage, target: Optional[Usage] = None) -> Usage:
+        """Copy an API usage object into a Usage."""
+        target = target if target is not None else Usage()
+        if usage is not None:
+            target.prompt_tokens = usage.prompt_tokens or 0
+            target.completion_tokens = usage.completion_tokens or 0
+            details = getattr(usage, "prompt_tokens_details", None)
+            target.cached_tokens = getattr(details, "cached_tokens", None) or 0
+        return target
+    
+    def _completion(self, response) -> Completion:
+        return Completion(response.choices[0].message.content, self._usage(response.usage))
+    
+    def complete(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Completion:
+        return self._completion(self.client.chat.completions.create(**self._request(self._body(messages, params))))
+    
+    async def complete_async(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Completion:
+        return self._completion(await self.async_client.chat.completions.create(
+            **self._request(self._body(messages, params))
+        ))
+    
+    def _stream_body(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Dict[str, Any]:
+        # Ask for a final usage chunk
+        return {"stream": True, "stream_options": {"include_usage": True}, **self._body(messages, params)}
+    
+    def open_stream(self, messages: List[Dict[str, str]], params: Dict[str, Any], usage: Usage) -> Iterator[str]:
+        response = self.client.chat.completions.create(**self._request(self._stream_body(messages, params)))
+        return self._deltas(response, usage)
+    
+    def _deltas(self, response, usage: Usage) -> Iterator[str]:
+        for chunk in response:
+            if getattr(chunk, "usage", None) is not None:
+                self._usage(chunk.usage, usage)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+    
+    async def open_stream_async(self, messages: List[Dict[str, str]], params: Dict[str, Any],
+                                usage: Usage) -> AsyncIterator[str]:
+        response = await self.async_client.chat.completions.create(**self._request(self._stream_body(messages, params)))
+        return self._deltas_async(response, usage)
+    
+    async def _deltas_async(self, response, usage: Usage) -> AsyncIterator[str]:
+        async for chunk in response:
+            if getattr(chunk, "usage", None) is not None:
+                self._usage(chunk.usage, usage)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+    
+    def run_batch(self, requests: List[Tuple[str, List[Dict[str, str]], Dict[str, Any]]],
+                  poll_interval: float, completion_window: str,
+                  timeout: Optional[float]) -> Dict[str, Tuple[Optional[Completion], Optional[str]]]:
+        lines = []
+        for custom_id, messages, params in requests:
+            lines.append(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": self._body(messages, params)
+            }))
+        
+        batch_file = self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+            purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=completion_window
+        )
+        
+        started = time.monotonic()
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            if timeout is not None and time.monotonic() - started > timeout:
+                self.client.batches.cancel(batch.id)
+                raise TimeoutError(f"Batch {batch.id} did not finish within {timeout} seconds")
+            time.sleep(poll_interval)
+            batch = self.client.batches.retrieve(batch.id)
+        
+        results: Dict[str, Tuple[Optional[Completion], Optional[str]]] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            for line in self.client.files.content(file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                body = response.get("body") or {}
+                if record.get("error") or response.get("status_code", 200) >= 400:
+                    error = record.get("error") or body.get("error") or f"HTTP {response.get('status_code')}"
+                    results[record["custom_id"]] = (None, str(error))
+                else:
+                    usage = body.get("usage") or {}
+                    details = usage.get("prompt_tokens_details") or {}
+                    results[record["custom_id"]] = (Completion(
+                        body["choices"][0]["message"]["content"],
+                        Usage(usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0),
+                              details.get("cached_tokens") or 0)
+                    ), None)
+        
+        # Requests the job never reached (failed/expired/cancelled batches)
+        for custom_id, _, _ in requests:
+            if custom_id not in results:
+                results[custom_id] = (None, f"Batch {batch.id} ended with status {batch.status}")
+        return results
+
+
+class OpenAICompatibleBackend(OpenAIBackend):
+    """Any server speaking the OpenAI chat API (vLLM, llama.cpp, Ollama, LM Studio, ...)."""
+    
+    # Servers that cache prefixes (vLLM, llama.cpp) do so without a key, and
+    # others may reject the unknown parameter
+    supports_prompt_cache_key = False
+    
+    def __init__(self, config):
+        if not config.base_url:
+            raise ValueError(f"Provider '{config.provider}' requires base_url")
+        super().__init__(config)
+    
+    def _model_response_format(self, model: str) -> Optional[str]:
+        # Support varies by server; enable it with options["response_format"]
+        return None
+    
+    def _client_kwargs(self) -> Dict[str, Any]:
+        kwargs = super()._client_kwargs()
+        # Local servers usually ignore the key, but the SDK insists on one
+        kwargs["api_key"] = self.config.api_key or "not-needed"
+        return kwargs
+    
+    def _stream_body(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Dict[str, Any]:
+        # Not every compatible server accepts stream_options, so usage may go unreported
+        return {"stream": True, **self._body(messages, params)}
+
+
+class AnthropicBackend(Backend):
+    """Anthropic messages API (requires the optional anthropic package)."""
+    
+    def __init__(self, config):
+        super().__init__(config)
+        try:
+            import anthropic
+        except ImportError as e:
+            raise ValueError("Provider 'anthropic' requires the anthropic package") from e
+        self.connection_errors = (anthropic.APIConnectionError, ConnectionError, TimeoutError)
+        self._client = None
+        self._async_client = None
+    
+    @property
+    def client(self):
+        """Lazy initialize the sync client."""
+        if self._client is None:
+            import anthropic
+            self._client = anthropic.Anthropic(
+                api_key=self.config.api_key, base_url=self.config.base_url, max_retries=0
+            )
+        return self._client
+    
+    @property
+    def async_client(self):
+        """Lazy initialize the async client."""
+        if self._async_client is None:
+            import anthropic
+            self._async_client = anthropic.AsyncAnthropic(
+                api_key=self.config.api_key, base_url=self.config.base_url, max_retries=0
+            )
+        return self._async_client
+    
+    def _body(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Dict[str, Any]:
+        """Translate OpenAI-style messages and params to the messages API.
+        
+        The end of the stable prefix gets a cache_control breakpoint, so the
+        system prompt and pinned messages are cached between requests.
+        """
+        prefix = len(prefix_messages(messages, params))
+        system = []
+        conversation = []
+        for i, msg in enumerate(messages):
+            if msg["role"] == "system" and not conversation:
+                # Leading system messages move to the top-level system field
+                block = {"type": "text", "text": msg["content"]}
+                system.append(block)
+            else:
+                # Later ones (e.g. a history summary) stay in place as user turns,
+                # so they never change the cached system prompt
+                role = "user" if msg["role"] == "system" else msg["role"]
+                block = {"type": "text", "text": msg["content"]}
+                conversation.append({"role": role, "content": [block]})
+            if i == prefix - 1:
+                block["cache_control"] = {"type": "ephemeral"}
+        body = {
+            "model": params["model"],
+            "max_tokens": params.get("max_tokens") or ANTHROPIC_DEFAULT_MAX_TOKENS,
+            "messages": conversation,
+        }
+        if system:
+            body["system"] = system
+        if params.get("temperature") is not None:
+            body["temperature"] = params["temperature"]
+        # seed and other OpenAI-only parameters have no equivalent and are dropped
+        return body
+    
+    def _usage(self, usage, target: Optional[Usage] = None) -> Usage:
+        """Copy an API usage object into a Usage.
+        
+        input_tokens excludes cache reads and writes; prompt_tokens includes
+        them, matching the OpenAI convention.
+        """
+        target = target if target is not None else Usage()
+        cached = getattr(usage, "cache_read_input_tokens", None) or 0
+        written = getattr(usage, "cache_creation_input_tokens", None) or 0
+        target.prompt_tokens = usage.input_tokens + cached + written
+        target.cached_tokens = cached
+        return target
+    
+    def _completion(self, response) -> Completion:
+        text = "".join(block.text for block in response.content if block.type == "text")
+        usage = self._usage(response.usage)
+        usage.completion_tokens = response.usage.output_tokens
+        return Completion(text, usage)
+    
+    def complete(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Completion:
+        return self._completion(self.client.messages.create(**self._body(messages, params)))
+    
+    async def complete_async(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Completion:
+        return self._completion(await self.async_client.messages.create(**self._body(messages, params)))
+    
+    def open_stream(self, messages: List[Dict[str, str]], params: Dict[str, Any], usage: Usage) -> Iterator[str]:
+        events = self.client.messages.create(stream=True, **self._body(messages, params))
+        return self._deltas(events, usage)
+    
+    def _delta(self, event, usage: Usage) -> Optional[str]:
+        """Record usage from a stream event and return its text, if any."""
+        if event.type == "message_start":
+            self._usage(event.message.usage, usage)
+        elif event.type == "message_delta":
+            usage.completion_tokens = event.usage.output_tokens
+        elif event.type == "content_block_delta" and event.delta.type == "text_delta":
+            return event.delta.text
+        return None
+    
+    def _deltas(self, events, usage: Usage) -> Iterator[str]:
+        for event in events:
+            text = self._delta(event, usage)
+            if text:
+                yield text
+    
+    async def open_stream_async(self, messages: List[Dict[str, str]], params: Dict[str, Any],
+                                usage: Usage) -> AsyncIterator[str]:
+        events = await self.async_client.messages.create(stream=True, **self._body(messages, params))
+        return self._deltas_async(events, usage)
+    
+    async def _deltas_async(self, events, usage: Usage) -> AsyncIterator[str]:
+        async for event in events:
+            text = self._delta(event, usage)
+            if text:
+                yield text
+
+
+class FakeBackendError(Exception):
+    """Injected failure from the fake backend, shaped like an API status error."""
+    
+    def __init__(self, status_code: int):
+        super().__init__(f"Injected fake backend error (HTTP {status_code})")
+        self.status_code = status_code
+        self.response = None
+
+
+class FakeBackend(Backend):
+    """Deterministic in-process backend for tests and load testing.
+    
+    Responses depend only on the request, so runs are reproducible. Settings
+    are read from LLMConfig.options:
+        latency: Seconds before the response (or first delta); a number or a
+            callable taking a random.Random and returning seconds
+        token_latency: Seconds between streamed deltas
+        error_rate: Probability of raising a retryable 503
+        responder: Callable (messages, params) -> str replacing the default reply
+        seed: Seed for latency and error sampling
+    
+    A stable prefix (see CACHE_PREFIX_PARAM) seen before is reported as
+    cached tokens, as a provider prompt cache would.
+    """
+    
+    # Distinct prefixes remembered for simulated prompt caching
+    MAX_CACHED_PREFIXES = 4096
+    
+    def __init__(self, config):
+        super().__init__(config)
+        options = config.options
+        self.latency: Union[float, Callable[[random.Random], float]] = options.get("latency", 0.0)
+        self.token_latency: float = options.get("token_latency", 0.0)
+        self.error_rate: float = options.get("error_rate", 0.0)
+        self.responder: Optional[Callable[[List[Dict[str, str]], Dict[str, Any]], str]] = options.get("responder")
+        self._rng = random.Random(options.get("seed", 0))
+        self._lock = threading.Lock()
+        self._prefixes: Dict[str, None] = {}
+        self.calls = 0
+    
+    def _sample(self) -> float:
+        """Count a call, maybe inject a failure, and pick its latency."""
+        with self._lock:
+            self.calls += 1
+            if self.error_rate and self._rng.random() < self.error_rate:
+                raise FakeBackendError(503)
+            if callable(self.latency):
+                return max(self.latency(self._rng), 0.0)
+            return self.latency
+    
+    def _cached_chars(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> int:
+        """Characters of the request's stable prefix that a prompt cache would already hold."""
+        prefix = prefix_messages(messages, params)
+        if not prefix:
+            return 0
+        key = prefix_key(prefix)
+        with self._lock:
+            if key in self._prefixes:
+                return sum(len(msg["content"] or "") for msg in prefix)
+            if len(self._prefixes) >= self.MAX_CACHED_PREFIXES:
+                self._prefixes.pop(next(iter(self._prefixes)))
+            self._prefixes[key] = None
+        return 0
+    
+    def _reply(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Completion:
+        # The prefix marker is routing information, not part of the request
+        params = {key: value for key, value in params.items() if key != CACHE_PREFIX_PARAM}
+        if self.responder is not None:
+            text = self.responder(messages, params)
+        else:
+            digest = hashlib.sha256(
+                json.dumps([messages, params], sort_keys=True, default=str).encode("utf-8")
+            ).hexdigest()
+            last = messages[-1]["content"] if messages else ""
+            text = f"Fake response {digest[:12]} to: {last[:80]}"
+        # Same rough four-characters-per-token estimate as TokenCounter's fallback
+        prompt_chars = sum(len(msg["content"] or "") for msg in messages)
+        return Completion(text, Usage((prompt_chars + 3) // 4, (len(text) + 3) // 4))
+    
+    def _complete(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Completion:
+        cached_chars = self._cached_chars(messages, params)
+        completion = self._reply(messages, params)
+        completion.usage.cached_tokens = min(cached_chars // 4, completion.usage.prompt_tokens)
+        return completion
+    
+    def complete(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Completion:
+        time.sleep(self._sample())
+        return self._complete(messages, params)
+    
+    async def complete_async(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Completion:
+        await asyncio.sleep(self._sample())
+        return self._complete(messages, params)
+    
+    def _pieces(self, text: str) -> List[str]:
+        # Word-sized deltas, keeping the separating spaces
+        return [word + " " for word in text.split(" ")[:-1]] + [text.split(" ")[-1]]
+    
+    def open_stream(self, messages: List[Dict[str, str]], params: Dict[str, Any], usage: Usage) -> Iterator[str]:
+        time.sleep(self._sample())
+        completion = self._complete(messages, params)
+        usage.prompt_tokens, usage.completion_tokens = completion.usage.prompt_tokens, completion.usage.completion_tokens
+        usage.cached_tokens = completion.usage.cached_tokens
+        return self._deltas(completion.text)
+    
+    def _deltas(self, text: str) -> Iterator[str]:
+        for i, piece in enumerate(self._pieces(text)):
+            if i and self.token_latency:
+                time.sleep(self.token_latency)
+            yield piece
+    
+    async def open_stream_async(self, messages: List[Dict[str, str]], params: Dict[str, Any],
+                                usage: Usage) -> AsyncIterator[str]:
+        await asyncio.sleep(self._sample())
+        completion = self._complete(messages, params)
+        usage.prompt_tokens, usage.completion_tokens = completion.usage.prompt_tokens, completion.usage.completion_tokens
+        usage.cached_tokens = completion.usage.cached_tokens
+        return self._deltas_async(completion.text)
+    
+    async def _deltas_async(self, text: str) -> AsyncIterator[str]:
+        for i, piece in enumerate(self._pieces(text)):
+            if i and self.token_latency:
+                await asyncio.sleep(self.token_latency)
+            yield piece
+    
+    def run_batch(self, requests: List[Tuple[str, List[Dict[str, str]], Dict[str, Any]]],
+                  poll_interval: float, completion_window: str,
+                  timeout: Optional[float]) -> Dict[str, Tuple[Optional[Completion], Optional[str]]]:
+        # The whole job costs one latency sample, like a real batch endpoint
+        time.sleep(self._sample())
+        return {
+            custom_id: (self._complete(messages, params), None)
+            for custom_id, messages, params in requests
+        }
+
+
+_BACKENDS: Dict[str, Callable[[Any], Backend]] = {}
+
+
+def register_backend(name: str, factory: Callable[[Any], Backend]):
+    """Register a backend factory under a provider name.
+    
+    Args:
+        name: Value of LLMConfig.provider that selects this backend
+        factory: Callable taking an LLMConfig and returning a Backend
+    """
+    if not isinstance(name, str) or not name.strip():
+        raise ValueError("Backend name must be a non-empty string")
+    _BACKENDS[name] = factory
+
+
+def available_backends() -> List[str]:
+    """Names of all registered backends."""
+    return sorted(_BACKENDS)
+
+
+def create_backend(config) -> Backend:
+    """Create the backend selected by config.provider."""
+    factory = _BACKENDS.get(config.provider)
+    if factory is None:
+        raise ValueError(f"Unknown provider: {config.provider}")
+    return factory(config)
+
+
+register_backend("openai", OpenAIBackend)
+register_backend("local", OpenAICompatibleBackend)
+register_backend("anthropic", AnthropicBackend)
+register_backend("fake", FakeBackend)
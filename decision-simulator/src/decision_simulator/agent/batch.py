@@ -0,0 +1,163 @@
+"""Batch submission of agent messages for offline sweeps."""
+
+import time
+import uuid
+from typing import List, Dict, Optional
+
+from .metrics import CallEvent
+
+
+class PendingResponse:
+    """Handle for a batched submission, resolved when its batch completes."""
+    
+    def __init__(self, custom_id: str, agent, message: str, add_to_history: bool):
+        self.custom_id = custom_id
+        self.agent = agent
+        self.message = message
+        self.add_to_history = add_to_history
+        self.done = False
+        self.content: Optional[str] = None
+        self.error: Optional[str] = None
+    
+    def result(self) -> str:
+        """Get the response text.
+        
+        Raises:
+            RuntimeError: If the batch has not run yet or this request failed
+        """
+        if not self.done:
+            raise RuntimeError("Batch has not been run yet")
+        if self.error is not None:
+            raise RuntimeError(f"Failed to get response from LLM: {self.error}")
+        return self.content
+
+
+class BatchSession:
+    """Collects submissions from many agents and runs them as one batch job.
+    
+    Usage:
+        with runtime.batch() as batch:
+            pending = [batch.submit(agent, message) for agent, message in work]
+        responses = [p.result() for p in pending]
+    
+    Each agent's history is captured at submit time, so several submissions for
+    the same agent in one batch all see the same history. Successful exchanges
+    are recorded in history, in submission order, once the batch completes;
+    failed requests record nothing.
+    """
+    
+    def __init__(self, runtime, poll_interval: float = 30.0, completion_window: str = "24h",
+                 timeout: Optional[float] = None):
+        """Initialize the session.
+        
+        Args:
+            runtime: The AgentRuntime whose provider runs the batch
+            poll_interval: Seconds between job status checks
+            completion_window: Completion window requested from the batch API
+            timeout: Give up on the job after this many seconds
+        """
+        if runtime is None:
+            raise ValueError("Runtime cannot be None")
+        self.runtime = runtime
+        self.poll_interval = poll_interval
+        self.completion_window = completion_window
+        self.timeout = timeout
+        self._pending: List[PendingResponse] = []
+        self._requests: List[tuple] = []
+    
+    def submit(self, agent, message: str, add_to_history: bool = True, **overrides) -> PendingResponse:
+        """Queue a message from an agent for the next batch run."""
+        pending = PendingResponse(uuid.uuid4().hex, agent, message, add_to_history)
+        messages = self.runtime._build_messages(agent, message)
+        self._pending.append(pending)
+        self._requests.append((pending.custom_id, messages, self.runtime._request_overrides(agent, overrides)))
+        return pending
+    
+    def __len__(self) -> int:
+        return len(self._pending)
+    
+    def run(self) -> List[PendingResponse]:
+        """Run every queued submission and resolve their handles.
+        
+        Requests already in the provider's response cache are answered without
+        being sent; fresh results are added to the cache.
+        
+        Returns:
+            The resolved handles, in submission order
+        
+        Raises:
+            Exception: Whatever the batch job raised; every handle is still
+                resolved first, the ones that were sent with its error
+        """
+        pending, requests = self._pending, self._requests
+        self._pending, self._requests = [], []
+        provider = self.runtime.provider
+        
+        results: Dict[str, tuple] = {}
+        events: Dict[str, CallEvent] = {}
+        to_send = []
+        for handle, (custom_id, messages, overrides) in zip(pending, requests):
+            params = provider._request_params(overrides)
+            events[custom_id] = CallEvent(
+                agent=handle.agent.name, model=params["model"], provider=provider.config.provider, mode="batch"
+            )
+            key = provider._cache_key(messages, params)
+            cached = provider.cache.get(key) if key is not None else None
+            if cached is not None:
+                events[custom_id].cache_hit = True
+                results[custom_id] = (cached, None)
+            else:
+                to_send.append((custom_id, messages, overrides, key))
+        
+        failure: Optional[Exception] = None
+        if to_send:
+            started = time.monotonic()
+            try:
+                sent = provider.run_batch(
+                    [(custom_id, messages, overrides) for custom_id, messages, overrides, _ in to_send],
+                    poll_interval=self.poll_interval,
+                    completion_window=self.completion_window,
+                    timeout=self.timeout
+                )
+            except Exception as e:
+                # The job itself failed (upload, polling, timeout), so every request in it did
+                failure = e
+                sent = {custom_id: (None, str(e)) for custom_id, _, _, _ in to_send}
+            elapsed = time.monotonic() - started
+            for custom_id, _, _, key in to_send:
+                completion, error = sent[custom_id]
+                event = events[custom_id]
+                # Every request in the job waited for the whole job
+                event.latency = elapsed
+                if error is None:
+                    event.prompt_tokens = completion.usage.prompt_tokens
+                    event.completion_tokens = completion.usage.completion_tokens
+                    event.cached_tokens = completion.usage.cached_tokens
+                    if key is not None:
+                        provider.cache.set(key, completion.text)
+                    results[custom_id] = (completion.text, None)
+                else:
+                    results[custom_id] = (None, error)
+        
+        for handle in pending:
+            handle.content, handle.error = results[handle.custom_id]
+            handle.done = True
+            event = events[handle.custom_id]
+            event.error = handle.error
+            self.runtime._emit(event)
+            # Only record history after successful response
+            if handle.error is None and handle.add_to_history:
+                handle.agent.add_message("user", handle.message)
+                handle.agent.add_message("assistant", handle.content)
+        if failure is not None:
+            raise failure
+        return pending
+    
+    def __enter__(self) -> 'BatchSession':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        # Don't spend a batch job on submissions from a block that failed
+        if exc_type is None and self._pending:
+            self.run()
+        return False
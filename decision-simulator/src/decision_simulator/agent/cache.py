@@ -0,0 +1,189 @@
+"""Content-addressed response cache for LLM completions."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+class ResponseCache:
+    """Two-tier (in-memory LRU + optional SQLite) cache of LLM responses.
+
+    Entries are keyed on a hash of everything that determines a completion:
+    provider, model, sampling parameters and the full message list.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: Optional[float] = None,
+                 path: Optional[str] = None, max_disk_entries: Optional[int] = 100_000):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum entries kept in the in-memory tier
+            ttl: Seconds before an entry expires (None means never)
+            path: SQLite database path for the on-disk tier (None disables it)
+            max_disk_entries: Maximum entries kept on disk (None means unbounded)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive if provided")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_count = 0
+        if path is not None:
+            self._open(path)
+
+    def _open(self, path: str):
+        """Open (and create if needed) the on-disk tier."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Parallel simulations call the cache from worker threads; access is serialized by _lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS response_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_response_cache_accessed ON response_cache (accessed_at)"
+        )
+        self._db.commit()
+        self._disk_count = self._db.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+    @staticmethod
+    def make_key(provider: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+        """Build the content-addressed key for a request."""
+        payload = json.dumps(
+            {"provider": provider, "params": params, "messages": messages},
+            sort_keys=True,
+            separators=(",", ":"),
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl is not None and now - created_at > self.ttl
+
+    def get(self, key: str) -> Optional[str]:
+        """Look up a response, returning None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                response, created_at = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return response
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT response, created_at FROM response_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    response, created_at = row
+                    if not self._expired(created_at, now):
+                        self._db.execute(
+                            "UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                        )
+                        self._db.commit()
+                        self._remember(key, response, created_at)
+                        self.hits += 1
+                        self.disk_hits += 1
+                        return response
+                    self._db.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._disk_count -= 1
+
+            self.misses += 1
+            return None
+
+    def set(self, key: str, response: str):
+        """Store a response in both tiers."""
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            if self._db is not None:
+                inserted = self._db.execute(
+                    "INSERT OR IGNORE INTO response_cache (key, response, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, response, now, now)
+                ).rowcount
+                if not inserted:
+                    self._db.execute(
+                        "UPDATE response_cache SET response = ?, created_at = ?, accessed_at = ? WHERE key = ?",
+                        (response, now, now, key)
+                    )
+                self._disk_count += inserted
+                self._evict_disk()
+                self._db.commit()
+
+    def _remember(self, key: str, response: str, created_at: float):
+        """Insert into the memory tier, evicting least recently used entries."""
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        """Drop expired entries and the least recently used overflow from disk."""
+        if self.max_disk_entries is None or self._disk_count <= self.max_disk_entries:
+            return
+        if self.ttl is not None:
+            self._db.execute(
+                "DELETE FROM response_cache WHERE created_at < ?", (time.time() - self.ttl,)
+            )
+        overflow = self._db.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0] - self.max_disk_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM response_cache WHERE key IN "
+                "(SELECT key FROM response_cache ORDER BY accessed_at LIMIT ?)",
+                (overflow,)
+            )
+        self._disk_count = self._db.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+
+    def clear(self):
+        """Remove every entry from both tiers."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM response_cache")
+                self._db.commit()
+                self._disk_count = 0
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current tier sizes."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_hits": self.disk_hits,
+            "memory_entries": len(self._memory),
+            "disk_entries": self._disk_count,
+        }
+
+    def close(self):
+        """Close the on-disk tier."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,206 @@
+"""Context-window management for agent history."""
+
+import weakref
+from typing import Dict, List, Optional
+
+from .transcript import TranscriptView
+
+try:
+    import tiktoken
+except ImportError:  # Fall back to a character-based estimate
+    tiktoken = None
+
+# Prompt-side context windows (tokens) for known models
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-4.1": 1047576,
+    "gpt-3.5-turbo": 16385,
+}
+
+# Tokens reserved for the completion when a budget is derived from the context window
+DEFAULT_COMPLETION_RESERVE = 1024
+
+# Per-message framing overhead in the chat format
+MESSAGE_OVERHEAD = 4
+
+SUMMARY_INSTRUCTION = """You maintain a running summary of a conversation. Given the current summary and the next part of the conversation, produce an updated summary.
+
+Keep every fact, decision, name and commitment that later turns may rely on. Be concise and write in the third person."""
+
+
+def context_window(model: str) -> Optional[int]:
+    """Look up the context window for a model, matching dated variants by prefix."""
+    if model in MODEL_CONTEXT_WINDOWS:
+        return MODEL_CONTEXT_WINDOWS[model]
+    # Longest prefix first so "gpt-4o-2024-08-06" resolves to gpt-4o, not gpt-4
+    for name in sorted(MODEL_CONTEXT_WINDOWS, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_CONTEXT_WINDOWS[name]
+    return None
+
+
+class TokenCounter:
+    """Counts prompt tokens, using tiktoken when it is installed."""
+
+    def __init__(self, model: str = "gpt-4"):
+        self.model = model
+        self._encoding = None
+        if tiktoken is not None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+
+    def count_text(self, text: str) -> int:
+        """Count tokens in a piece of text."""
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        # Roughly four characters per token for English text
+        return (len(text) + 3) // 4
+
+    def count_message(self, message: Dict[str, str]) -> int:
+        """Count tokens in a single chat message, including framing."""
+        return MESSAGE_OVERHEAD + self.count_text(message["content"] or "")
+
+    def count_messages(self, messages: List[Dict[str, str]]) -> int:
+        """Count tokens in a list of chat messages."""
+        return sum(self.count_message(message) for message in messages)
+
+
+class HistoryPolicy:
+    """Decides which history messages are sent with each request.
+
+    The base policy sends the full history.
+    """
+
+    def __init__(self, counter: Optional[TokenCounter] = None):
+        self.counter = counter if counter is not None else TokenCounter()
+
+    def select(self, agent, reserved_tokens: int = 0) -> List[Dict[str, str]]:
+        """Choose the history messages for the next request.
+
+        Args:
+            agent: The agent whose history is being sent
+            reserved_tokens: Tokens already used by the system prompt, pinned
+                messages and the new message
+
+        Returns:
+            Messages to place between the pinned messages and the new message
+        """
+        return list(agent.history)
+
+
+class SlidingWindowPolicy(HistoryPolicy):
+    """Sends the most recent history that fits in a token budget."""
+
+    def __init__(self, max_tokens: Optional[int] = None, counter: Optional[TokenCounter] = None):
+        """Initialize the policy.
+
+        Args:
+            max_tokens: Total prompt budget in tokens; defaults to the model's
+                context window minus a completion reserve
+            counter: Token counter (defaults to one for gpt-4)
+        """
+        super().__init__(counter)
+        if max_tokens is None:
+            window = context_window(self.counter.model)
+            if window is None:
+                raise ValueError(f"Unknown context window for model {self.counter.model}; pass max_tokens")
+            max_tokens = window - DEFAULT_COMPLETION_RESERVE
+        if max_tokens < 1:
+            raise ValueError("max_tokens must be positive")
+
+        self.max_tokens = max_tokens
+
+    def _fit_recent(self, messages: List[Dict[str, str]], budget: int) -> int:
+        """Return the index of the oldest message kept when fitting messages into budget."""
+        used = 0
+        start = len(messages)
+        while start > 0:
+            cost = self.counter.count_message(messages[start - 1])
+            if used + cost > budget:
+                break
+            used += cost
+            start -= 1
+        # Never open the window on an orphaned assistant reply
+        while start < len(messages) and messages[start]["role"] == "assistant":
+            start += 1
+        return start
+
+    def select(self, agent, reserved_tokens: int = 0) -> List[Dict[str, str]]:
+        """Keep the newest messages that fit in the remaining budget."""
+        history = agent.history
+        start = self._fit_recent(history, self.max_tokens - reserved_tokens)
+        return history[start:]
+
+
+class SummarizingPolicy(SlidingWindowPolicy):
+    """Folds turns that fall out of the window into a rolling summary.
+
+    Older turns are summarized by an accumulator agent, in the same way
+    Interaction.finalize processes a conversation, and the summary is sent
+    ahead of the recent turns. Each turn is summarized once.
+    """
+
+    def __init__(self, runtime, max_tokens: Optional[int] = None, counter: Optional[TokenCounter] = None,
+                 summary_instruction: str = SUMMARY_INSTRUCTION, recent_fraction: float = 0.5):
+        """Initialize the policy.
+
+        Args:
+            runtime: AgentRuntime used to run the summarizer
+            max_tokens: Total prompt budget in tokens
+            counter: Token counter (defaults to one for gpt-4)
+            summary_instruction: Instruction for the summarizer agent
+            recent_fraction: Share of the budget kept for verbatim recent turns
+                when older turns are folded into the summary
+        """
+        super().__init__(max_tokens, counter)
+        if runtime is None:
+            raise ValueError("Runtime cannot be None")
+        if not 0 < recent_fraction < 1:
+            raise ValueError("recent_fraction must be between 0 and 1")
+        self.runtime = runtime
+        self.summary_instruction = summary_instruction
+        self.recent_fraction = recent_fraction
+        # Per-agent (summary text, number of history messages folded into it)
+        self._state = weakref.WeakKeyDictionary()
+
+    def _summary_message(self, summary: str) -> Dict[str, str]:
+        return {"role": "system", "content": f"Summary of the earlier conversation:\n{summary}"}
+
+    def select(self, agent, reserved_tokens: int = 0) -> List[Dict[str, str]]:
+        """Send the rolling summary plus the unsummarized turns, folding when over budget."""
+        history = agent.history
+        summary, folded = self._state.get(agent, ("", 0))
+        if folded > len(history):
+            # History was cleared or replaced since the last summary
+            summary, folded = "", 0
+
+        budget = self.max_tokens - reserved_tokens
+        selected = history[folded:]
+        prefix = [self._summary_message(summary)] if summary else []
+        if self.counter.count_messages(prefix + selected) <= budget:
+            return prefix + selected
+
+        # Fold everything except the most recent turns into the summary
+        start = folded + self._fit_recent(selected, int(budget * self.recent_fraction))
+        summary = self._fold(agent, summary, TranscriptView(history, folded, start))
+        self._state[agent] = (summary, start)
+        return [self._summary_message(summary)] + history[start:]
+
+    def _fold(self, agent, summary: str, messages: TranscriptView) -> str:
+        """Merge messages into the running summary with an accumulator agent."""
+        if not messages:
+            return summary
+        summarizer = self.runtime.create_agent(
+            name=f"{agent.name} - Summarizer",
+            instruction=self.summary_instruction
+        )
+        conversation_text = messages.text()
+        return summarizer.send(
+            f"Current summary:\n{summary or '(none)'}\n\nNext part of the conversation:\n\n{conversation_text}",
+            add_to_history=False
+        )
@@ -0,0 +1,160 @@
+"""Compact storage for agent conversation history."""
+
+import sys
+from collections.abc import Mapping, Sequence
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Tuple, Union
+
+# Content up to this length is interned, so repeated short turns share one string
+INTERN_MAX_CHARS = 4096
+
+_KEYS = ("role", "content")
+
+
+def intern_text(text: Any) -> Any:
+    """Intern a message string short enough to be worth sharing; other values pass through."""
+    if type(text) is str and len(text) <= INTERN_MAX_CHARS:
+        return sys.intern(text)
+    return text
+
+
+class Message(Mapping):
+    """One chat message, stored as a slotted record instead of a dict.
+
+    A record takes about a third of the memory of the equivalent dict, its
+    role is always an interned string and short content is interned too.
+    It reads like the {"role": ..., "content": ...} dict it replaces
+    (message["content"], .get, ==), and to_dict gives the OpenAI format.
+    Records are shared between histories (see History.fork), so they are
+    treated as immutable.
+    """
+
+    __slots__ = _KEYS
+
+    def __init__(self, role: str, content: str):
+        self.role = sys.intern(role)
+        self.content = intern_text(content)
+
+    @classmethod
+    def of(cls, message: Union["Message", Dict[str, str]]) -> "Message":
+        """The record for a message, given as a record or an OpenAI-format dict."""
+        if isinstance(message, Message):
+            return message
+        return cls(message["role"], message["content"])
+
+    def __getitem__(self, key: str) -> str:
+        if key == "role":
+            return self.role
+        if key == "content":
+            return self.content
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_KEYS)
+
+    def __len__(self) -> int:
+        return 2
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Message):
+            return self.role == other.role and self.content == other.content
+        if isinstance(other, Mapping):
+            return other == self.to_dict()
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Message(role={self.role!r}, content={self.content!r})"
+
+    def to_dict(self) -> Dict[str, str]:
+        """The message in OpenAI chat format."""
+        return {"role": self.role, "content": self.content}
+
+
+def to_openai(messages: Iterable[Union[Message, Dict[str, str]]]) -> List[Dict[str, str]]:
+    """Serialize messages to OpenAI chat format, leaving dicts as they are."""
+    return [message.to_dict() if isinstance(message, Message) else message for message in messages]
+
+
+class History(Sequence):
+    """An agent's conversation history: Message records after an optional shared prefix.
+
+    The prefix is an immutable tuple of records that several histories can
+    share, so agents forked from the same conversation (the same persona
+    briefing, say) hold one copy of it between them and store only their own
+    turns. Indexing, slicing and iteration cover prefix and own turns alike,
+    and to_openai serializes the whole history on demand.
+    """
+
+    __slots__ = ("_prefix", "_messages", "_frozen")
+
+    def __init__(self, messages: Iterable[Union[Message, Dict[str, str]]] = (),
+                 prefix: Tuple[Message, ...] = ()):
+        """Initialize the history.
+
+        Args:
+            messages: Initial messages, as records or OpenAI-format dicts
+            prefix: Shared records that come before them
+        """
+        self._prefix = prefix
+        self._messages: List[Message] = [Message.of(message) for message in messages]
+        # This history as one tuple, built on demand and handed out to forks
+        self._frozen: Tuple[Message, ...] = ()
+
+    def __len__(self) -> int:
+        return len(self._prefix) + len(self._messages)
+
+    def __getitem__(self, index):
+        shared = len(self._prefix)
+        if isinstance(index, slice):
+            if not shared:
+                return self._messages[index]
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return list(self._prefix[start:stop]) + self._messages[max(start - shared, 0):max(stop - shared, 0)]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        return self._prefix[index] if index < shared else self._messages[index - shared]
+
+    def __iter__(self) -> Iterator[Message]:
+        return chain(self._prefix, self._messages)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (History, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"History({list(self)!r})"
+
+    def append(self, message: Union[Message, Dict[str, str]]):
+        """Add a message, as a record or an OpenAI-format dict."""
+        self._messages.append(Message.of(message))
+
+    def extend(self, messages: Iterable[Union[Message, Dict[str, str]]]):
+        """Add several messages."""
+        self._messages.extend(Message.of(message) for message in messages)
+
+    def clear(self):
+        """Remove every message, including the shared prefix."""
+        self._prefix = ()
+        self._messages.clear()
+        self._frozen = ()
+
+    def fork(self) -> "History":
+        """A new history whose prefix is this one's current content, shared rather than copied."""
+        if not self._messages:
+            return History(prefix=self._prefix)
+        if len(self._frozen) != len(self) or (self._frozen and self._frozen[-1] is not self[-1]):
+            self._frozen = tuple(self)
+        return History(prefix=self._frozen)
+
+    def to_openai(self) -> List[Dict[str, str]]:
+        """The history in OpenAI chat format."""
+        return to_openai(self)
@@ -1,18 +1,41 @@
 """Interaction class for capturing and finalizing agent conversations."""
 
-from typing import List, Dict, Optional
+from typing import List, Optional
+
+from .agent import Agent
+from .journal import SessionJournal
+from .transcript import TranscriptView
+
+FINALIZE_MODES = ("auto", "single", "map_reduce", "incremental")
+
+# Most conversation tokens sent to the accumulator in one call
+DEFAULT_CHUNK_TOKENS = 4000
+
+MAP_PROMPT = "Process this part of a longer conversation (part {part} of {parts}):\n\n{conversation}"
+
+REDUCE_PROMPT = """Each result below was produced by processing one part of the same conversation, in order. Combine them into the single result you would have produced from the whole conversation.
+
+{results}"""
+
+FOLD_PROMPT = """Current result, from processing the conversation so far:
+{result}
+
+Update it with the next part of the conversation:
+
+{conversation}"""
 
 
 class Interaction:
     """Represents a completed interaction with an agent."""
     
-    def __init__(self, agent, runtime, accumulator_instruction: Optional[str] = None):
+    def __init__(self, agent, runtime, accumulator_instruction: Optional[str] = None, start_index: int = 0):
         """Initialize an interaction.
         
         Args:
             agent: The agent that had the interaction
             runtime: The runtime that executed the interaction
             accumulator_instruction: Optional instruction for how to process/accumulate the conversation
+            start_index: Index in the agent's history where the interaction starts
         """
         # Validate required inputs
         if agent is None:
@@ -28,46 +51,154 @@ class Interaction:
         self.agent = agent
         self.runtime = runtime
         self.accumulator_instruction = accumulator_instruction
-        # Capture the conversation history at the time of creation
-        self.conversation_history = list(agent.history)
+        # A view of the agent's history up to now, rather than a copy of it
+        self.conversation_history = TranscriptView(agent.history, start_index)
+        # Incremental mode: the running result and how many messages it covers
+        self._accumulated: Optional[str] = None
+        self._folded = 0
+    
+    @classmethod
+    def resume(cls, session_id: str, runtime, directory: Optional[str] = None) -> "Interaction":
+        """Rebuild the latest interactive chat of a journaled session, without calling the LLM.
+        
+        Args:
+            session_id: The session to resume
+            runtime: Runtime for the resumed agent and the accumulator
+            directory: Directory of session journals (defaults to journal.DEFAULT_SESSION_DIR)
+        """
+        state = SessionJournal.load(session_id, directory)
+        if not state.interactions:
+            raise ValueError(f"Session {session_id} has no interactive chat")
+        start, accumulator_instruction = state.interactions[-1]
+        agent = Agent.resume(session_id, runtime, directory)
+        return cls(agent, runtime, accumulator_instruction, start_index=start)
+    
+    def refresh(self):
+        """Pick up messages the agent has added since the interaction was captured."""
+        self.conversation_history.refresh()
     
-    def finalize(self) -> Optional[str]:
+    def finalize(self, mode: str = "auto", chunk_tokens: int = DEFAULT_CHUNK_TOKENS, **overrides) -> Optional[str]:
         """Finalize the interaction using the accumulator instruction.
         
+        Modes:
+            single: the whole conversation in one call
+            map_reduce: the conversation is split into chunks of at most chunk_tokens,
+                each chunk is processed in parallel and the partial results are combined
+                (hierarchically, if they do not fit in one call either)
+            incremental: only messages added since the last finalize are folded into
+                the running result, so finalizing a growing session repeatedly costs
+                tokens for the new turns only
+            auto: single if the conversation fits in one chunk, otherwise map_reduce
+        
+        Args:
+            mode: One of FINALIZE_MODES
+            chunk_tokens: Most conversation tokens sent to the accumulator in one call
+            **overrides: Request parameters (temperature, seed, max_tokens, ...) for every accumulator call
+        
         Returns:
             The accumulated/extracted result if accumulator instruction was provided, None otherwise
         """
+        if mode not in FINALIZE_MODES:
+            raise ValueError(f"Unknown finalize mode: {mode}. Expected one of: {', '.join(FINALIZE_MODES)}")
+        if chunk_tokens < 1:
+            raise ValueError("chunk_tokens must be positive")
+        
         # If no accumulator instruction, return None
         if self.accumulator_instruction is None:
             return None
         
-        # Create an accumulator agent
+        # Create an accumulator agent; it keeps no history, so one serves every chunk
         accumulator = self.runtime.create_agent(
             name=f"{self.agent.name} - Accumulator",
             instruction=self.accumulator_instruction
         )
         
-        # Format the conversation
-        conversation_text = "\n".join([
-            f"{msg['role']}: {msg['content']}" 
-            for msg in self.conversation_history
-        ])
+        if mode == "incremental":
+            return self._fold(accumulator, chunk_tokens, **overrides)
         
-        # Get the accumulated result
-        result = accumulator.send(
-            f"Process this conversation:\n\n{conversation_text}",
-            add_to_history=False
-        )
+        chunks = self._chunks(self.conversation_history, chunk_tokens)
+        if mode == "single" or len(chunks) <= 1:
+            # Get the accumulated result
+            return accumulator.send(
+                f"Process this conversation:\n\n{self.conversation_history.text()}",
+                add_to_history=False,
+                **overrides
+            )
+        
+        # Map: every chunk is processed concurrently, bounded by the runtime's max_concurrency
+        results = self.runtime.run_many([
+            (accumulator, MAP_PROMPT.format(part=i, parts=len(chunks), conversation=chunk.text()))
+            for i, chunk in enumerate(chunks, 1)
+        ], add_to_history=False, **overrides)
+        return self._reduce(accumulator, results, chunk_tokens, **overrides)
+    
+    def _reduce(self, accumulator: Agent, results: List[str], chunk_tokens: int, **overrides) -> str:
+        """Combine partial results, in groups that fit in chunk_tokens, until one is left."""
+        counter = self.runtime.provider.counter
+        while len(results) > 1:
+            groups: List[List[str]] = [[]]
+            used = 0
+            for result in results:
+                cost = counter.count_text(result)
+                if groups[-1] and used + cost > chunk_tokens:
+                    groups.append([])
+                    used = 0
+                groups[-1].append(result)
+                used += cost
+            if len(groups) == len(results):
+                # No two results fit together; combine them pairwise so the rounds still converge
+                groups = [results[i:i + 2] for i in range(0, len(results), 2)]
+            requests = [
+                (accumulator, REDUCE_PROMPT.format(results="\n\n".join(
+                    f"Result {i}:\n{result}" for i, result in enumerate(group, 1)
+                )))
+                for group in groups if len(group) > 1
+            ]
+            combined = iter(self.runtime.run_many(requests, add_to_history=False, **overrides))
+            results = [next(combined) if len(group) > 1 else group[0] for group in groups]
+        return results[0]
+    
+    def _fold(self, accumulator: Agent, chunk_tokens: int, **overrides) -> str:
+        """Fold messages added since the last incremental finalize into the running result."""
+        if self._folded > len(self.conversation_history):
+            # The conversation was replaced since the last finalize
+            self._accumulated, self._folded = None, 0
+        for chunk in self._chunks(self.conversation_history[self._folded:], chunk_tokens):
+            conversation_text = chunk.text()
+            if self._accumulated is None:
+                prompt = f"Process this conversation:\n\n{conversation_text}"
+            else:
+                prompt = FOLD_PROMPT.format(result=self._accumulated, conversation=conversation_text)
+            self._accumulated = accumulator.send(prompt, add_to_history=False, **overrides)
+            self._folded += len(chunk)
+        if self._accumulated is None:
+            # Nothing to process yet
+            return accumulator.send("Process this conversation:\n\n", add_to_history=False, **overrides)
+        return self._accumulated
+    
+    def _chunks(self, messages: TranscriptView, chunk_tokens: int) -> List[TranscriptView]:
+        """Split messages into consecutive chunks of at most chunk_tokens.
         
-        return result
+        Messages are never split, so a single message larger than chunk_tokens
+        is a chunk of its own. Chunks are views sharing the transcript's
+        rendered lines, so no message is copied or formatted twice.
+        """
+        counter = self.runtime.provider.counter
+        bounds: List[int] = []
+        used = 0
+        for i, message in enumerate(messages):
+            cost = counter.count_message(message)
+            if not bounds or used + cost > chunk_tokens:
+                bounds.append(i)
+                used = 0
+            used += cost
+        bounds.append(len(messages))
+        return [messages[bounds[i]:bounds[i + 1]] for i in range(len(bounds) - 1)]
     
-    def get_conversation(self) -> List[Dict[str, str]]:
-        """Get the raw conversation history."""
+    def get_conversation(self) -> TranscriptView:
+        """Get the raw conversation history, as a read-only view of the agent's history."""
         return self.conversation_history
     
     def get_transcript(self) -> str:
         """Get a formatted transcript of the conversation."""
-        return "\n".join([
-            f"{msg['role']}: {msg['content']}" 
-            for msg in self.conversation_history
-        ])
\ No newline at end of file
+        return self.conversation_history.text()
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""Append-only session journals for crash-safe agent conversations."""
+
+import atexit
+import json
+import os
+import re
+import threading
+import time
+import uuid
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from .history import to_openai
+
+# Directory holding one <session_id>.jsonl journal per session
+DEFAULT_SESSION_DIR = os.getenv("DECISION_SIMULATOR_SESSIONS", os.path.join("data", "sessions"))
+
+# Records written between fsyncs; every record is flushed to the OS immediately
+SYNC_EVERY = 16
+# Longest time a written record waits for an fsync
+SYNC_INTERVAL = 1.0
+
+_SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+# Open journals, synced and closed at interpreter exit
+_open_journals: "weakref.WeakSet[SessionJournal]" = weakref.WeakSet()
+
+
+def session_path(session_id: str, directory: Optional[str] = None) -> str:
+    """Path of a session's journal file."""
+    if not _SESSION_ID_PATTERN.match(session_id or ""):
+        raise ValueError("Session id may only contain letters, digits, '.', '_' and '-'")
+    return os.path.join(directory or DEFAULT_SESSION_DIR, f"{session_id}.jsonl")
+
+
+def session_exists(session_id: str, directory: Optional[str] = None) -> bool:
+    """Whether a journal exists for a session."""
+    return os.path.exists(session_path(session_id, directory))
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+@dataclass
+class SessionState:
+    """Agent state rebuilt by replaying a journal."""
+    session_id: str
+    name: str = ""
+    instruction: str = ""
+    pinned: List[Dict[str, str]] = field(default_factory=list)
+    history: List[Dict[str, str]] = field(default_factory=list)
+    # (history index where it started, accumulator instruction) per interactive chat
+    interactions: List[tuple] = field(default_factory=list)
+
+
+class SessionJournal:
+    """Append-only JSON Lines journal of one agent's conversation state.
+
+    The first record snapshots the agent (name, instruction, pinned messages
+    and any history it already has); after that there is one small record per
+    change: each message added, pinned messages, instruction changes, history
+    clears and the start of interactive chats. Every record is flushed to the
+    OS as it is written, so a crash of the process loses nothing, and fsync is
+    batched (every SYNC_EVERY records or SYNC_INTERVAL seconds) so that disk
+    syncs do not slow down every turn.
+    """
+
+    def __init__(self, session_id: str, directory: Optional[str] = None,
+                 sync_every: int = SYNC_EVERY, sync_interval: float = SYNC_INTERVAL):
+        """Open (and create if needed) a session's journal for appending.
+
+        Args:
+            session_id: Session identifier, used as the file name
+            directory: Directory of session journals (defaults to DEFAULT_SESSION_DIR)
+            sync_every: Records written between fsyncs
+            sync_interval: Longest time a written record waits for an fsync
+        """
+        if sync_every < 1:
+            raise ValueError("sync_every must be at least 1")
+        self.session_id = session_id
+        self.path = session_path(session_id, directory)
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._unsynced = 0
+        # A record cut short by a crash is ended, so the next record starts on a line of its own
+        if self._file.tell() and not _ends_with_newline(self.path):
+            self._file.write("\n")
+            self._unsynced = 1
+        self._synced_at = time.monotonic()
+        # Pending deadline sync for records written since the last fsync
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        _open_journals.add(self)
+
+    def append(self, record: Dict[str, Any]):
+        """Write one record, syncing to disk when the batch is due."""
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            if self._file.closed:
+                raise ValueError(f"Session journal {self.session_id} is closed")
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._unsynced += 1
+            waited = time.monotonic() - self._synced_at
+            if self._unsynced >= self.sync_every or waited >= self.sync_interval:
+                self._sync()
+            elif self._timer is None:
+                # No later append may come (e.g. the user is reading a reply), so the
+                # interval deadline is kept by a timer rather than by the next append
+                self._timer = threading.Timer(self.sync_interval - waited, self.sync)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _sync(self):
+        """fsync pending records; caller holds the lock."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def sync(self):
+        """Force pending records to disk."""
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+
+    def close(self):
+        """Sync and close the journal."""
+        with self._lock:
+            if not self._file.closed:
+                self._sync()
+                self._file.close()
+        _open_journals.discard(self)
+
+    def snapshot(self, agent):
+        """Record the agent's full current state; replay starts over from here."""
+        self.append({
+            "type": "start",
+            "name": agent.name,
+            "instruction": agent.instruction,
+            "pinned": to_openai(agent.pinned),
+            "history": to_openai(agent.history),
+            "ts": time.time(),
+        })
+
+    def message(self, role: str, content: str, pinned: bool = False):
+        """Record a message added to the agent's history (or pinned)."""
+        self.append({"type": "pin" if pinned else "message", "role": role, "content": content})
+
+    def instruction(self, instruction: str):
+        """Record a change of system instruction."""
+        self.append({"type": "instruction", "content": instruction})
+
+    def clear(self):
+        """Record that the agent's history was cleared."""
+        self.append({"type": "clear"})
+
+    def interaction(self, start: int, accumulator_instruction: Optional[str]):
+        """Record the start of an interactive chat at a history index."""
+        self.append({"type": "interaction", "start": start, "accumulator_instruction": accumulator_instruction})
+
+    @staticmethod
+    def load(session_id: str, directory: Optional[str] = None) -> SessionState:
+        """Replay a journal into the state it describes.
+
+        A last line cut short by a crash is ignored.
+        """
+        path = session_path(session_id, directory)
+        if not os.path.exists(path):
+            raise ValueError(f"No session journal for {session_id}")
+        state = SessionState(session_id)
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                kind = record.get("type")
+                if kind == "start":
+                    state = SessionState(session_id, record["name"], record["instruction"],
+                                         list(record["pinned"]), list(record["history"]))
+                elif kind == "message":
+                    state.history.append({"role": record["role"], "content": record["content"]})
+                elif kind == "pin":
+                    state.pinned.append({"role": record["role"], "content": record["content"]})
+                elif kind == "instruction":
+                    state.instruction = record["content"]
+                elif kind == "clear":
+                    state.history.clear()
+                    state.interactions.clear()
+                elif kind == "interaction":
+                    state.interactions.append((record["start"], record["accumulator_instruction"]))
+        if not state.name:
+            raise ValueError(f"Session journal for {session_id} has no start record")
+        return state
+
+    @staticmethod
+    def new_session_id() -> str:
+        """A fresh random session id."""
+        return uuid.uuid4().hex[:12]
+
+
+@atexit.register
+def _close_open_journals():
+    for journal in list(_open_journals):
+        journal.close()
@@ -0,0 +1,180 @@
+"""Per-call instrumentation for the agent runtime."""
+
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+@dataclass
+class CallEvent:
+    """Structured record of one LLM call made on behalf of an agent."""
+    agent: str = ""
+    model: str = ""
+    provider: str = ""
+    mode: str = "complete"  # complete, stream, batch
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # Prompt tokens served from the provider's prompt cache (included in prompt_tokens)
+    cached_tokens: int = 0
+    # Seconds spent waiting for an in-flight slot and rate-limit capacity
+    queue_wait: float = 0.0
+    # Seconds spent in backend calls, including failed attempts
+    latency: float = 0.0
+    retries: int = 0
+    cache_hit: bool = False
+    error: Optional[str] = None
+    timestamp: float = field(default_factory=time.time)
+    
+    def to_dict(self) -> Dict:
+        """Convert event to dictionary for serialization."""
+        return asdict(self)
+
+
+_captured: contextvars.ContextVar[Optional[List[CallEvent]]] = contextvars.ContextVar("captured_calls", default=None)
+
+
+@contextmanager
+def capture_calls() -> Iterator[List[CallEvent]]:
+    """Collect the call events emitted in the current thread or task.
+    
+    Usage:
+        with capture_calls() as calls:
+            agent.send(message)
+        tokens = sum(call.completion_tokens for call in calls)
+    
+    Calls made from other threads are not captured, so concurrent workers
+    can each capture their own calls.
+    """
+    calls: List[CallEvent] = []
+    token = _captured.set(calls)
+    try:
+        yield calls
+    finally:
+        _captured.reset(token)
+
+
+def record_captured(event: CallEvent):
+    """Add an event to the active capture_calls list, if any."""
+    calls = _captured.get()
+    if calls is not None:
+        calls.append(event)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+    
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+    
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class MetricsCollector:
+    """Observer that aggregates call events into counters and histograms per agent and model."""
+    
+    COUNTERS = ("calls", "errors", "cache_hits", "retries", "prompt_tokens", "completion_tokens", "cached_tokens")
+    
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counters: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self.latency: Dict[Tuple[str, str], Histogram] = {}
+        self.queue_wait: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+    
+    def __call__(self, event: CallEvent):
+        key = (event.agent, event.model)
+        with self._lock:
+            if key not in self.counters:
+                self.counters[key] = dict.fromkeys(self.COUNTERS, 0)
+                self.latency[key] = Histogram(self.buckets)
+                self.queue_wait[key] = Histogram(self.buckets)
+            counters = self.counters[key]
+            counters["calls"] += 1
+            counters["errors"] += event.error is not None
+            counters["cache_hits"] += event.cache_hit
+            counters["retries"] += event.retries
+            counters["prompt_tokens"] += event.prompt_tokens
+            counters["completion_tokens"] += event.completion_tokens
+            counters["cached_tokens"] += event.cached_tokens
+            if not event.cache_hit:
+                self.latency[key].observe(event.latency)
+            self.queue_wait[key].observe(event.queue_wait)
+    
+    def summary(self) -> List[Dict]:
+        """Per agent/model totals, slowest total latency first."""
+        with self._lock:
+            rows = []
+            for (agent, model), counters in self.counters.items():
+                latency = self.latency[(agent, model)]
+                rows.append({
+                    "agent": agent,
+                    "model": model,
+                    **counters,
+                    "total_latency": round(latency.sum, 6),
+                    "mean_latency": round(latency.sum / latency.count, 6) if latency.count else 0.0,
+                    "total_queue_wait": round(self.queue_wait[(agent, model)].sum, 6),
+                })
+        return sorted(rows, key=lambda row: row["total_latency"], reverse=True)
+    
+    def prometheus_text(self, prefix: str = "decision_simulator_llm") -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name in self.COUNTERS:
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+                for (agent, model), counters in self.counters.items():
+                    lines.append(f"{prefix}_{name}_total{{{_labels(agent, model)}}} {counters[name]}")
+            for name, histograms in (("latency_seconds", self.latency), ("queue_wait_seconds", self.queue_wait)):
+                lines.append(f"# TYPE {prefix}_{name} histogram")
+                for (agent, model), histogram in histograms.items():
+                    labels = _labels(agent, model)
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        lines.append(f'{prefix}_{name}_bucket{{{labels},le="{bound}"}} {count}')
+                    lines.append(f'{prefix}_{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+                    lines.append(f"{prefix}_{name}_sum{{{labels}}} {histogram.sum}")
+                    lines.append(f"{prefix}_{name}_count{{{labels}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(agent: str, model: str) -> str:
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'agent="{escape(agent)}",model="{escape(model)}"'
+
+
+class JsonlSink:
+    """Observer that appends each call event as one JSON line to a file."""
+    
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+    
+    def __call__(self, event: CallEvent):
+        line = json.dumps(event.to_dict())
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+    
+    def close(self):
+        with self._lock:
+            self._file.close()
@@ -1,54 +1,586 @@
 """LLM provider for handling API calls."""
 
+import asyncio
+import email.utils
 import os
-from typing import List, Dict, Optional
-from dataclasses import dataclass
-from openai import OpenAI
+import random
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Deque, Iterator, List, Dict, Optional, Tuple
+from dataclasses import dataclass, field
+from .backends import CACHE_PREFIX_PARAM, Backend, Completion, Usage, create_backend
+from .cache import ResponseCache
+from .context import TokenCounter
+from .metrics import CallEvent
+
+# Default cap on concurrent requests per provider (shared by every agent on a runtime)
+DEFAULT_MAX_IN_FLIGHT = 8
+
+# Environment variables holding each provider's API key
+API_KEY_ENV_VARS = {
+    "openai": "OPENAI_API_KEY",
+    "anthropic": "ANTHROPIC_API_KEY",
+}
 
 
 @dataclass
 class LLMConfig:
     """Configuration for LLM provider."""
-    provider: str = "openai"  # openai, anthropic, etc.
+    provider: str = "openai"  # any registered backend: openai, anthropic, local, fake
     model: str = "gpt-4"
     api_key: Optional[str] = None
+    # Alternative API endpoint, e.g. a local OpenAI-compatible server
+    base_url: Optional[str] = None
     temperature: float = 0.7
     max_tokens: Optional[int] = None
+    # Request scheduling
+    max_retries: int = 5
+    requests_per_minute: Optional[int] = None
+    tokens_per_minute: Optional[int] = None
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT
     # Other provider-specific settings
+    options: Dict[str, Any] = field(default_factory=dict)
     
     def __post_init__(self):
         """Set defaults after initialization."""
-        if self.api_key is None and self.provider == "openai":
-            self.api_key = os.getenv("OPENAI_API_KEY")
+        if self.api_key is None and self.provider in API_KEY_ENV_VARS:
+            self.api_key = os.getenv(API_KEY_ENV_VARS[self.provider])
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with jitter for transient failures."""
+    max_retries: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    # Fraction of each delay that is randomized (1.0 is "full jitter")
+    jitter: float = 1.0
+    
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number attempt (0-based).
+        
+        A server-provided Retry-After takes precedence over the computed backoff.
+        """
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_delay)
+        backoff = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return backoff * (1 - self.jitter) + random.uniform(0, backoff * self.jitter)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read the server's requested wait from an error's Retry-After headers."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after-ms")
+        if value is not None:
+            return float(value) / 1000
+        value = headers.get("retry-after")
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            # HTTP-date form
+            retry_at = email.utils.parsedate_to_datetime(value)
+            return max(retry_at.timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate."""
+    
+    def __init__(self, per_minute: float):
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive")
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self, amount: float) -> float:
+        """Take amount from the bucket and return how long the caller must wait.
+        
+        The bucket may go into debt, so concurrent callers queue up behind each
+        other instead of all waking at the same moment.
+        """
+        amount = min(amount, self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class _Waiter:
+    """A caller queued for a slot: a thread, or a task on an event loop."""
+    
+    __slots__ = ("granted", "loop", "future")
+    
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None, future: Optional[asyncio.Future] = None):
+        self.granted = False
+        self.loop = loop
+        self.future = future
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class SlotPool:
+    """Counting semaphore shared by threads and event loops, granted in FIFO order.
+    
+    A released slot is handed straight to the caller that has waited longest:
+    a thread is woken through the condition, a task through its event loop
+    (call_soon_threadsafe), so nobody polls and sync and async callers queue
+    behind each other under the one cap.
+    """
+    
+    def __init__(self, limit: int):
+        if not isinstance(limit, int) or limit < 1:
+            raise ValueError("limit must be a positive integer")
+        self.limit = limit
+        self._in_use = 0
+        self._cond = threading.Condition()
+        self._waiters: Deque[_Waiter] = deque()
+    
+    def _try_take(self) -> bool:
+        """Take a free slot if nobody is queued for one; caller holds the condition."""
+        if self._in_use < self.limit and not self._waiters:
+            self._in_use += 1
+            return True
+        return False
+    
+    def acquire(self):
+        """Block the calling thread until it holds a slot."""
+        with self._cond:
+            if self._try_take():
+                return
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+            try:
+                self._cond.wait_for(lambda: waiter.granted)
+            except BaseException:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    raise
+                self.release()
+                raise
+    
+    async def acquire_async(self):
+        """Wait, without blocking the event loop, until the current task holds a slot."""
+        loop = asyncio.get_running_loop()
+        with self._cond:
+            if self._try_take():
+                return
+            waiter = _Waiter(loop, loop.create_future())
+            self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except BaseException:
+            # Cancelled while queued; a slot handed over meanwhile is passed on
+            with self._cond:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    raise
+            self.release()
+            raise
+    
+    def release(self):
+        """Give a slot back, handing it to the longest waiting caller if there is one."""
+        with self._cond:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.granted = True
+                if waiter.loop is None:
+                    self._cond.notify_all()
+                    return
+                try:
+                    waiter.loop.call_soon_threadsafe(_wake, waiter.future)
+                    return
+                except RuntimeError:
+                    # The waiter's event loop is closed, so its task will never run
+                    continue
+            if not self._in_use:
+                raise ValueError("SlotPool released too many times")
+            self._in_use -= 1
+
+
+class RequestScheduler:
+    """Retries, rate limits and caps concurrency for provider requests.
+    
+    One scheduler is shared by every agent on a runtime, so its in-flight cap
+    and per-model request/token budgets are global to that runtime.
+    """
+    
+    def __init__(self, retry: Optional[RetryPolicy] = None, requests_per_minute: Optional[int] = None,
+                 tokens_per_minute: Optional[int] = None, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT):
+        """Initialize the scheduler.
+        
+        Args:
+            retry: Backoff policy for transient failures
+            requests_per_minute: Default request budget per model (None means unlimited)
+            tokens_per_minute: Default token budget per model (None means unlimited)
+            max_in_flight: Maximum concurrent requests
+        """
+        if not isinstance(max_in_flight, int) or max_in_flight < 1:
+            raise ValueError("max_in_flight must be a positive integer")
+        self.retry = retry if retry is not None else RetryPolicy()
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.max_in_flight = max_in_flight
+        self.retries = 0
+        self.throttled_seconds = 0.0
+        self._limits: Dict[str, Tuple[Optional[int], Optional[int]]] = {}
+        self._buckets: Dict[str, Tuple[Optional[TokenBucket], Optional[TokenBucket]]] = {}
+        self._slots = SlotPool(max_in_flight)
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def from_config(cls, config: LLMConfig) -> 'RequestScheduler':
+        """Build a scheduler from the scheduling fields of an LLMConfig."""
+        return cls(
+            retry=RetryPolicy(max_retries=config.max_retries),
+            requests_per_minute=config.requests_per_minute,
+            tokens_per_minute=config.tokens_per_minute,
+            max_in_flight=config.max_in_flight
+        )
+    
+    def set_limits(self, model: str, requests_per_minute: Optional[int] = None,
+                   tokens_per_minute: Optional[int] = None):
+        """Override the request/token budgets for one model."""
+        with self._lock:
+            self._limits[model] = (requests_per_minute, tokens_per_minute)
+            self._buckets.pop(model, None)
+    
+    def set_max_in_flight(self, max_in_flight: int):
+        """Change the concurrency cap; call before requests are in flight."""
+        if not isinstance(max_in_flight, int) or max_in_flight < 1:
+            raise ValueError("max_in_flight must be a positive integer")
+        self.max_in_flight = max_in_flight
+        self._slots = SlotPool(max_in_flight)
+    
+    def _model_buckets(self, model: str) -> Tuple[Optional[TokenBucket], Optional[TokenBucket]]:
+        with self._lock:
+            if model not in self._buckets:
+                rpm, tpm = self._limits.get(model, (self.requests_per_minute, self.tokens_per_minute))
+                self._buckets[model] = (
+                    TokenBucket(rpm) if rpm else None,
+                    TokenBucket(tpm) if tpm else None
+                )
+            return self._buckets[model]
+    
+    def _reserve(self, model: str, estimated_tokens: int) -> float:
+        """Reserve rate-limit capacity and return the wait before sending."""
+        requests, tokens = self._model_buckets(model)
+        wait = 0.0
+        if requests is not None:
+            wait = max(wait, requests.reserve(1))
+        if tokens is not None:
+            wait = max(wait, tokens.reserve(estimated_tokens))
+        if wait:
+            with self._lock:
+                self.throttled_seconds += wait
+        return wait
+    
+    def _backoff(self, error: Exception, attempt: int, retryable: Callable[[Exception], bool]) -> float:
+        """Delay before the next attempt, or re-raise if the error is final."""
+        if attempt >= self.retry.max_retries or not retryable(error):
+            raise error
+        with self._lock:
+            self.retries += 1
+        return self.retry.delay(attempt, retry_after_seconds(error))
+    
+    @contextmanager
+    def slot(self, event: Optional[CallEvent] = None):
+        """Hold one of the in-flight slots for the duration of a request."""
+        slots = self._slots
+        started = time.monotonic()
+        slots.acquire()
+        if event is not None:
+            event.queue_wait += time.monotonic() - started
+        try:
+            yield
+        finally:
+            slots.release()
+    
+    @asynccontextmanager
+    async def slot_async(self, event: Optional[CallEvent] = None):
+        """Async counterpart of slot, sharing the same cap and queue as sync callers."""
+        slots = self._slots
+        started = time.monotonic()
+        await slots.acquire_async()
+        if event is not None:
+            event.queue_wait += time.monotonic() - started
+        try:
+            yield
+        finally:
+            slots.release()
+    
+    def run(self, model: str, estimated_tokens: int, call: Callable[[], Any],
+            retryable: Callable[[Exception], bool], event: Optional[CallEvent] = None) -> Any:
+        """Run call under the rate limits, retrying failures retryable() accepts.
+        
+        Rate-limit waits, backend time and retries are recorded on event if given.
+        """
+        event = event if event is not None else CallEvent()
+        attempt = 0
+        while True:
+            wait = self._reserve(model, estimated_tokens)
+            if wait:
+                event.queue_wait += wait
+                time.sleep(wait)
+            started = time.monotonic()
+            try:
+                return call()
+            except Exception as e:
+                delay = self._backoff(e, attempt, retryable)
+            finally:
+                event.latency += time.monotonic() - started
+            attempt += 1
+            event.retries = attempt
+            time.sleep(delay)
+    
+    async def run_async(self, model: str, estimated_tokens: int, call: Callable[[], Any],
+                        retryable: Callable[[Exception], bool], event: Optional[CallEvent] = None) -> Any:
+        """Async counterpart of run; call must return an awaitable."""
+        event = event if event is not None else CallEvent()
+        attempt = 0
+        while True:
+            wait = self._reserve(model, estimated_tokens)
+            if wait:
+                event.queue_wait += wait
+                await asyncio.sleep(wait)
+            started = time.monotonic()
+            try:
+                return await call()
+            except Exception as e:
+                delay = self._backoff(e, attempt, retryable)
+            finally:
+                event.latency += time.monotonic() - started
+            attempt += 1
+            event.retries = attempt
+            await asyncio.sleep(delay)
 
 
 class LLMProvider:
-    """Handles actual LLM API calls."""
+    """Handles actual LLM API calls.
+    
+    The backend for config.provider does the provider-specific work; this
+    class adds caching, rate limiting and retries on top of it.
+    """
     
-    def __init__(self, config: LLMConfig):
+    def __init__(self, config: LLMConfig, cache: Optional[ResponseCache] = None,
+                 scheduler: Optional[RequestScheduler] = None, backend: Optional[Backend] = None):
         self.config = config
-        self._client = None
+        self.cache = cache
+        self.scheduler = scheduler if scheduler is not None else RequestScheduler.from_config(config)
+        self.counter = TokenCounter(config.model)
+        self._backend = backend
     
     @property
-    def client(self):
-        """Lazy initialize client based on provider."""
-        if self._client is None:
-            if self.config.provider == "openai":
-                self._client = OpenAI(api_key=self.config.api_key)
-            # Add other providers as needed
-            else:
-                raise ValueError(f"Unknown provider: {self.config.provider}")
-        return self._client
-    
-    def complete(self, messages: List[Dict[str, str]]) -> str:
-        """Make completion call to LLM."""
-        if self.config.provider == "openai":
-            response = self.client.chat.completions.create(
-                model=self.config.model,
-                messages=messages,
-                temperature=self.config.temperature,
-                max_tokens=self.config.max_tokens
+    def backend(self) -> Backend:
+        """Lazy initialize the backend selected by config.provider."""
+        if self._backend is None:
+            self._backend = create_backend(self.config)
+        return self._backend
+    
+    def _request_params(self, overrides: Dict[str, Any]) -> Dict[str, Any]:
+        """Merge per-call overrides (temperature, seed, ...) over the config defaults."""
+        params = {
+            "model": self.config.model,
+            "temperature": self.config.temperature,
+            "max_tokens": self.config.max_tokens
+        }
+        params.update({key: value for key, value in overrides.items() if value is not None})
+        return params
+    
+    def _cache_key(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> Optional[str]:
+        """Cache key for a request, or None when it must not be cached.
+        
+        Only deterministic requests (temperature 0 or an explicit seed) are
+        cached; a sampled reply is one draw among many, and caching it would
+        freeze that draw for every identical prompt, e.g. an invalid reply that
+        is then retried, or the opening line of a chat.
+        """
+        if self.cache is None:
+            return None
+        if params.get("seed") is None and params.get("temperature") != 0:
+            return None
+        # The prefix marker does not change the completion
+        params = {key: value for key, value in params.items() if key != CACHE_PREFIX_PARAM}
+        return ResponseCache.make_key(self.config.provider, messages, params)
+    
+    def _estimate_tokens(self, messages: List[Dict[str, str]], params: Dict[str, Any]) -> int:
+        """Estimate the tokens a request will consume against a tokens/minute budget."""
+        return self.counter.count_messages(messages) + (params.get("max_tokens") or 0)
+    
+    def _start_event(self, event: Optional[CallEvent], params: Dict[str, Any], mode: str) -> CallEvent:
+        """Stamp request details on the caller's event (or a throwaway one)."""
+        event = event if event is not None else CallEvent()
+        event.model = params["model"]
+        event.provider = self.config.provider
+        event.mode = mode
+        return event
+    
+    def _record_usage(self, event: CallEvent, usage: Usage):
+        event.prompt_tokens = usage.prompt_tokens
+        event.completion_tokens = usage.completion_tokens
+        event.cached_tokens = usage.cached_tokens
+    
+    def complete(self, messages: List[Dict[str, str]], *, event: Optional[CallEvent] = None, **overrides) -> str:
+        """Make completion call to LLM.
+        
+        Keyword overrides (e.g. temperature, seed) apply to this call only.
+        Identical deterministic requests are answered from the cache when one is configured.
+        Timing, retries and token usage are recorded on event if given.
+        """
+        params = self._request_params(overrides)
+        event = self._start_event(event, params, "complete")
+        key = self._cache_key(messages, params)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                event.cache_hit = True
+                return cached
+        
+        backend = self.backend
+        with self.scheduler.slot(event):
+            completion = self.scheduler.run(
+                params["model"],
+                self._estimate_tokens(messages, params),
+                lambda: backend.complete(messages, params),
+                backend.is_retryable,
+                event
             )
-            return response.choices[0].message.content
-        else:
-            raise ValueError(f"Unknown provider: {self.config.provider}")
\ No newline at end of file
+        self._record_usage(event, completion.usage)
+        if key is not None:
+            self.cache.set(key, completion.text)
+        return completion.text
+    
+    async def complete_async(self, messages: List[Dict[str, str]], *, event: Optional[CallEvent] = None,
+                             **overrides) -> str:
+        """Make completion call to LLM without blocking the event loop."""
+        params = self._request_params(overrides)
+        event = self._start_event(event, params, "complete")
+        key = self._cache_key(messages, params)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                event.cache_hit = True
+                return cached
+        
+        backend = self.backend
+        async with self.scheduler.slot_async(event):
+            completion = await self.scheduler.run_async(
+                params["model"],
+                self._estimate_tokens(messages, params),
+                lambda: backend.complete_async(messages, params),
+                backend.is_retryable,
+                event
+            )
+        self._record_usage(event, completion.usage)
+        if key is not None:
+            self.cache.set(key, completion.text)
+        return completion.text
+    
+    def stream(self, messages: List[Dict[str, str]], *, event: Optional[CallEvent] = None,
+               **overrides) -> Iterator[str]:
+        """Stream a completion from the LLM, yielding text deltas as they arrive.
+        
+        A cache hit is yielded as a single delta; a fresh response is cached once complete.
+        """
+        params = self._request_params(overrides)
+        event = self._start_event(event, params, "stream")
+        key = self._cache_key(messages, params)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                event.cache_hit = True
+                yield cached
+                return
+        
+        backend = self.backend
+        usage = Usage()
+        chunks = []
+        # The slot is held until the stream is drained; only opening the stream is retried
+        with self.scheduler.slot(event):
+            deltas = self.scheduler.run(
+                params["model"],
+                self._estimate_tokens(messages, params),
+                lambda: backend.open_stream(messages, params, usage),
+                backend.is_retryable,
+                event
+            )
+            started = time.monotonic()
+            for delta in deltas:
+                chunks.append(delta)
+                yield delta
+            event.latency += time.monotonic() - started
+        self._record_usage(event, usage)
+        if key is not None:
+            self.cache.set(key, "".join(chunks))
+    
+    async def stream_async(self, messages: List[Dict[str, str]], *, event: Optional[CallEvent] = None,
+                           **overrides) -> AsyncIterator[str]:
+        """Stream a completion from the LLM without blocking the event loop."""
+        params = self._request_params(overrides)
+        event = self._start_event(event, params, "stream")
+        key = self._cache_key(messages, params)
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                event.cache_hit = True
+                yield cached
+                return
+        
+        backend = self.backend
+        usage = Usage()
+        chunks = []
+        async with self.scheduler.slot_async(event):
+            deltas = await self.scheduler.run_async(
+                params["model"],
+                self._estimate_tokens(messages, params),
+                lambda: backend.open_stream_async(messages, params, usage),
+                backend.is_retryable,
+                event
+            )
+            started = time.monotonic()
+            async for delta in deltas:
+                chunks.append(delta)
+                yield delta
+            event.latency += time.monotonic() - started
+        self._record_usage(event, usage)
+        if key is not None:
+            self.cache.set(key, "".join(chunks))
+    
+    def run_batch(self, requests: List[Tuple[str, List[Dict[str, str]], Dict[str, Any]]],
+                  poll_interval: float = 30.0, completion_window: str = "24h",
+                  timeout: Optional[float] = None) -> Dict[str, Tuple[Optional[Completion], Optional[str]]]:
+        """Run requests as a single offline batch job and wait for the results.
+        
+        Args:
+            requests: (custom_id, messages, overrides) triples
+            poll_interval: Seconds between job status checks
+            completion_window: Completion window requested from the batch API
+            timeout: Give up (and cancel the job) after this many seconds
+        
+        Returns:
+            Mapping of custom_id to (completion, error); exactly one of the two is set
+        """
+        return self.backend.run_batch(
+            [(custom_id, messages, self._request_params(overrides)) for custom_id, messages, overrides in requests],
+            poll_interval=poll_interval,
+            completion_window=completion_window,
+            timeout=timeout
+        )
\ No newline at end of file
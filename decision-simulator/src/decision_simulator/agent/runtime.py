@@ -1,63 +1,246 @@
 """Agent runtime - the main entry point for agent execution."""
 
-from typing import Optional
+import asyncio
+from typing import Optional, AsyncIterator, Callable, Iterator, List, Dict, Tuple
 from .agent import Agent
+from .backends import CACHE_PREFIX_PARAM
 from .provider import LLMProvider, LLMConfig
+from .cache import ResponseCache
+from .history import to_openai
 from .interaction import Interaction
+from .batch import BatchSession
+from .metrics import CallEvent, record_captured
 
 
 class AgentRuntime:
     """Central runtime for managing agent execution."""
     
-    def __init__(self, provider: Optional[LLMProvider] = None):
-        """Initialize runtime with a provider."""
+    def __init__(self, provider: Optional[LLMProvider] = None, max_concurrency: Optional[int] = None):
+        """Initialize runtime with a provider.
+        
+        Args:
+            provider: The LLM provider used for completions
+            max_concurrency: Maximum number of requests in flight at once across
+                all agents (defaults to the provider scheduler's max_in_flight)
+        """
         if provider is None:
             # Create default provider
             provider = LLMProvider(LLMConfig())
         self.provider = provider
+        if max_concurrency is not None:
+            self.provider.scheduler.set_max_in_flight(max_concurrency)
+        self.observers: List[Callable[[CallEvent], None]] = []
+    
+    @property
+    def max_concurrency(self) -> int:
+        """Maximum number of requests in flight at once across all agents."""
+        return self.provider.scheduler.max_in_flight
     
     @classmethod
-    def create(cls, config: Optional[LLMConfig] = None) -> 'AgentRuntime':
+    def create(cls, config: Optional[LLMConfig] = None, max_concurrency: Optional[int] = None,
+               cache: Optional[ResponseCache] = None) -> 'AgentRuntime':
         """Factory method to create runtime with config."""
         if config is None:
             config = LLMConfig()
-        provider = LLMProvider(config)
-        return cls(provider)
+        provider = LLMProvider(config, cache=cache)
+        return cls(provider, max_concurrency=max_concurrency)
+    
+    def add_observer(self, observer: Callable[[CallEvent], None]):
+        """Register a callable that receives a CallEvent after every LLM call.
+        
+        See metrics.MetricsCollector and metrics.JsonlSink for ready-made observers.
+        """
+        self.observers.append(observer)
+    
+    def remove_observer(self, observer: Callable[[CallEvent], None]):
+        """Unregister an observer."""
+        self.observers.remove(observer)
     
-    def create_agent(self, name: str, instruction: str) -> Agent:
+    def _emit(self, event: CallEvent, error: Optional[Exception] = None):
+        """Deliver a finished call event to every observer."""
+        if error is not None:
+            event.error = f"{type(error).__name__}: {error}"
+        record_captured(event)
+        for observer in self.observers:
+            try:
+                observer(event)
+            except Exception:
+                # Instrumentation must never break the call it observes
+                pass
+    
+    def create_agent(self, name: str, instruction: str, history_policy=None) -> Agent:
         """Create an agent instance connected to this runtime."""
-        return Agent(name, instruction, self)
+        return Agent(name, instruction, self, history_policy=history_policy)
     
-    def submit(self, agent: Agent, message: str, add_to_history: bool = True) -> str:
-        """Submit a message from an agent for execution.
+    def _build_messages(self, agent: Agent, message: str) -> List[Dict[str, str]]:
+        """Build the request messages: system prompt, history, then the new message.
         
-        Currently synchronous, but could be async/queued in future.
+        Pinned messages always follow the system prompt; the agent's history
+        policy, if any, decides which history messages fit after them. The
+        system prompt and pinned messages come first and are sent unchanged on
+        every call, so they form a stable prefix for provider prompt caching.
+        Stored message records are serialized to OpenAI format here, per call.
         """
         # Prepare messages with system prompt
         messages = [
             {"role": "system", "content": agent.instruction}
         ]
+        messages.extend(to_openai(agent.pinned))
+        current = {"role": "user", "content": message}
         
         # Add existing history
-        messages.extend(agent.history)
+        if agent.history_policy is None:
+            messages.extend(to_openai(agent.history))
+        else:
+            counter = agent.history_policy.counter
+            reserved = counter.count_messages(messages) + counter.count_message(current)
+            messages.extend(to_openai(agent.history_policy.select(agent, reserved)))
         
         # Add the current message
-        messages.append({"role": "user", "content": message})
+        messages.append(current)
+        return messages
+    
+    def _request_overrides(self, agent: Agent, overrides: Dict) -> Dict:
+        """Per-call overrides plus the length of the agent's stable prompt prefix."""
+        return {CACHE_PREFIX_PARAM: 1 + len(agent.pinned), **overrides}
+    
+    async def _build_messages_async(self, agent: Agent, message: str) -> List[Dict[str, str]]:
+        """Build request messages off the event loop when a history policy may call the LLM."""
+        if agent.history_policy is None:
+            return self._build_messages(agent, message)
+        return await asyncio.to_thread(self._build_messages, agent, message)
+    
+    def submit(self, agent: Agent, message: str, add_to_history: bool = True, **overrides) -> str:
+        """Submit a message from an agent for execution.
+        
+        Blocks until the response arrives; see submit_async for the concurrent path.
+        Keyword overrides (e.g. temperature, seed) are passed to the provider for this call.
+        """
+        messages = self._build_messages(agent, message)
         
         # Execute through provider (future: could queue, batch, etc.)
+        event = CallEvent(agent=agent.name)
         try:
-            response = self.provider.complete(messages)
-            
-            # Only record history after successful response
-            if add_to_history:
-                agent.add_message("user", message)
-                agent.add_message("assistant", response)
-            
-            return response
-            
+            response = self.provider.complete(messages, event=event, **self._request_overrides(agent, overrides))
         except Exception as e:
+            self._emit(event, e)
             # If request fails, don't record anything in history
             raise RuntimeError(f"Failed to get response from LLM: {e}") from e
+        self._emit(event)
+        
+        # Only record history after successful response
+        if add_to_history:
+            agent.add_message("user", message)
+            agent.add_message("assistant", response)
+        
+        return response
+    
+    async def submit_async(self, agent: Agent, message: str, add_to_history: bool = True, **overrides) -> str:
+        """Submit a message from an agent without blocking the event loop.
+        
+        At most max_concurrency requests from this runtime are in flight at once;
+        the rest wait for a free slot in the provider's scheduler.
+        """
+        messages = await self._build_messages_async(agent, message)
+        
+        event = CallEvent(agent=agent.name)
+        try:
+            response = await self.provider.complete_async(
+                messages, event=event, **self._request_overrides(agent, overrides)
+            )
+        except Exception as e:
+            self._emit(event, e)
+            # If request fails, don't record anything in history
+            raise RuntimeError(f"Failed to get response from LLM: {e}") from e
+        self._emit(event)
+        
+        # Only record history after successful response
+        if add_to_history:
+            agent.add_message("user", message)
+            agent.add_message("assistant", response)
+        
+        return response
+    
+    def submit_stream(self, agent: Agent, message: str, add_to_history: bool = True, **overrides) -> Iterator[str]:
+        """Submit a message and yield the response text as it is generated.
+        
+        The assembled response is recorded in history only once the stream
+        completes; a failure part-way through records nothing.
+        """
+        messages = self._build_messages(agent, message)
+        
+        chunks = []
+        event = CallEvent(agent=agent.name)
+        try:
+            for delta in self.provider.stream(messages, event=event, **self._request_overrides(agent, overrides)):
+                chunks.append(delta)
+                yield delta
+        except Exception as e:
+            self._emit(event, e)
+            # If request fails, don't record anything in history
+            raise RuntimeError(f"Failed to get response from LLM: {e}") from e
+        self._emit(event)
+        
+        # Only record history after successful response
+        if add_to_history:
+            agent.add_message("user", message)
+            agent.add_message("assistant", "".join(chunks))
+    
+    async def submit_stream_async(self, agent: Agent, message: str, add_to_history: bool = True,
+                                  **overrides) -> AsyncIterator[str]:
+        """Async counterpart of submit_stream, bounded by max_concurrency."""
+        messages = await self._build_messages_async(agent, message)
+        
+        chunks = []
+        event = CallEvent(agent=agent.name)
+        try:
+            async for delta in self.provider.stream_async(
+                messages, event=event, **self._request_overrides(agent, overrides)
+            ):
+                chunks.append(delta)
+                yield delta
+        except Exception as e:
+            self._emit(event, e)
+            # If request fails, don't record anything in history
+            raise RuntimeError(f"Failed to get response from LLM: {e}") from e
+        self._emit(event)
+        
+        # Only record history after successful response
+        if add_to_history:
+            agent.add_message("user", message)
+            agent.add_message("assistant", "".join(chunks))
+    
+    async def gather(self, requests: List[Tuple[Agent, str]], add_to_history: bool = True,
+                     return_exceptions: bool = False, **overrides) -> List:
+        """Run many agent submissions concurrently.
+        
+        Args:
+            requests: (agent, message) pairs to submit
+            add_to_history: Whether to record each exchange in its agent's history
+            return_exceptions: Return failures in place of results instead of raising
+            **overrides: Request parameters (temperature, seed, max_tokens, ...) for every submission
+        
+        Returns:
+            Responses in the same order as the requests
+        """
+        return await asyncio.gather(
+            *(self.submit_async(agent, message, add_to_history, **overrides) for agent, message in requests),
+            return_exceptions=return_exceptions
+        )
+    
+    def run_many(self, requests: List[Tuple[Agent, str]], add_to_history: bool = True,
+                 return_exceptions: bool = False, **overrides) -> List:
+        """Synchronous wrapper around gather for callers without an event loop."""
+        return asyncio.run(self.gather(requests, add_to_history, return_exceptions, **overrides))
+    
+    def batch(self, poll_interval: float = 30.0, completion_window: str = "24h",
+              timeout: Optional[float] = None) -> BatchSession:
+        """Start a batch session that sends queued submissions as one offline batch job.
+        
+        Batch jobs trade latency for cost and don't count against per-request rate limits.
+        """
+        return BatchSession(self, poll_interval=poll_interval, completion_window=completion_window,
+                            timeout=timeout)
     
     def run_interactive_chat(self, agent: Agent, initial_question: Optional[str] = None, accumulator_instruction: Optional[str] = None) -> Interaction:
         """Run an interactive chat session with an agent.
@@ -66,7 +249,7 @@ class AgentRuntime:
             agent: The agent to chat with
             initial_question: Optional question to start the conversation
             accumulator_instruction: Optional instruction for processing the conversation
-            
+        
         Returns:
             An Interaction object containing the completed conversation
         """
@@ -75,6 +258,8 @@ class AgentRuntime:
         
         # Clear history before starting to ensure clean interaction
         start_index = len(agent.history)
+        if agent.journal is not None:
+            agent.journal.interaction(start_index, accumulator_instruction)
         
         # If there's an initial question, ask it first
         if initial_question:
@@ -91,10 +276,13 @@ class AgentRuntime:
                 
                 if not user_input:
                     continue
-                    
-                response = agent.send(user_input)
-                print(f"\n{agent.name}: {response}\n")
                 
+                # Render the response incrementally as it streams in
+                print(f"\n{agent.name}: ", end="", flush=True)
+                for delta in agent.send_stream(user_input):
+                    print(delta, end="", flush=True)
+                print("\n")
+            
             except KeyboardInterrupt:
                 print(f"\n\nSession interrupted.")
                 break
@@ -104,7 +292,4 @@ class AgentRuntime:
                 traceback.print_exc()
         
         # Create and return the interaction with just the messages from this session
-        interaction = Interaction(agent, self, accumulator_instruction)
-        # Update the conversation history to only include messages from this interaction
-        interaction.conversation_history = agent.history[start_index:]
-        return interaction
\ No newline at end of file
+        return Interaction(agent, self, accumulator_instruction, start_index=start_index)
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""Copy-free views over a span of agent history."""
+
+from collections.abc import Sequence
+from typing import Dict, List, Optional
+
+
+def format_message(message: Dict[str, str]) -> str:
+    """Render one message as a transcript line."""
+    return f"{message['role']}: {message['content']}"
+
+
+class TranscriptView(Sequence):
+    """A span of an agent's history, read in place and rendered once.
+
+    The view holds the history list and a start/stop offset instead of a copy
+    of the messages. Transcript lines are rendered lazily and memoized, and
+    slices of a view share its memo, so a conversation is formatted once no
+    matter how many times it is read, chunked or finalized. refresh() extends
+    the view over messages appended since, rendering only those. If the
+    history is cleared or replaced in place, the memo is dropped and rebuilt.
+    """
+
+    def __init__(self, history: List[Dict[str, str]], start: int = 0, stop: Optional[int] = None,
+                 _root: Optional["TranscriptView"] = None):
+        """Initialize the view.
+
+        Args:
+            history: The agent's history list (not copied)
+            start: Index of the first message in the view
+            stop: Index after the last message (defaults to the current end of history)
+        """
+        if start < 0:
+            raise ValueError("start must not be negative")
+        if stop is not None and stop < start:
+            raise ValueError("stop must not be before start")
+        self.history = history
+        self.start = start
+        self.stop = len(history) if stop is None else stop
+        # The view whose memo this one reads: itself, or the view it was sliced from
+        self._root = _root if _root is not None else self
+        # Rendered lines of history[start:start + len(_lines)], for the root view
+        self._lines: List[str] = []
+        # The message the last memoized line was rendered from, to detect a replaced history
+        self._last = None
+        # (length, last message, text) of the last rendered transcript
+        self._text = None
+
+    def __len__(self) -> int:
+        return max(0, min(self.stop, len(self.history)) - self.start)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            span = range(len(self))[index]
+            if span.step != 1:
+                return [self.history[self.start + i] for i in span]
+            return TranscriptView(self.history, self.start + span.start, self.start + span.stop, self._root)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("transcript index out of range")
+        return self.history[self.start + index]
+
+    def __repr__(self) -> str:
+        return f"TranscriptView(start={self.start}, length={len(self)})"
+
+    def refresh(self):
+        """Extend the view to the current end of the history."""
+        self.stop = len(self.history)
+
+    def _render(self, end: int) -> List[str]:
+        """Memoized lines of the root view up to history index end."""
+        lines = self._lines
+        if lines:
+            last = self.start + len(lines) - 1
+            if last >= len(self.history) or self.history[last] is not self._last:
+                # The history was cleared or replaced since these lines were rendered
+                lines.clear()
+        end = min(end, len(self.history))
+        for i in range(self.start + len(lines), end):
+            lines.append(format_message(self.history[i]))
+            self._last = self.history[i]
+        return lines
+
+    def lines(self) -> List[str]:
+        """Transcript lines of the messages in the view."""
+        root = self._root
+        offset = self.start - root.start
+        return root._render(self.start + len(self))[offset:offset + len(self)]
+
+    def text(self) -> str:
+        """The transcript, one "role: content" line per message."""
+        length = len(self)
+        last = self[length - 1] if length else None
+        if self._text is None or self._text[0] != length or self._text[1] is not last:
+            self._text = (length, last, "\n".join(self.lines()))
+        return self._text[2]
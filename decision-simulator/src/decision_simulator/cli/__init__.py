@@ -5,6 +5,7 @@ from .admin_menu import admin_console
 from .persona_menu import manage_personas
 from .scenario_menu import manage_scenarios
 from .simulation_menu import run_simulation
+from .headless import HeadlessContext, cli as headless_cli
 
 __all__ = [
     "display_menu",
@@ -13,4 +14,6 @@ __all__ = [
     "manage_personas",
     "manage_scenarios",
     "run_simulation",
+    "HeadlessContext",
+    "headless_cli",
 ]
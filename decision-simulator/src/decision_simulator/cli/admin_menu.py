@@ -1,14 +1,16 @@
 """Admin console menu for decision simulator."""
 
-from typing import Dict
-from ..personas import Persona
+from ..personas import Persona, PersonaStore
+from ..scenarios import ScenarioStore
+from .scenario_menu import create_scenario
 
 
-def admin_console(personas: Dict[str, Persona]):
+def admin_console(personas: PersonaStore, scenarios: ScenarioStore):
     """Admin console for direct entity creation.
 
     Args:
-        personas: Dictionary storing personas by name
+        personas: Persistent persona store
+        scenarios: Persistent scenario store
     """
     while True:
         print("\n=== Admin Console ===")
@@ -22,19 +24,18 @@ def admin_console(personas: Dict[str, Persona]):
         if choice == "p":
             create_persona_manual(personas)
         elif choice == "s":
-            print("\n[Create Scenario Manual - Coming Soon]")
-            input("Press Enter to continue...")
+            create_scenario(scenarios)
         elif choice == "b":
             break
         else:
             print("\nInvalid choice. Please try again.")
 
 
-def create_persona_manual(personas: Dict[str, Persona]):
+def create_persona_manual(personas: PersonaStore):
     """Create a persona by manually entering each field.
 
     Args:
-        personas: Dictionary storing personas by name
+        personas: Persistent persona store
     """
     print("\n=== Manual Persona Creation ===")
 
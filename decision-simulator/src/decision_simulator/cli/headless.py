@@ -0,0 +1,347 @@
+"""Non-interactive command line for scripted and scheduled runs.
+
+Every command reads its spec from a file or stdin, writes one JSON object per
+line to stdout and reports progress on stderr, so output can be piped into
+other tools and no TTY is needed. Exit codes: 0 when everything succeeded, 1
+when some simulations, cells or personas failed, 2 for invalid input.
+"""
+
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+import click
+
+from ..personas import PersonaStore, PopulationGenerator, PopulationSpec
+from ..scenarios import Scenario, ScenarioStore
+from ..simulation import ExperimentRunner, ResultStore, SimulationEngine
+from ..simulator import DecisionSimulator
+
+EXIT_OK = 0
+EXIT_FAILURES = 1
+EXIT_INVALID_INPUT = 2
+
+
+class InvalidInput(click.ClickException):
+    """A spec or input file that cannot be used."""
+
+    exit_code = EXIT_INVALID_INPUT
+
+
+class HeadlessContext:
+    """Runtime and stores shared by the commands of one invocation, opened on first use."""
+
+    def __init__(self, runtime_factory: Callable[[Optional[int], str], Any], db_path: str):
+        """Initialize the context.
+
+        Args:
+            runtime_factory: Called with the requested max_concurrency (or None)
+                and the database path to create the AgentRuntime
+            db_path: SQLite database holding personas, scenarios and results
+        """
+        self.runtime_factory = runtime_factory
+        self.db_path = db_path
+        self.max_concurrency: Optional[int] = None
+        self.record = True
+        self._runtime = None
+        self._stores: Dict[str, Any] = {}
+
+    @property
+    def runtime(self):
+        if self._runtime is None:
+            self._runtime = self.runtime_factory(self.max_concurrency, self.db_path)
+        return self._runtime
+
+    def _store(self, kind: type):
+        if kind.__name__ not in self._stores:
+            self._stores[kind.__name__] = kind(self.db_path)
+        return self._stores[kind.__name__]
+
+    @property
+    def personas(self) -> PersonaStore:
+        return self._store(PersonaStore)
+
+    @property
+    def scenarios(self) -> ScenarioStore:
+        return self._store(ScenarioStore)
+
+    @property
+    def results(self) -> Optional[ResultStore]:
+        """The results warehouse, or None when recording is switched off."""
+        return self._store(ResultStore) if self.record else None
+
+    def close(self):
+        """Close every store that was opened."""
+        for store in self._stores.values():
+            store.close()
+        self._stores.clear()
+
+
+def emit(record: Dict[str, Any]):
+    """Write one JSON line to stdout (flushed, so consumers see it immediately)."""
+    click.echo(json.dumps(record, default=str))
+
+
+def progress(message: str):
+    """Report progress on stderr, keeping stdout pure JSON lines."""
+    click.echo(message, err=True)
+
+
+def read_spec(source) -> Dict[str, Any]:
+    """Parse a JSON object spec from an open file, or return {} when there is none."""
+    if source is None:
+        return {}
+    try:
+        spec = json.load(source)
+    except json.JSONDecodeError as e:
+        raise InvalidInput(f"Invalid JSON in {source.name}: {e}") from e
+    if not isinstance(spec, dict):
+        raise InvalidInput(f"The spec in {source.name} must be a JSON object")
+    return spec
+
+
+def merge(spec: Dict[str, Any], **options) -> Dict[str, Any]:
+    """Overlay command-line options that were given on a spec."""
+    merged = dict(spec)
+    merged.update({
+        key: value for key, value in options.items()
+        if value is not None and value is not False and value != ()
+    })
+    return merged
+
+
+@click.group()
+@click.option("--db", "db_path", type=click.Path(dir_okay=False),
+              help="SQLite database for personas, scenarios and results.")
+@click.option("--max-concurrency", type=click.IntRange(min=1),
+              help="Maximum LLM requests in flight at once.")
+@click.option("--no-record", is_flag=True, help="Do not append results to the results warehouse.")
+@click.pass_context
+def cli(ctx, db_path, max_concurrency, no_record):
+    """Decision Simulator - run simulations without the interactive menus."""
+    context: HeadlessContext = ctx.obj
+    if db_path:
+        context.db_path = db_path
+    context.max_concurrency = max_concurrency
+    context.record = not no_record
+    ctx.call_on_close(context.close)
+
+
+@cli.command()
+@click.option("--spec", type=click.File("r"),
+              help="JSON spec ('-' for stdin) with any of the options below; options override it.")
+@click.option("--scenario", help="Scenario text.")
+@click.option("--scenario-name", help="Saved scenario to run.")
+@click.option("--persona", "personas", multiple=True, help="Persona to decide (repeatable).")
+@click.option("--trait", help="Every persona with this trait decides.")
+@click.option("--all-personas", is_flag=True, help="Every saved persona decides.")
+@click.option("--iterations", type=click.IntRange(min=1), help="Runs of the scenario (default 1).")
+@click.option("--parallel", type=click.IntRange(min=1), help="Maximum simulations in flight at once.")
+@click.option("--temperature", type=float, help="Sampling temperature override.")
+@click.option("--seed", type=int, help="Base seed, for reproducible runs.")
+@click.pass_obj
+def simulate(context: HeadlessContext, spec, **options):
+    """Simulate a scenario, one JSON line per decision.
+
+    Without personas the scenario is analysed by the neutral simulator; with
+    them, every persona decides in character.
+    """
+    spec = merge(read_spec(spec), **options)
+    scenario = _scenario_text(context, spec)
+    iterations = spec.get("iterations", 1)
+    personas = _select_personas(context, spec)
+
+    failures = 0
+    if personas is None:
+        simulator = DecisionSimulator(runtime=context.runtime, results=context.results)
+        progress(f"Simulating {iterations} iterations...")
+        try:
+            for i, result in simulator.simulate_iter(scenario, iterations, max_in_flight=spec.get("parallel"),
+                                                     temperature=spec.get("temperature"), seed=spec.get("seed")):
+                emit({"iteration": i, **result})
+        except RuntimeError as e:
+            # The remaining iterations are abandoned with the call that failed
+            progress(f"Simulation failed: {e}")
+            failures += 1
+    else:
+        if not personas:
+            raise InvalidInput("No personas matched the selection")
+        engine = SimulationEngine(context.runtime, max_in_flight=spec.get("parallel"), store=context.personas)
+        results = context.results
+        run_id = results.start_run("personas", scenario, {
+            "personas": [persona.name for persona in personas], "iterations": iterations,
+            "temperature": spec.get("temperature"), "seed": spec.get("seed"),
+        }) if results is not None else None
+        progress(f"Simulating {iterations} iterations against {len(personas)} personas...")
+        for iteration in range(iterations):
+            seed = spec.get("seed")
+            if seed is not None:
+                seed += iteration * len(personas)
+            for decision in engine.run_iter(scenario, personas, spec.get("temperature"), seed):
+                record = {"iteration": iteration, **decision.to_dict()}
+                if run_id is not None:
+                    results.append(run_id, [{"scenario": scenario, **record}])
+                emit(record)
+                failures += decision.error is not None
+    _finish(failures)
+
+
+def _scenario_text(context: HeadlessContext, spec: Dict[str, Any]) -> str:
+    """The scenario prompt from a spec's scenario text or saved scenario name."""
+    if spec.get("scenario_name"):
+        name = spec["scenario_name"]
+        if name not in context.scenarios:
+            raise InvalidInput(f"Unknown scenario: {name}")
+        return context.scenarios[name].prompt()
+    if not spec.get("scenario"):
+        raise InvalidInput("A scenario is required (--scenario, --scenario-name or the spec)")
+    return spec["scenario"]
+
+
+def _select_personas(context: HeadlessContext, spec: Dict[str, Any]) -> Optional[List]:
+    """The personas a spec selects, or None when it selects none at all."""
+    store = context.personas
+    if spec.get("all_personas"):
+        names = list(store)
+    elif spec.get("trait"):
+        matching = store.count(spec["trait"])
+        # page() needs a positive limit, so an unmatched trait selects nobody without a query
+        names = [name for name, _ in store.page(0, matching, trait=spec["trait"])] if matching else []
+    elif spec.get("personas"):
+        names = list(spec["personas"])
+        missing = [name for name in names if name not in store]
+        if missing:
+            raise InvalidInput(f"Unknown personas: {', '.join(missing)}")
+    else:
+        return None
+    return [store[name] for name in names]
+
+
+def _finish(failures: int, what: str = "failed"):
+    """Exit non-zero when anything failed."""
+    if failures:
+        progress(f"{failures} {what}")
+        click.get_current_context().exit(EXIT_FAILURES)
+
+
+@cli.command()
+@click.option("--spec", type=click.File("r"),
+              help="Experiment spec ('-' for stdin): scenarios (names or scenario objects), personas "
+                   "(names or \"all\"), iterations, temperature, seed and name.")
+@click.option("--resume", "experiment_id", help="Resume an existing experiment instead of creating one.")
+@click.option("--retry-failed", is_flag=True, help="When resuming, also re-run cells that failed.")
+@click.option("--workers", type=click.IntRange(min=1), help="Parallel workers draining the experiment.")
+@click.pass_obj
+def sweep(context: HeadlessContext, spec, experiment_id, retry_failed, workers):
+    """Run a scenarios x personas x iterations experiment, one JSON line per cell.
+
+    Experiments are resumable: rerun with --resume and the experiment id
+    (reported on stderr) after an interruption, and finished cells are skipped.
+    """
+    if (spec is None) == (experiment_id is None):
+        raise click.UsageError("Pass exactly one of --spec and --resume")
+    runner = ExperimentRunner(context.runtime, context.db_path, context.scenarios, context.personas,
+                              workers=workers, results=context.results)
+    try:
+        if experiment_id is None:
+            experiment_id = _create_experiment(context, runner, read_spec(spec))
+        else:
+            try:
+                runner.config(experiment_id)
+            except ValueError as e:
+                raise InvalidInput(str(e)) from e
+        progress(f"Experiment {experiment_id}: {runner.progress(experiment_id)['total']} cells")
+        counts = runner.run(experiment_id, retry_failed=retry_failed,
+                            on_cell=lambda record: emit({"experiment_id": experiment_id, **record}))
+    finally:
+        runner.close()
+    progress(f"{counts['done']}/{counts['total']} cells done")
+    _finish(counts["failed"], "cells failed")
+
+
+def _create_experiment(context: HeadlessContext, runner: ExperimentRunner, spec: Dict[str, Any]) -> str:
+    """Create an experiment from a spec, saving any inline scenarios it defines."""
+    scenario_names = []
+    for entry in spec.get("scenarios", []):
+        if isinstance(entry, dict):
+            try:
+                scenario = Scenario.from_dict(entry)
+            except TypeError as e:
+                raise InvalidInput(f"Invalid scenario {entry.get('name')}: {e}") from e
+            context.scenarios.add(scenario)
+            entry = scenario.name
+        scenario_names.append(entry)
+    persona_names = spec.get("personas", [])
+    if persona_names == "all":
+        persona_names = list(context.personas)
+    try:
+        return runner.create(scenario_names, persona_names, spec.get("iterations", 1),
+                             temperature=spec.get("temperature"), seed=spec.get("seed"), name=spec.get("name"))
+    except ValueError as e:
+        raise InvalidInput(str(e)) from e
+
+
+@cli.group()
+def personas():
+    """Bulk persona operations."""
+
+
+@personas.command("generate")
+@click.option("--spec", type=click.File("r"), default="-", show_default=True,
+              help="Population spec: count, attributes, traits, traits_per_persona, description, seed.")
+@click.option("--count", type=click.IntRange(min=1), help="Override the spec's count.")
+@click.option("--seed", type=int, help="Override the spec's seed.")
+@click.option("--checkpoint", type=click.Path(dir_okay=False),
+              help="JSON Lines checkpoint; rerunning with it resumes an interrupted run.")
+@click.option("--concurrency", type=click.IntRange(min=1), default=8, show_default=True,
+              help="Maximum personas generated at once.")
+@click.pass_obj
+def generate_personas(context: HeadlessContext, spec, count, seed, checkpoint, concurrency):
+    """Generate personas from a population spec and save them, one JSON line per persona."""
+    try:
+        population = PopulationSpec.from_dict(merge(read_spec(spec), count=count, seed=seed))
+    except (TypeError, ValueError) as e:
+        raise InvalidInput(f"Invalid population spec: {e}") from e
+
+    store = context.personas
+
+    def save(index, persona):
+        store.add(persona)
+        emit({"index": index, "persona": persona.to_dict()})
+
+    progress(f"Generating {population.count} personas...")
+    generator = PopulationGenerator(context.runtime, max_concurrency=concurrency)
+    try:
+        generator.generate(population, checkpoint_path=checkpoint, existing_names=set(store), on_persona=save)
+    except ValueError as e:
+        # A checkpoint written for a different spec
+        raise InvalidInput(str(e)) from e
+    for index, error in sorted(generator.failures.items()):
+        emit({"index": index, "error": error})
+    _finish(len(generator.failures), "personas could not be generated")
+
+
+@personas.command("import")
+@click.argument("source", type=click.File("r"), default="-")
+@click.pass_obj
+def import_personas(context: HeadlessContext, source):
+    """Import personas from a JSON Lines file (or stdin), replacing any with the same name.
+
+    The import is all or nothing: one invalid line leaves the library unchanged.
+    """
+    try:
+        imported = context.personas.import_lines(source)
+    except (json.JSONDecodeError, TypeError, KeyError, ValueError) as e:
+        raise InvalidInput(f"Invalid persona in {source.name}: {e}") from e
+    emit({"imported": imported})
+
+
+def main(runtime_factory: Callable[[Optional[int], str], Any], db_path: str, args: Optional[List[str]] = None):
+    """Run the command line, exiting with its status code.
+
+    Args:
+        runtime_factory: Creates the AgentRuntime, given the requested max_concurrency
+            and the database path
+        db_path: Default SQLite database path
+        args: Arguments (defaults to sys.argv[1:])
+    """
+    cli.main(args=args, prog_name="decision-simulator", obj=HeadlessContext(runtime_factory, db_path))
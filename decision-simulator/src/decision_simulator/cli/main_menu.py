@@ -1,7 +1,8 @@
 """Main menu for decision simulator."""
 
-from typing import Dict
-from ..personas import Persona
+from ..personas import PersonaStore
+from ..scenarios import ScenarioStore
+from ..simulation import ResultStore
 
 # Import menu functions
 from .admin_menu import admin_console
@@ -21,12 +22,14 @@ def display_menu():
     print("\nEnter your choice: ", end="")
 
 
-def run_main_loop(personas: Dict[str, Persona], runtime):
+def run_main_loop(personas: PersonaStore, runtime, scenarios: ScenarioStore, results: ResultStore):
     """Run the main CLI loop.
 
     Args:
-        personas: Dictionary storing personas by name
+        personas: Persistent persona store
         runtime: AgentRuntime instance
+        scenarios: Persistent scenario store
+        results: Simulation results warehouse
     """
     print("Welcome to Decision Simulator!")
     print("Use the letter commands shown in brackets to navigate.")
@@ -38,13 +41,13 @@ def run_main_loop(personas: Dict[str, Persona], runtime):
             choice = input().strip().lower()
 
             if choice == "a":
-                admin_console(personas)
+                admin_console(personas, scenarios)
             elif choice == "p":
                 manage_personas(personas, runtime)
             elif choice == "s":
-                manage_scenarios()
+                manage_scenarios(scenarios, personas, runtime, results)
             elif choice == "r":
-                run_simulation(personas)
+                run_simulation(personas, runtime, scenarios, results)
             elif choice == "q":
                 print("\nThank you for using Decision Simulator. Goodbye!")
                 break
@@ -1,20 +1,44 @@
 """Persona management menu for decision simulator."""
 
-from typing import Dict
-from ..personas import Persona
-from ..agent import Agent
+import hashlib
+import re
+from typing import Optional
+from ..personas import (
+    Persona,
+    PersonaStore,
+    PopulationSpec,
+    PopulationGenerator,
+    compile_system_prompt,
+    extract_persona,
+)
+from ..agent import Agent, TranscriptView, session_exists
+
+# Personas shown per page in the persona list
+PAGE_SIZE = 20
+
+
+def interview_session_id(name: str) -> str:
+    """Session id of a persona's interview journal.
+
+    The readable slug alone would map names such as "Zoë" and "Zoé" to the
+    same id, so a hash of the exact name keeps every persona's interview apart.
+    """
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "-", name).strip("-")
+    digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:10]
+    return f"interview-{slug}-{digest}" if slug else f"interview-{digest}"
 
 
-def manage_personas(personas: Dict[str, Persona], runtime):
+def manage_personas(personas: PersonaStore, runtime):
     """Manage personas.
 
     Args:
-        personas: Dictionary storing personas by name
+        personas: Persistent persona store
         runtime: AgentRuntime instance
     """
     while True:
         print("\n=== Persona Management ===")
         print("[c] Create new persona")
+        print("[g] Generate a population")
         print("[l] List all personas")
         print("[e] Edit persona")
         print("[d] Delete persona")
@@ -25,6 +49,8 @@ def manage_personas(personas: Dict[str, Persona], runtime):
 
         if choice == "c":
             create_persona_with_ai(personas, runtime)
+        elif choice == "g":
+            generate_population(personas, runtime)
         elif choice == "l":
             list_personas(personas, runtime)
         elif choice == "e":
@@ -38,11 +64,11 @@ def manage_personas(personas: Dict[str, Persona], runtime):
             print("\nInvalid choice. Please try again.")
 
 
-def create_persona_with_ai(personas: Dict[str, Persona], runtime):
+def create_persona_with_ai(personas: PersonaStore, runtime):
     """Create a persona using AI-assisted interview.
 
     Args:
-        personas: Dictionary storing personas by name
+        personas: Persistent persona store
         runtime: AgentRuntime instance
     """
     try:
@@ -59,12 +85,22 @@ def create_persona_with_ai(personas: Dict[str, Persona], runtime):
                 print("Persona creation cancelled.")
                 return
         
-        # Create persona generator agent inline
-        generator = runtime.create_agent(
-            name="Persona Generator",
-            instruction=f"""You are a persona creation assistant helping users design detailed, realistic personas for decision simulation.
-
-The user is creating a persona named: {name}
+        # Interviews are journaled, so one cut short by a crash can pick up where it stopped
+        session_id = interview_session_id(name)
+        generator = None
+        if session_exists(session_id):
+            resume = input(f"An unfinished interview for {name} was found. Resume it? (y/n): ").strip().lower()
+            if resume == "y":
+                generator = Agent.resume(session_id, runtime)
+                print(f"\nResuming the interview for {name} ({len(generator.history)} messages so far).")
+                print("Type 'exit' when you're done.\n")
+                generator.interact()
+        
+        if generator is None:
+            # Create persona generator agent inline
+            generator = runtime.create_agent(
+                name="Persona Generator",
+                instruction=f"""You are a persona creation assistant helping users design detailed, realistic personas for decision simulation.
 
 Your job is to:
 1. Interview the user to gather comprehensive information about the persona
@@ -77,16 +113,20 @@ Focus especially on:
 - Understanding multiple personality traits (not just adjectives, but behavioral patterns)
 - Identifying concrete goals and motivations
 - Capturing their communication style with examples
-- Any unique quirks or characteristics"""
-        )
-        
-        print(f"\nCreating persona: {name}")
-        print("I'll interview you to build out this persona.")
-        print("Type 'exit' when you're done.\n")
-        
-        # Run interactive interview with initial question
-        initial_question = f"Let's start creating {name}. Can you tell me about their background? Where are they from, what's their history, and what experiences have shaped who they are?"
-        generator.interact(initial_question=initial_question)
+- Any unique quirks or characteristics
+
+The user is creating a persona named: {name}"""
+            )
+            
+            print(f"\nCreating persona: {name}")
+            print("I'll interview you to build out this persona.")
+            print("Type 'exit' when you're done.\n")
+            
+            generator.start_session(session_id)
+            
+            # Run interactive interview with initial question
+            initial_question = f"Let's start creating {name}. Can you tell me about their background? Where are they from, what's their history, and what experiences have shaped who they are?"
+            generator.interact(initial_question=initial_question)
         
         # After interview, create structured data
         structurer = runtime.create_agent(
@@ -107,76 +147,127 @@ Return ONLY valid JSON with these fields."""
         )
         
         # Get conversation summary
-        conversation = "\n".join([
-            f"{msg['role']}: {msg['content']}" 
-            for msg in generator.history
-        ])
+        conversation = TranscriptView(generator.history).text()
         
-        json_response = structurer.send(
+        # Structured output where supported, with one repair call if the reply doesn't parse
+        persona = extract_persona(
+            structurer,
             f"""Based on this conversation about {name}, extract structured persona data:
 
 {conversation}
 
 Remember: name must be "{name}", personality_traits and goals must be lists.""",
-            add_to_history=False
+            name=name
         )
         
-        # Parse and create persona
-        import json
-        persona_data = json.loads(json_response)
-        persona = Persona(**persona_data)
-        
         personas[persona.name] = persona
+        # The interview is finished, so its journal is no longer needed
+        generator.end_session(delete=True)
         print(f"\nPersona '{persona.name}' added successfully!")
         
         # Offer to chat
         chat_now = input("\nWould you like to chat with this persona now? (y/n): ").strip().lower()
         if chat_now == "y":
-            chat_with_persona(persona, runtime)
+            chat_with_persona(persona, runtime, personas)
             
     except Exception as e:
         print(f"\nError creating persona: {e}")
         input("Press Enter to continue...")
 
 
-def list_personas(personas: Dict[str, Persona], runtime):
-    """List all personas with selection option.
+def generate_population(personas: PersonaStore, runtime):
+    """Generate many personas at once without an interview.
 
     Args:
-        personas: Dictionary storing personas by name
+        personas: Persistent persona store
         runtime: AgentRuntime instance
     """
-    print("\n=== All Personas ===")
-    if not personas:
-        print("No personas created yet.")
-        input("\nPress Enter to continue...")
-        return
+    try:
+        print("\n=== Generate Population ===")
+        count = int(input("How many personas? ").strip())
+        description = input("Describe the population (optional): ").strip()
+        traits = [t.strip() for t in input("Traits to draw from, comma separated (optional): ").split(",") if t.strip()]
+        seed = input("Seed (optional): ").strip()
+        checkpoint = input("Checkpoint file to resume from (optional): ").strip() or None
+
+        spec = PopulationSpec(
+            count=count,
+            traits={trait: 1.0 for trait in traits},
+            description=description,
+            seed=int(seed) if seed else None
+        )
+        print(f"\nGenerating {count} personas (seed {spec.seed})...")
+
+        def save(index: int, persona: Persona):
+            personas.add(persona)
+            print(f"  {persona.summary()}")
+
+        generator = PopulationGenerator(runtime)
+        generated = generator.generate(spec, checkpoint, existing_names=set(personas), on_persona=save)
+        print(f"\nGenerated {len(generated)} personas.")
+        if generator.failures:
+            print(f"{len(generator.failures)} could not be generated.")
+    except ValueError as e:
+        print(f"\nInvalid input: {e}")
+    except Exception as e:
+        print(f"\nError generating population: {e}")
+    input("Press Enter to continue...")
 
-    # Show numbered list
-    persona_list = list(personas.items())
-    for i, (name, persona) in enumerate(persona_list, 1):
-        print(f"{i}. {persona.summary()}")
 
-    print("\nEnter persona number to view details (or press Enter to go back): ", end="")
-    choice = input().strip()
+def list_personas(personas: PersonaStore, runtime):
+    """List personas a page at a time with selection option.
 
-    if choice.isdigit():
-        idx = int(choice) - 1
-        if 0 <= idx < len(persona_list):
-            name, persona = persona_list[idx]
-            show_persona_detail(name, persona, runtime)
+    Args:
+        personas: Persistent persona store
+        runtime: AgentRuntime instance
+    """
+    offset = 0
+    trait = None
+    while True:
+        total = personas.count(trait)
+        print("\n=== All Personas ===" if trait is None else f"\n=== Personas with trait '{trait}' ===")
+        if not total:
+            print("No personas created yet." if trait is None else "No personas have that trait.")
+            input("\nPress Enter to continue...")
+            return
+
+        # Show numbered list for the current page
+        offset = min(offset, (total - 1) // PAGE_SIZE * PAGE_SIZE)
+        page = personas.page(offset, PAGE_SIZE, trait=trait)
+        for i, (name, summary) in enumerate(page, offset + 1):
+            print(f"{i}. {summary}")
+        print(f"\nShowing {offset + 1}-{offset + len(page)} of {total}")
+
+        print("[n] Next page  [p] Previous page  [t] Filter by trait")
+        print("Enter persona number to view details (or press Enter to go back): ", end="")
+        choice = input().strip().lower()
+
+        if not choice:
+            return
+        if choice == "n":
+            if offset + PAGE_SIZE < total:
+                offset += PAGE_SIZE
+        elif choice == "p":
+            offset = max(0, offset - PAGE_SIZE)
+        elif choice == "t":
+            trait = input("Trait (press Enter to clear filter): ").strip() or None
+            offset = 0
+        elif choice.isdigit() and offset < int(choice) <= offset + len(page):
+            name, _ = page[int(choice) - offset - 1]
+            show_persona_detail(name, personas[name], runtime, personas)
         else:
             print("Invalid selection.")
             input("Press Enter to continue...")
 
 
-def show_persona_detail(name: str, persona: Persona, runtime):
+def show_persona_detail(name: str, persona: Persona, runtime, personas: Optional[PersonaStore] = None):
     """Show detailed view of a persona with options.
 
     Args:
         name: The persona's name
         persona: The Persona object
         runtime: AgentRuntime instance
+        personas: Store to save compiled prompts back to
     """
     while True:
         print(f"\n=== Persona: {name} ===")
@@ -213,53 +304,27 @@ def show_persona_detail(name: str, persona: Persona, runtime):
         choice = input().strip().lower()
 
         if choice == "c":
-            chat_with_persona(persona, runtime)
+            chat_with_persona(persona, runtime, personas)
         elif choice == "b":
             break
         else:
             print("\nInvalid choice. Please try again.")
 
 
-def chat_with_persona(persona: Persona, runtime):
+def chat_with_persona(persona: Persona, runtime, personas: Optional[PersonaStore] = None):
     """Start a chat session with a persona.
     
     Args:
         persona: The Persona to chat with
         runtime: AgentRuntime instance
+        personas: Store to save the compiled prompt to, so later sessions reuse it
     """
     print(f"\nPreparing chat with {persona.name}...")
     
-    # Create character builder agent inline
-    character_builder = runtime.create_agent(
-        name="Character Builder",
-        instruction="""You are an expert character designer. Take the given persona data and create a comprehensive, detailed character description that an AI can embody convincingly.
-
-Include speech patterns, behavioral quirks, decision-making style, emotional responses, and how they express their traits in conversation."""
-    )
-    
-    # Build character description
-    print("Building character profile...")
-    character_desc = character_builder.send(
-        f"Create a detailed character description for: {persona.to_dict()}",
-        add_to_history=False
-    )
-    
-    # Create prompt synthesizer agent inline
-    prompt_synthesizer = runtime.create_agent(
-        name="Prompt Synthesizer",
-        instruction="""You are an expert at creating system prompts. Combine character descriptions with scenarios into clear, natural prompts that enable authentic roleplay."""
-    )
-    
-    # Synthesize prompt
-    print("Preparing conversation...")
-    system_prompt = prompt_synthesizer.send(
-        f"""Create a system prompt for this character in a casual conversation:
-
-CHARACTER: {character_desc}
-
-SCENARIO: Having a friendly chat with someone who wants to get to know you better.""",
-        add_to_history=False
-    )
+    # Reuses the persona's compiled prompt when nothing has changed since the last chat
+    system_prompt = compile_system_prompt(persona, runtime)
+    if personas is not None:
+        personas[persona.name] = persona
     
     # Create the persona agent
     persona_agent = runtime.create_agent(
@@ -277,11 +342,11 @@ SCENARIO: Having a friendly chat with someone who wants to get to know you bette
     persona_agent.interact(initial_question=initial_greeting)
 
 
-def delete_persona(personas: Dict[str, Persona]):
+def delete_persona(personas: PersonaStore):
     """Delete a persona.
 
     Args:
-        personas: Dictionary storing personas by name
+        personas: Persistent persona store
     """
     if not personas:
         print("\nNo personas to delete.")
@@ -289,9 +354,7 @@ def delete_persona(personas: Dict[str, Persona]):
         return
 
     print("\n=== Delete Persona ===")
-    print("Available personas:")
-    for i, name in enumerate(personas.keys(), 1):
-        print(f"{i}. {name}")
+    print(f"{len(personas)} personas stored. Use [l] List all personas to browse them.")
 
     name = input("\nEnter persona name to delete (or press Enter to cancel): ").strip()
     if name and name in personas:
@@ -1,32 +1,230 @@
 """Scenario management menu for decision simulator."""
 
+from typing import List
+from ..personas import PersonaStore
+from ..scenarios import Scenario, ScenarioStore
+from ..simulation import ExperimentRunner, ResultStore
 
-def manage_scenarios():
-    """Manage scenarios."""
+
+def manage_scenarios(scenarios: ScenarioStore, personas: PersonaStore, runtime, results: ResultStore):
+    """Manage scenarios.
+
+    Args:
+        scenarios: Persistent scenario store
+        personas: Persistent persona store
+        runtime: AgentRuntime instance
+        results: Simulation results warehouse
+    """
     while True:
         print("\n=== Scenario Management ===")
         print("[c] Create new scenario")
         print("[l] List all scenarios")
         print("[e] Edit scenario")
         print("[d] Delete scenario")
+        print("[x] Run experiment (scenarios x personas)")
+        print("[r] Resume experiment")
         print("[b] Back to main menu")
         print("\nEnter your choice: ", end="")
 
         choice = input().strip().lower()
 
         if choice == "c":
-            print("\n[Create Scenario - Coming Soon]")
-            input("Press Enter to continue...")
+            create_scenario(scenarios)
         elif choice == "l":
-            print("\n[List Scenarios - Coming Soon]")
-            input("Press Enter to continue...")
+            list_scenarios(scenarios)
         elif choice == "e":
-            print("\n[Edit Scenario - Coming Soon]")
-            input("Press Enter to continue...")
+            edit_scenario(scenarios)
         elif choice == "d":
-            print("\n[Delete Scenario - Coming Soon]")
-            input("Press Enter to continue...")
+            delete_scenario(scenarios)
+        elif choice == "x":
+            run_experiment(scenarios, personas, runtime, results)
+        elif choice == "r":
+            resume_experiment(scenarios, personas, runtime, results)
         elif choice == "b":
             break
         else:
             print("\nInvalid choice. Please try again.")
+
+
+def _read_list(prompt: str, label: str) -> List[str]:
+    """Read entries one per line until an empty line."""
+    print(prompt)
+    items = []
+    while True:
+        item = input(f"  {label}: ").strip()
+        if not item:
+            return items
+        items.append(item)
+
+
+def create_scenario(scenarios: ScenarioStore):
+    """Create a scenario by entering its fields.
+
+    Args:
+        scenarios: Persistent scenario store
+    """
+    print("\n=== Create Scenario ===")
+    name = input("Enter scenario name: ").strip()
+    if not name:
+        print("Name is required!")
+        return
+    if name in scenarios:
+        print(f"Scenario '{name}' already exists!")
+        return
+
+    description = input("Describe the decision to be made: ").strip()
+    if not description:
+        print("Description is required!")
+        return
+
+    options = _read_list(
+        "\nEnter the options to choose between (one per line, press Enter with empty line to finish):", "Option"
+    )
+    tags = [tag.strip() for tag in input("Tags, comma separated (optional): ").split(",") if tag.strip()]
+
+    scenario = Scenario(name=name, description=description, options=options, tags=tags)
+    scenarios.add(scenario)
+    print(f"\nScenario '{name}' created successfully!")
+    print(f"Summary: {scenario.summary()}")
+    input("\nPress Enter to continue...")
+
+
+def list_scenarios(scenarios: ScenarioStore):
+    """List all scenarios.
+
+    Args:
+        scenarios: Persistent scenario store
+    """
+    print("\n=== All Scenarios ===")
+    if not len(scenarios):
+        print("No scenarios created yet.")
+    for i, name in enumerate(scenarios, 1):
+        print(f"{i}. {scenarios[name].summary()}")
+    input("\nPress Enter to continue...")
+
+
+def edit_scenario(scenarios: ScenarioStore):
+    """Edit a scenario's description and options.
+
+    Args:
+        scenarios: Persistent scenario store
+    """
+    name = input("\nEnter scenario name to edit: ").strip()
+    if name not in scenarios:
+        print(f"Scenario '{name}' not found.")
+        input("Press Enter to continue...")
+        return
+
+    scenario = scenarios[name]
+    print(f"Current description: {scenario.description}")
+    scenario.description = input("New description (press Enter to keep): ").strip() or scenario.description
+    print(f"Current options: {', '.join(scenario.options) or '(open-ended)'}")
+    if input("Replace options? (y/n): ").strip().lower() == "y":
+        scenario.options = _read_list("Enter options (press Enter with empty line to finish):", "Option")
+    scenarios.add(scenario)
+    print(f"Scenario '{name}' updated.")
+    input("Press Enter to continue...")
+
+
+def delete_scenario(scenarios: ScenarioStore):
+    """Delete a scenario.
+
+    Args:
+        scenarios: Persistent scenario store
+    """
+    name = input("\nEnter scenario name to delete (or press Enter to cancel): ").strip()
+    if name and name in scenarios:
+        confirm = input(f"Are you sure you want to delete '{name}'? (y/n): ").strip().lower()
+        if confirm == "y":
+            del scenarios[name]
+            print(f"Scenario '{name}' deleted.")
+    elif name:
+        print(f"Scenario '{name}' not found.")
+    input("Press Enter to continue...")
+
+
+def _names(prompt: str, available: List[str]) -> List[str]:
+    """Read a comma-separated selection, where 'all' selects everything."""
+    answer = input(prompt).strip()
+    if answer.lower() == "all":
+        return available
+    return [name.strip() for name in answer.split(",") if name.strip()]
+
+
+def run_experiment(scenarios: ScenarioStore, personas: PersonaStore, runtime, results: ResultStore):
+    """Create and run a scenarios x personas x iterations experiment.
+
+    Args:
+        scenarios: Persistent scenario store
+        personas: Persistent persona store
+        runtime: AgentRuntime instance
+        results: Simulation results warehouse
+    """
+    print("\n=== Run Experiment ===")
+    try:
+        scenario_names = _names("Scenarios (comma separated, or 'all'): ", list(scenarios))
+        persona_names = _names("Personas (comma separated, or 'all'): ", list(personas))
+        iterations = int(input("Iterations per scenario/persona pair [1]: ").strip() or 1)
+        name = input("Experiment name (optional): ").strip() or None
+
+        runner = ExperimentRunner(runtime, scenarios.path, scenarios, personas, results=results)
+        experiment_id = runner.create(scenario_names, persona_names, iterations, name=name)
+        print(f"\nExperiment {experiment_id}: {runner.progress(experiment_id)['total']} cells queued.")
+        _drain(runner, experiment_id)
+    except ValueError as e:
+        print(f"\nInvalid experiment: {e}")
+        input("Press Enter to continue...")
+
+
+def resume_experiment(scenarios: ScenarioStore, personas: PersonaStore, runtime, results: ResultStore):
+    """Resume an unfinished experiment, skipping cells already done.
+
+    Args:
+        scenarios: Persistent scenario store
+        personas: Persistent persona store
+        runtime: AgentRuntime instance
+        results: Simulation results warehouse
+    """
+    runner = ExperimentRunner(runtime, scenarios.path, scenarios, personas, results=results)
+    experiments = runner.experiments()
+    print("\n=== Experiments ===")
+    if not experiments:
+        print("No experiments yet.")
+        input("Press Enter to continue...")
+        return
+    for experiment in experiments:
+        progress = experiment["progress"]
+        print(f"{experiment['id']}  {experiment['name']:<24} "
+              f"{progress['done']}/{progress['total']} done, {progress['failed']} failed")
+
+    experiment_id = input("\nExperiment id to resume (or press Enter to cancel): ").strip()
+    if not experiment_id:
+        return
+    retry = input("Retry failed cells too? (y/n): ").strip().lower() == "y"
+    try:
+        _drain(runner, experiment_id, retry)
+    except ValueError as e:
+        print(f"\n{e}")
+        input("Press Enter to continue...")
+
+
+def _drain(runner: ExperimentRunner, experiment_id: str, retry_failed: bool = False):
+    """Run an experiment's remaining cells, printing progress."""
+    total = runner.progress(experiment_id)["total"]
+    finished = 0
+
+    def report(cell):
+        nonlocal finished
+        finished += 1
+        status = cell["decision"] if cell["status"] == "done" else f"failed ({cell['error']})"
+        print(f"[{finished}] {cell['scenario']} / {cell['persona']} #{cell['iteration']}: {status}")
+
+    print("Press Ctrl+C to stop; the experiment can be resumed later.\n")
+    try:
+        progress = runner.run(experiment_id, retry_failed=retry_failed, on_cell=report)
+    except KeyboardInterrupt:
+        progress = runner.progress(experiment_id)
+        print("\nStopped.")
+    print(f"\n{progress['done']}/{total} cells done, {progress['failed']} failed, "
+          f"{progress['pending'] + progress['running']} remaining.")
+    input("Press Enter to continue...")
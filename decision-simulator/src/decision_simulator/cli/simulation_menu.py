@@ -1,45 +1,294 @@
 """Simulation menu for decision simulator."""
 
-from typing import Dict
-from ..personas import Persona
+from collections import Counter
+from typing import List, Optional
+from ..personas import PersonaStore
+from ..scenarios import ScenarioStore
+from ..simulation import SimulationEngine, SimulationResult, PersonaDecision, ResultStore, RoundTable, Turn
+from ..simulator import DecisionSimulator
 
 
-def run_simulation(personas: Dict[str, Persona]):
+def run_simulation(personas: PersonaStore, runtime, scenarios: ScenarioStore, results: ResultStore):
     """Run a simulation.
 
     Args:
-        personas: Dictionary storing personas by name
+        personas: Persistent persona store
+        runtime: AgentRuntime instance
+        scenarios: Persistent scenario store
+        results: Simulation results warehouse
     """
+    scenario: Optional[str] = None
+    selected: List[str] = []
+    last_result: Optional[SimulationResult] = None
+
     while True:
         print("\n=== Run Simulation ===")
+        print(f"Scenario: {scenario.splitlines()[0] if scenario else '(none)'}")
+        print(f"Personas: {len(selected)} selected")
         print("[s] Select scenario")
         print("[p] Select personas")
         print("[r] Run with current selection")
+        print("[d] Round-table discussion with current selection")
+        print("[i] Simulate the scenario over many iterations (no personas)")
         print("[v] View last results")
+        print("[h] Decision history by trait")
         print("[b] Back to main menu")
         print("\nEnter your choice: ", end="")
 
         choice = input().strip().lower()
 
         if choice == "s":
-            print("\n[Select Scenario - Coming Soon]")
-            input("Press Enter to continue...")
+            scenario = select_scenario(scenarios) or scenario
         elif choice == "p":
-            print("\n[Select Personas - Coming Soon]")
-            if personas:
-                print("Available personas:")
-                for name in personas.keys():
-                    print(f"  - {name}")
-            else:
-                print("No personas available. Create some first!")
-            input("Press Enter to continue...")
+            selected = select_personas(personas) or selected
         elif choice == "r":
-            print("\n[Running Simulation - Coming Soon]")
-            input("Press Enter to continue...")
+            if not scenario or not selected:
+                print("\nSelect a scenario and at least one persona first.")
+                input("Press Enter to continue...")
+                continue
+            last_result = run_scenario(scenario, selected, personas, runtime)
+            results.record(last_result)
+            show_results(last_result)
+        elif choice == "d":
+            if not scenario or not selected:
+                print("\nSelect a scenario and at least one persona first.")
+                input("Press Enter to continue...")
+                continue
+            last_result = run_roundtable(scenario, selected, personas, runtime)
+            if last_result is not None:
+                results.record(last_result, kind="roundtable")
+                show_results(last_result)
+        elif choice == "i":
+            if not scenario:
+                print("\nSelect a scenario first.")
+                input("Press Enter to continue...")
+                continue
+            run_iterations(scenario, runtime, results)
         elif choice == "v":
-            print("\n[View Results - Coming Soon]")
-            input("Press Enter to continue...")
+            if last_result is None:
+                # Fall back to the most recent run saved by an earlier session
+                recent = results.runs(limit=1, kind="personas")
+                last_result = results.load(recent[0]["id"]) if recent else None
+            if last_result is None:
+                print("\nNo results yet. Run a simulation first.")
+                input("Press Enter to continue...")
+            else:
+                show_results(last_result)
+        elif choice == "h":
+            show_trait_history(results)
         elif choice == "b":
             break
         else:
             print("\nInvalid choice. Please try again.")
+
+
+def select_scenario(scenarios: ScenarioStore) -> Optional[str]:
+    """Choose a saved scenario or describe a new one.
+
+    Args:
+        scenarios: Persistent scenario store
+
+    Returns:
+        The scenario text, or None if nothing was chosen
+    """
+    names = list(scenarios)
+    if names:
+        print("\nSaved scenarios:")
+        for i, name in enumerate(names, 1):
+            print(f"{i}. {name}")
+    answer = input("\nEnter a scenario number, or describe a new scenario: ").strip()
+    if answer.isdigit() and 1 <= int(answer) <= len(names):
+        return scenarios[names[int(answer) - 1]].prompt()
+    return answer or None
+
+
+def select_personas(personas: PersonaStore) -> List[str]:
+    """Choose which personas take part in the simulation.
+
+    Args:
+        personas: Persistent persona store
+
+    Returns:
+        Selected persona names (empty if nothing was selected)
+    """
+    total = len(personas)
+    if not total:
+        print("\nNo personas available. Create some first!")
+        input("Press Enter to continue...")
+        return []
+
+    print(f"\n=== Select Personas ({total} available) ===")
+    print("[a] All personas")
+    print("[t] Personas with a trait")
+    print("[n] Enter names")
+    print("\nEnter your choice: ", end="")
+    choice = input().strip().lower()
+
+    if choice == "a":
+        names = list(personas)
+    elif choice == "t":
+        trait = input("Trait: ").strip()
+        names = [name for name, _ in personas.page(0, total, trait=trait)] if trait else []
+    elif choice == "n":
+        requested = [name.strip() for name in input("Names, comma separated: ").split(",") if name.strip()]
+        names = [name for name in requested if name in personas]
+        missing = [name for name in requested if name not in personas]
+        if missing:
+            print(f"Not found: {', '.join(missing)}")
+    else:
+        print("Invalid choice.")
+        names = []
+
+    print(f"{len(names)} personas selected.")
+    input("Press Enter to continue...")
+    return names
+
+
+def run_scenario(scenario: str, names: List[str], personas: PersonaStore, runtime) -> SimulationResult:
+    """Run the scenario against the selected personas, printing decisions as they arrive.
+
+    Args:
+        scenario: The decision scenario
+        names: Names of the selected personas
+        personas: Persistent persona store
+        runtime: AgentRuntime instance
+
+    Returns:
+        The simulation result
+    """
+    selected = [personas[name] for name in names]
+    print(f"\nRunning scenario against {len(selected)} personas...\n")
+    done = 0
+
+    def report(decision: PersonaDecision):
+        nonlocal done
+        done += 1
+        if decision.error is not None:
+            print(f"[{done}/{len(selected)}] {decision.persona}: failed ({decision.error})")
+        else:
+            print(f"[{done}/{len(selected)}] {decision.persona}: {decision.decision}")
+
+    engine = SimulationEngine(runtime, store=personas)
+    return engine.run(scenario, selected, on_decision=report)
+
+
+def run_roundtable(scenario: str, names: List[str], personas: PersonaStore, runtime) -> Optional[SimulationResult]:
+    """Run a round-table discussion of the scenario, printing turns as they arrive.
+
+    Args:
+        scenario: The decision scenario
+        names: Names of the selected personas, in seating order
+        personas: Persistent persona store
+        runtime: AgentRuntime instance
+
+    Returns:
+        The decisions that closed the discussion, or None if the settings were invalid
+    """
+    try:
+        rounds = int(input("Discussion rounds [3]: ").strip() or 3)
+        table = RoundTable(runtime, store=personas, rounds=rounds)
+    except ValueError as e:
+        print(f"\nInvalid settings: {e}")
+        input("Press Enter to continue...")
+        return None
+
+    selected = [personas[name] for name in names]
+    print(f"\nRunning a {rounds}-round discussion between {len(selected)} personas...\n")
+
+    def report(turn: Turn):
+        if turn.error is not None:
+            print(f"[round {turn.round}] {turn.speaker}: failed ({turn.error})")
+        else:
+            print(f"[round {turn.round}] {turn.speaker}: {' '.join(turn.content.split())[:200]}")
+
+    return table.run(scenario, selected, on_turn=report).decisions
+
+
+def run_iterations(scenario: str, runtime, results: ResultStore):
+    """Simulate the scenario with the neutral simulator, printing iterations as they complete.
+
+    Args:
+        scenario: The decision scenario
+        runtime: AgentRuntime instance
+        results: Simulation results warehouse
+    """
+    try:
+        iterations = int(input("Iterations [10]: ").strip() or 10)
+        seed = input("Seed (optional): ").strip()
+        seed = int(seed) if seed else None
+    except ValueError as e:
+        print(f"\nInvalid settings: {e}")
+        input("Press Enter to continue...")
+        return
+
+    simulator = DecisionSimulator(runtime=runtime, results=results)
+    print(f"\nSimulating {iterations} iterations...\n")
+    decisions = Counter()
+    try:
+        for done, (i, result) in enumerate(simulator.simulate_iter(scenario, iterations, seed=seed), 1):
+            decisions[result["decision"]] += 1
+            print(f"[{done}/{iterations}] iteration {i + 1}: {result['decision']}")
+    except RuntimeError as e:
+        # The remaining iterations are abandoned with the call that failed
+        print(f"\nSimulation failed: {e}")
+
+    if decisions:
+        total = sum(decisions.values())
+        print("\nDecisions:")
+        for decision, votes in decisions.most_common():
+            print(f"  {votes:>4} ({votes / total:.0%})  {decision or '(no decision given)'}")
+    input("\nPress Enter to continue...")
+
+
+def show_results(result: SimulationResult):
+    """Show the vote distribution and outcome clusters for a result.
+
+    Args:
+        result: The simulation result to show
+    """
+    print(f"\n=== Results: {result.scenario.splitlines()[0]} ===")
+    print(f"{len(result.completed)} decisions, {len(result.failed)} failures")
+
+    print("\nDecisions:")
+    for vote in result.votes():
+        print(f"  {vote['votes']:>4} ({vote['share']:.0%})  {vote['decision'] or '(no decision given)'}")
+
+    print("\nPredicted outcomes:")
+    for cluster in result.outcome_clusters():
+        print(f"  {cluster['size']:>4}  {cluster['outcome'] or '(no outcome given)'}")
+
+    print("\nEnter a persona name to see their reasoning (or press Enter to go back): ", end="")
+    name = input().strip()
+    while name:
+        for decision in result.decisions:
+            if decision.persona == name:
+                print(f"\n{decision.persona}")
+                print(f"  Decision: {decision.decision}")
+                print(f"  Outcome: {decision.outcome}")
+                print(f"  Reasoning: {decision.reasoning}")
+                if decision.error:
+                    print(f"  Error: {decision.error}")
+                break
+        else:
+            print(f"No decision from '{name}'.")
+        print("\nEnter another name (or press Enter to go back): ", end="")
+        name = input().strip()
+
+
+def show_trait_history(results: ResultStore):
+    """Show how often personas with each trait made each decision, across all saved runs.
+
+    Args:
+        results: Simulation results warehouse
+    """
+    print("\n=== Decisions by Trait ===")
+    rows = results.decision_frequencies(by="trait")
+    if not rows:
+        print("No saved decisions from personas with traits yet.")
+    trait = None
+    for row in rows:
+        if row["trait"] != trait:
+            trait = row["trait"]
+            print(f"\n{trait}")
+        print(f"  {row['count']:>4} ({row['share']:.0%})  {row['decision'] or '(no decision given)'}")
+    input("\nPress Enter to continue...")
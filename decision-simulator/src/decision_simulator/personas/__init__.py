@@ -1,5 +1,21 @@
 """Personas module for decision simulator."""
 
-from .persona import Persona
+from .persona import Persona, CompiledPrompt
+from .compiler import compile_system_prompt, persona_fingerprint
+from .store import PersonaStore
+from .generator import PopulationSpec, PopulationGenerator
+from .extraction import parse_persona, extract_persona, extract_persona_async, persona_schema
 
-__all__ = ["Persona"]
+__all__ = [
+    "Persona",
+    "CompiledPrompt",
+    "compile_system_prompt",
+    "persona_fingerprint",
+    "PersonaStore",
+    "PopulationSpec",
+    "PopulationGenerator",
+    "parse_persona",
+    "extract_persona",
+    "extract_persona_async",
+    "persona_schema",
+]
@@ -0,0 +1,98 @@
+"""Compile personas into roleplay system prompts, reusing earlier results."""
+
+import hashlib
+import json
+
+from .persona import Persona, CompiledPrompt
+
+CHARACTER_BUILDER_INSTRUCTION = """You are an expert character designer. Take the given persona data and create a comprehensive, detailed character description that an AI can embody convincingly.
+
+Include speech patterns, behavioral quirks, decision-making style, emotional responses, and how they express their traits in conversation."""
+
+PROMPT_SYNTHESIZER_INSTRUCTION = """You are an expert at creating system prompts. Combine character descriptions with scenarios into clear, natural prompts that enable authentic roleplay."""
+
+SYNTHESIS_TEMPLATE = """Create a system prompt for this character in the following scenario:
+
+CHARACTER: {character}
+
+SCENARIO: {scenario}"""
+
+CASUAL_CHAT_SCENARIO = "Having a friendly chat with someone who wants to get to know you better."
+
+
+def persona_fingerprint(persona: Persona) -> str:
+    """Hash of everything the compiled character description depends on.
+
+    Args:
+        persona: The persona to fingerprint
+
+    Returns:
+        Hex digest that changes whenever a persona field or pipeline instruction changes
+    """
+    payload = json.dumps(
+        {
+            "persona": persona.to_dict(),
+            "builder": CHARACTER_BUILDER_INSTRUCTION,
+            "synthesizer": PROMPT_SYNTHESIZER_INSTRUCTION,
+            "template": SYNTHESIS_TEMPLATE,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _scenario_key(scenario: str) -> str:
+    return hashlib.sha256(scenario.encode("utf-8")).hexdigest()[:16]
+
+
+def compile_system_prompt(persona: Persona, runtime, scenario: str = CASUAL_CHAT_SCENARIO,
+                          verbose: bool = True) -> str:
+    """Get the roleplay system prompt for a persona in a scenario.
+
+    Runs the Character Builder and Prompt Synthesizer agents only for the parts
+    not already compiled; the result is stored on persona.compiled.
+
+    Args:
+        persona: The persona to compile
+        runtime: AgentRuntime instance
+        scenario: Scenario the persona is placed in
+        verbose: Print progress while compiling
+
+    Returns:
+        The system prompt for the persona agent
+    """
+    fingerprint = persona_fingerprint(persona)
+    compiled = persona.compiled
+    if compiled is None or compiled.fingerprint != fingerprint:
+        # Build character description
+        if verbose:
+            print("Building character profile...")
+        character_builder = runtime.create_agent(
+            name="Character Builder",
+            instruction=CHARACTER_BUILDER_INSTRUCTION
+        )
+        character_desc = character_builder.send(
+            f"Create a detailed character description for: {persona.to_dict()}",
+            add_to_history=False
+        )
+        compiled = CompiledPrompt(fingerprint=fingerprint, character_description=character_desc)
+        persona.compiled = compiled
+
+    scenario_key = _scenario_key(scenario)
+    system_prompt = compiled.system_prompts.get(scenario_key)
+    if system_prompt is None:
+        # Synthesize prompt
+        if verbose:
+            print("Preparing conversation...")
+        prompt_synthesizer = runtime.create_agent(
+            name="Prompt Synthesizer",
+            instruction=PROMPT_SYNTHESIZER_INSTRUCTION
+        )
+        system_prompt = prompt_synthesizer.send(
+            SYNTHESIS_TEMPLATE.format(character=compiled.character_description, scenario=scenario),
+            add_to_history=False
+        )
+        compiled.system_prompts[scenario_key] = system_prompt
+
+    return system_prompt
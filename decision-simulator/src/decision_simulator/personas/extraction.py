@@ -0,0 +1,231 @@
+"""Structured extraction of personas from model replies."""
+
+import json
+import typing
+from dataclasses import MISSING, fields
+from functools import lru_cache
+from typing import Any, Dict, Optional, Set, Tuple
+
+from .persona import Persona
+
+REPAIR_TEMPLATE = """Your previous reply could not be used: {error}.
+
+Previous reply:
+{reply}
+
+Reply again with ONLY the corrected JSON object, matching this schema:
+{schema}"""
+
+
+def _type_schema(annotation) -> Dict[str, Any]:
+    """JSON schema for a persona field's type annotation."""
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is typing.Union and type(None) in args:
+        inner = _type_schema(next(arg for arg in args if arg is not type(None)))
+        return {**inner, "type": [inner["type"], "null"]}
+    if annotation is str:
+        return {"type": "string"}
+    if origin is list:
+        return {"type": "array", "items": _type_schema(args[0]) if args else {}}
+    if origin is dict:
+        return {"type": "object"}
+    raise TypeError(f"No JSON schema for field type {annotation}")
+
+
+@lru_cache(maxsize=None)
+def _schema_json() -> str:
+    hints = typing.get_type_hints(Persona)
+    properties = {}
+    required = []
+    for f in fields(Persona):
+        if f.name == "compiled":
+            continue
+        properties[f.name] = _type_schema(hints[f.name])
+        if f.default is MISSING and f.default_factory is MISSING:
+            required.append(f.name)
+    return json.dumps({
+        "type": "object",
+        "properties": properties,
+        "required": required,
+        "additionalProperties": False,
+    })
+
+
+def persona_schema() -> Dict[str, Any]:
+    """JSON schema for a persona, derived from the Persona dataclass."""
+    return json.loads(_schema_json())
+
+
+# (provider, model) pairs whose API rejected response_format; later requests go without it
+_rejected_response_formats: Set[Tuple[str, str]] = set()
+
+
+def persona_response_format(kind: str = "json_schema") -> Dict[str, Any]:
+    """response_format request parameter asking for a persona as JSON.
+
+    Args:
+        kind: "json_schema" to constrain the reply to the persona schema, or
+            "json_object" for plain JSON mode
+    """
+    if kind == "json_object":
+        return {"type": "json_object"}
+    # Not strict: strict mode rejects the free-form values object
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": "persona", "schema": persona_schema(), "strict": False},
+    }
+
+
+def _json_object(text: str) -> Dict[str, Any]:
+    """Find the JSON object in a reply, ignoring code fences and surrounding prose."""
+    text = text.strip()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end < start:
+            raise ValueError("Reply contains no JSON object")
+        try:
+            data = json.loads(text[start:end + 1])
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Reply is not valid JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError("Reply is not a JSON object")
+    return data
+
+
+def parse_persona(text: str, name: Optional[str] = None) -> Persona:
+    """Parse and validate a persona from a model reply.
+
+    Tolerates a markdown fence or prose around the JSON, drops unknown keys,
+    and splits comma-separated strings given for list fields.
+
+    Args:
+        text: The model reply
+        name: If given, the persona's name regardless of what the reply says
+
+    Raises:
+        ValueError: If the reply is not a valid persona
+    """
+    schema = persona_schema()
+    data = {key: value for key, value in _json_object(text).items() if key in schema["properties"]}
+    if name is not None:
+        data["name"] = name
+
+    for key, field_schema in schema["properties"].items():
+        value = data.get(key)
+        if value is None:
+            if key in schema["required"]:
+                raise ValueError(f"Persona is missing {key}")
+            continue
+        types = field_schema["type"] if isinstance(field_schema["type"], list) else [field_schema["type"]]
+        if "array" in types:
+            if isinstance(value, str):
+                value = [item.strip() for item in value.split(",") if item.strip()]
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                raise ValueError(f"Persona {key} must be a list of strings")
+        elif "object" in types:
+            if not isinstance(value, dict):
+                raise ValueError(f"Persona {key} must be an object")
+        elif not isinstance(value, str):
+            raise ValueError(f"Persona {key} must be a string")
+        data[key] = value
+
+    for key in schema["required"]:
+        if not data[key].strip():
+            raise ValueError(f"Persona is missing {key}")
+    data["name"] = data["name"].strip()
+    return Persona.from_dict(data)
+
+
+def _overrides(agent, overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Request structured output in the form the model accepts, if any.
+
+    Models without structured output get no response_format; the parser
+    copes with fences and prose, and the repair call with the rest.
+    """
+    provider = agent.runtime.provider
+    model = overrides.get("model") or provider.config.model
+    kind = provider.backend.response_format(model)
+    if kind is None or (provider.config.provider, model) in _rejected_response_formats:
+        return dict(overrides)
+    return {"response_format": persona_response_format(kind), **overrides}
+
+
+def _rejected_response_format(agent, overrides: Dict[str, Any], error: Exception) -> bool:
+    """Whether a failed call was a 400 for a request that carried response_format.
+
+    If so, the model is remembered as not accepting it and response_format is
+    dropped from overrides, so the call can be made again without it.
+    """
+    if "response_format" not in overrides:
+        return False
+    cause = error
+    while cause is not None and getattr(cause, "status_code", None) is None:
+        cause = cause.__cause__
+    if cause is None or cause.status_code != 400:
+        return False
+    provider = agent.runtime.provider
+    _rejected_response_formats.add((provider.config.provider, overrides.get("model") or provider.config.model))
+    del overrides["response_format"]
+    return True
+
+
+def _send(agent, message: str, overrides: Dict[str, Any]) -> str:
+    try:
+        return agent.send(message, add_to_history=False, **overrides)
+    except RuntimeError as e:
+        if not _rejected_response_format(agent, overrides, e):
+            raise
+    return agent.send(message, add_to_history=False, **overrides)
+
+
+async def _send_async(agent, message: str, overrides: Dict[str, Any]) -> str:
+    try:
+        return await agent.send_async(message, add_to_history=False, **overrides)
+    except RuntimeError as e:
+        if not _rejected_response_format(agent, overrides, e):
+            raise
+    return await agent.send_async(message, add_to_history=False, **overrides)
+
+
+def _repair_prompt(reply: str, error: ValueError) -> str:
+    return REPAIR_TEMPLATE.format(error=error, reply=reply, schema=_schema_json())
+
+
+def extract_persona(agent, message: str, name: Optional[str] = None, **overrides) -> Persona:
+    """Ask an agent for a persona and parse it, with one repair call on failure.
+
+    The repair call sends only the rejected reply and the error, not the
+    original message, so a long interview is never sent twice. If the API
+    rejects the response_format it was sent, the call is made once more
+    without it.
+
+    Args:
+        agent: Agent instructed to reply with persona JSON
+        message: The extraction request
+        name: If given, the persona's name regardless of what the reply says
+        **overrides: Per-call request parameters (temperature, seed, ...)
+
+    Raises:
+        ValueError: If the repaired reply is still not a valid persona
+    """
+    overrides = _overrides(agent, overrides)
+    reply = _send(agent, message, overrides)
+    try:
+        return parse_persona(reply, name)
+    except ValueError as e:
+        reply = _send(agent, _repair_prompt(reply, e), overrides)
+        return parse_persona(reply, name)
+
+
+async def extract_persona_async(agent, message: str, name: Optional[str] = None, **overrides) -> Persona:
+    """Async counterpart of extract_persona."""
+    overrides = _overrides(agent, overrides)
+    reply = await _send_async(agent, message, overrides)
+    try:
+        return parse_persona(reply, name)
+    except ValueError as e:
+        reply = await _send_async(agent, _repair_prompt(reply, e), overrides)
+        return parse_persona(reply, name)
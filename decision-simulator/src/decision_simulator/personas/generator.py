@@ -0,0 +1,270 @@
+"""Non-interactive bulk persona generation."""
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from .persona import Persona
+from .extraction import extract_persona_async
+
+GENERATOR_INSTRUCTION = """You create realistic, specific personas for decision simulation.
+
+Given a profile, invent one person who fits it. Make them concrete: a specific background story, behavioral personality traits, goals with real stakes, and a recognizable way of talking.
+
+Return ONLY valid JSON with these fields:
+- name (string, a full name)
+- background (string)
+- personality_traits (list of strings)
+- goals (list of strings)
+- communication_style (string)
+- expertise (string)
+- quirks (string)
+- values (object mapping value names to short descriptions)"""
+
+
+@dataclass
+class PopulationSpec:
+    """Describes a population of personas to generate.
+
+    Attributes are sampled independently from weighted distributions, and each
+    persona gets traits_per_persona distinct traits drawn by weight. With a
+    seed, the profile for each index is reproducible, so an interrupted run
+    resumes with the same profiles.
+    """
+
+    count: int
+    # Attribute name -> {value: weight}, e.g. {"age": {"18-29": 0.2, "30-49": 0.5, "50+": 0.3}}
+    attributes: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    # Trait -> weight
+    traits: Dict[str, float] = field(default_factory=dict)
+    traits_per_persona: int = 3
+    # Free-text context shared by the whole population
+    description: str = ""
+    seed: Optional[int] = None
+
+    def __post_init__(self):
+        if self.count < 1:
+            raise ValueError("count must be at least 1")
+        if self.traits_per_persona < 0:
+            raise ValueError("traits_per_persona cannot be negative")
+        for name, weights in list(self.attributes.items()) + [("traits", self.traits)]:
+            if any(weight < 0 for weight in weights.values()):
+                raise ValueError(f"Weights for {name} cannot be negative")
+            if weights and not sum(weights.values()) > 0:
+                raise ValueError(f"Weights for {name} must not all be zero")
+        if self.seed is None:
+            # Fix the seed now so a checkpointed run can resume with the same profiles
+            self.seed = random.randrange(2**31)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert spec to dictionary for serialization."""
+        return {
+            "count": self.count,
+            "attributes": self.attributes,
+            "traits": self.traits,
+            "traits_per_persona": self.traits_per_persona,
+            "description": self.description,
+            "seed": self.seed,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PopulationSpec":
+        """Create spec from dictionary."""
+        return cls(**data)
+
+    def fingerprint(self) -> str:
+        """Digest of the spec, equal for specs that describe the same population."""
+        return hashlib.sha256(json.dumps(self.to_dict(), sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+    def profile(self, index: int) -> Dict[str, Any]:
+        """Sample the attributes and traits for one member of the population."""
+        rng = random.Random(f"{self.seed}:{index}")
+        profile: Dict[str, Any] = {
+            name: rng.choices(list(weights), weights=list(weights.values()))[0]
+            for name, weights in self.attributes.items()
+            if weights
+        }
+        pool = {trait: weight for trait, weight in self.traits.items() if weight > 0}
+        traits = []
+        while pool and len(traits) < self.traits_per_persona:
+            trait = rng.choices(list(pool), weights=list(pool.values()))[0]
+            traits.append(trait)
+            del pool[trait]
+        if traits:
+            profile["personality_traits"] = traits
+        return profile
+
+
+class PopulationGenerator:
+    """Generates populations of personas concurrently, with resumable checkpoints.
+
+    Each persona is generated by a single structured call, so no interview is
+    needed. Replies that still fail validation after a repair call, or that
+    reuse a name already in the population, are retried with feedback up to
+    max_attempts times before the index is given up on.
+    """
+
+    def __init__(self, runtime, max_concurrency: int = 8, max_attempts: int = 3,
+                 instruction: str = GENERATOR_INSTRUCTION):
+        """Initialize the generator.
+
+        Args:
+            runtime: AgentRuntime used for generation calls
+            max_concurrency: Maximum personas generated at once
+            max_attempts: Attempts per persona before giving up on it
+            instruction: Instruction for the generator agent
+        """
+        if runtime is None:
+            raise ValueError("Runtime cannot be None")
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.runtime = runtime
+        self.max_concurrency = max_concurrency
+        self.max_attempts = max_attempts
+        self.instruction = instruction
+        # Index -> last error for personas that could not be generated
+        self.failures: Dict[int, str] = {}
+
+    def _prompt(self, spec: PopulationSpec, profile: Dict[str, Any], feedback: Optional[str]) -> str:
+        lines = []
+        if spec.description:
+            lines.append(f"Population: {spec.description}")
+        lines.append("Profile:")
+        for name, value in profile.items():
+            if isinstance(value, list):
+                value = ", ".join(value)
+            lines.append(f"- {name}: {value}")
+        if feedback:
+            lines.append(f"\nYour previous reply was rejected: {feedback}. Try again.")
+        return "\n".join(lines)
+
+    async def _generate_one(self, spec: PopulationSpec, index: int, names: Set[str]) -> Optional[Persona]:
+        """Generate the persona for one index, or None after max_attempts failures."""
+        profile = spec.profile(index)
+        agent = self.runtime.create_agent(name="Population Generator", instruction=self.instruction)
+        feedback = None
+        for attempt in range(self.max_attempts):
+            try:
+                persona = await extract_persona_async(
+                    agent,
+                    self._prompt(spec, profile, feedback),
+                    # Distinct per attempt, so a retry never gets the rejected reply back from the cache
+                    seed=spec.seed + index * self.max_attempts + attempt
+                )
+            except ValueError as e:
+                feedback = str(e)
+                continue
+            key = persona.name.casefold()
+            if key in names:
+                feedback = f"the name {persona.name} is already taken; choose a different name"
+                continue
+            # Claimed before any await, so concurrent tasks cannot take the same name
+            names.add(key)
+            return persona
+        self.failures[index] = feedback
+        return None
+
+    async def generate_async(self, spec: PopulationSpec, checkpoint_path: Optional[str] = None,
+                             existing_names: Optional[Set[str]] = None,
+                             on_persona: Optional[Callable[[int, Persona], None]] = None) -> List[Persona]:
+        """Generate a population.
+
+        Args:
+            spec: The population to generate
+            checkpoint_path: JSON Lines file recording each finished persona; indices
+                already in it are skipped, so an interrupted run can be resumed
+                with the same spec
+            existing_names: Names that generated personas must not reuse
+            on_persona: Called with (index, persona) as each new persona is finished
+
+        Returns:
+            Generated personas in index order, including any from the checkpoint
+
+        Raises:
+            ValueError: If the checkpoint was written for a different spec
+        """
+        names = {name.casefold() for name in existing_names or ()}
+        done = self._load_checkpoint(checkpoint_path, spec) if checkpoint_path else {}
+        names.update(persona.name.casefold() for persona in done.values())
+        self.failures = {}
+
+        checkpoint = None
+        if checkpoint_path:
+            directory = os.path.dirname(checkpoint_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+            if not checkpoint.tell():
+                checkpoint.write(json.dumps({"spec": spec.to_dict(), "fingerprint": spec.fingerprint()}) + "\n")
+                checkpoint.flush()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run(index: int):
+            async with semaphore:
+                try:
+                    persona = await self._generate_one(spec, index, names)
+                except Exception as e:
+                    self.failures[index] = str(e)
+                    return
+            if persona is None:
+                return
+            done[index] = persona
+            if checkpoint is not None:
+                checkpoint.write(json.dumps({"index": index, "persona": persona.to_dict()}) + "\n")
+                checkpoint.flush()
+            if on_persona is not None:
+                on_persona(index, persona)
+
+        try:
+            await asyncio.gather(*(run(index) for index in range(spec.count) if index not in done))
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+        return [done[index] for index in sorted(done)]
+
+    def generate(self, spec: PopulationSpec, checkpoint_path: Optional[str] = None,
+                 existing_names: Optional[Set[str]] = None,
+                 on_persona: Optional[Callable[[int, Persona], None]] = None) -> List[Persona]:
+        """Synchronous wrapper around generate_async for callers without an event loop."""
+        return asyncio.run(self.generate_async(spec, checkpoint_path, existing_names, on_persona))
+
+    @staticmethod
+    def _load_checkpoint(path: str, spec: PopulationSpec) -> Dict[int, Persona]:
+        """Read finished personas from a checkpoint file, if it exists.
+
+        The file starts with a fingerprint of the spec it was written for, so
+        that a rerun with a different spec, seed or count cannot mix two
+        populations.
+        """
+        done: Dict[int, Persona] = {}
+        if not os.path.exists(path):
+            return done
+        fingerprint = None
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by an interrupted run
+                    continue
+                if "fingerprint" in record:
+                    fingerprint = record["fingerprint"]
+                    if fingerprint != spec.fingerprint():
+                        written = record.get("spec", {})
+                        raise ValueError(
+                            f"Checkpoint {path} was written for a different population "
+                            f"(count {written.get('count')}, seed {written.get('seed')}); "
+                            "rerun with that spec or use a new checkpoint file"
+                        )
+                    continue
+                if fingerprint is None:
+                    raise ValueError(f"Checkpoint {path} does not record its population spec; "
+                                     "use a new checkpoint file")
+                done[record["index"]] = Persona.from_dict(record["persona"])
+        return done
@@ -4,6 +4,32 @@ from dataclasses import dataclass, field
 from typing import Dict, Any, Optional, List
 
 
+@dataclass
+class CompiledPrompt:
+    """Cached output of the persona prompt pipeline.
+
+    The character description depends only on the persona, so it is shared by
+    every scenario; system prompts are stored per scenario hash.
+    """
+
+    fingerprint: str
+    character_description: str
+    system_prompts: Dict[str, str] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert compiled prompt to dictionary for serialization."""
+        return {
+            "fingerprint": self.fingerprint,
+            "character_description": self.character_description,
+            "system_prompts": self.system_prompts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "CompiledPrompt":
+        """Create compiled prompt from dictionary."""
+        return cls(**data)
+
+
 @dataclass
 class Persona:
     """Pure data representation of a persona."""
@@ -16,6 +42,8 @@ class Persona:
     expertise: Optional[str] = None
     values: Optional[Dict[str, Any]] = None
     quirks: Optional[str] = None
+    # Derived artifact, not part of the persona's identity or its serialized fields
+    compiled: Optional[CompiledPrompt] = field(default=None, compare=False, repr=False)
 
     def to_dict(self) -> Dict[str, Any]:
         """Convert persona to dictionary for serialization."""
@@ -33,7 +61,11 @@ class Persona:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Persona":
         """Create persona from dictionary."""
-        return cls(**data)
+        data = dict(data)
+        compiled = data.pop("compiled", None)
+        if isinstance(compiled, dict):
+            compiled = CompiledPrompt.from_dict(compiled)
+        return cls(**data, compiled=compiled)
 
     def summary(self) -> str:
         """Get a brief summary of the persona."""
@@ -0,0 +1,256 @@
+"""SQLite-backed persona library."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .persona import Persona, CompiledPrompt
+
+# Rows per executemany chunk during bulk import
+IMPORT_CHUNK_SIZE = 1000
+
+
+class PersonaStore(MutableMapping):
+    """Persistent persona library, usable as a dict of personas by name.
+
+    Each persona is stored as one JSON record alongside its summary line, so
+    listings and searches never decode full records; a record is only loaded
+    when a persona is looked up by name. Traits are indexed separately for
+    search. Compiled prompts are persisted with the persona so they survive
+    between sessions.
+    """
+
+    def __init__(self, path: str):
+        """Open (and create if needed) the store.
+
+        Args:
+            path: SQLite database path, or ":memory:" for a throwaway store
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        # Menus and simulations may read from worker threads; access is serialized by _lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS personas (
+                name TEXT PRIMARY KEY,
+                summary TEXT NOT NULL,
+                data TEXT NOT NULL,
+                compiled TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS persona_traits (
+                name TEXT NOT NULL REFERENCES personas (name) ON DELETE CASCADE,
+                trait TEXT NOT NULL COLLATE NOCASE
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_persona_traits_trait ON persona_traits (trait)")
+        if not self._db.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_persona_traits_unique'"
+        ).fetchone():
+            # Stores written before traits were unique may hold duplicate rows, which would
+            # double-count personas in trait analytics and block the unique index
+            self._db.execute(
+                "DELETE FROM persona_traits WHERE rowid NOT IN "
+                "(SELECT MIN(rowid) FROM persona_traits GROUP BY name, trait)"
+            )
+            self._db.execute("CREATE UNIQUE INDEX idx_persona_traits_unique ON persona_traits (name, trait)")
+            # Superseded by the unique index, which also leads with name
+            self._db.execute("DROP INDEX IF EXISTS idx_persona_traits_name")
+        self._db.commit()
+
+    @staticmethod
+    def _row(persona: Persona, now: float) -> tuple:
+        compiled = json.dumps(persona.compiled.to_dict()) if persona.compiled is not None else None
+        return (persona.name, persona.summary(), json.dumps(persona.to_dict()), compiled, now, now)
+
+    @staticmethod
+    def _traits(persona: Persona) -> List[str]:
+        """The persona's traits without repeats, compared case-insensitively like the trait column."""
+        traits = {}
+        for trait in persona.personality_traits:
+            traits.setdefault(trait.casefold(), trait)
+        return list(traits.values())
+
+    def _write(self, personas: List[Persona]) -> List[str]:
+        """Upsert personas and their traits; caller holds the lock and commits.
+
+        A name given more than once is written once, from its last persona.
+
+        Returns:
+            The distinct names written
+        """
+        personas = list({persona.name: persona for persona in personas}.values())
+        now = time.time()
+        self._db.executemany(
+            "INSERT INTO personas (name, summary, data, compiled, created_at, updated_at) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET summary = excluded.summary, data = excluded.data, "
+            "compiled = excluded.compiled, updated_at = excluded.updated_at",
+            [self._row(persona, now) for persona in personas]
+        )
+        self._db.executemany("DELETE FROM persona_traits WHERE name = ?", [(p.name,) for p in personas])
+        self._db.executemany(
+            "INSERT OR IGNORE INTO persona_traits (name, trait) VALUES (?, ?)",
+            [(p.name, trait) for p in personas for trait in self._traits(p)]
+        )
+        return [persona.name for persona in personas]
+
+    def __getitem__(self, name: str) -> Persona:
+        with self._lock:
+            row = self._db.execute("SELECT data, compiled FROM personas WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        persona = Persona.from_dict(json.loads(row[0]))
+        if row[1] is not None:
+            persona.compiled = CompiledPrompt.from_dict(json.loads(row[1]))
+        return persona
+
+    def __setitem__(self, name: str, persona: Persona):
+        if name != persona.name:
+            raise ValueError(f"Persona '{persona.name}' cannot be stored under the name '{name}'")
+        with self._lock:
+            self._write([persona])
+            self._db.commit()
+
+    def __delitem__(self, name: str):
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM personas WHERE name = ?", (name,)).rowcount
+            self._db.commit()
+        if not deleted:
+            raise KeyError(name)
+
+    def __contains__(self, name) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM personas WHERE name = ?", (name,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            names = [row[0] for row in self._db.execute("SELECT name FROM personas ORDER BY name")]
+        return iter(names)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM personas").fetchone()[0]
+
+    def add(self, persona: Persona):
+        """Store a persona under its own name, replacing any existing one."""
+        self[persona.name] = persona
+
+    def page(self, offset: int = 0, limit: int = 20, trait: Optional[str] = None) -> List[Tuple[str, str]]:
+        """List personas in name order without loading full records.
+
+        Args:
+            offset: Number of personas to skip
+            limit: Maximum number of personas to return
+            trait: Only include personas with this trait (case-insensitive)
+
+        Returns:
+            (name, summary) pairs
+        """
+        if offset < 0 or limit < 1:
+            raise ValueError("offset must be non-negative and limit positive")
+        with self._lock:
+            if trait is None:
+                rows = self._db.execute(
+                    "SELECT name, summary FROM personas ORDER BY name LIMIT ? OFFSET ?", (limit, offset)
+                )
+            else:
+                rows = self._db.execute(
+                    "SELECT p.name, p.summary FROM personas p "
+                    "WHERE p.name IN (SELECT name FROM persona_traits WHERE trait = ?) "
+                    "ORDER BY p.name LIMIT ? OFFSET ?",
+                    (trait, limit, offset)
+                )
+            return rows.fetchall()
+
+    def count(self, trait: Optional[str] = None) -> int:
+        """Count personas, optionally only those with a trait."""
+        if trait is None:
+            return len(self)
+        with self._lock:
+            return self._db.execute(
+                "SELECT COUNT(DISTINCT name) FROM persona_traits WHERE trait = ?", (trait,)
+            ).fetchone()[0]
+
+    def search(self, trait: str, limit: int = 100) -> List[Persona]:
+        """Load personas that have a trait (case-insensitive)."""
+        return [self[name] for name, _ in self.page(0, limit, trait=trait)]
+
+    def import_jsonl(self, path: str) -> int:
+        """Bulk load personas from a JSON Lines file, replacing any with the same name.
+
+        Returns:
+            Number of distinct personas imported
+        """
+        with open(path, encoding="utf-8") as f:
+            return self.import_lines(f)
+
+    def import_lines(self, lines: Iterable[str]) -> int:
+        """Bulk load personas from JSON lines (e.g. an open file or stdin) in one transaction.
+
+        A persona that appears more than once is stored from its last line.
+
+        Returns:
+            Number of distinct personas imported
+        """
+        imported = set()
+        with self._lock:
+            try:
+                chunk = []
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    chunk.append(Persona.from_dict(json.loads(line)))
+                    if len(chunk) >= IMPORT_CHUNK_SIZE:
+                        imported.update(self._write(chunk))
+                        chunk = []
+                if chunk:
+                    imported.update(self._write(chunk))
+                self._db.commit()
+            except Exception:
+                # A bad line leaves the store as it was
+                self._db.rollback()
+                raise
+        return len(imported)
+
+    def export_jsonl(self, path: str, include_compiled: bool = False) -> int:
+        """Write every persona to a JSON Lines file, one record per line.
+
+        Args:
+            path: Output file path
+            include_compiled: Also write each persona's compiled prompts
+
+        Returns:
+            Number of personas exported
+        """
+        exported = 0
+        with open(path, "w", encoding="utf-8") as f, self._lock:
+            for data, compiled in self._db.execute("SELECT data, compiled FROM personas ORDER BY name"):
+                if include_compiled and compiled is not None:
+                    data = json.dumps({**json.loads(data), "compiled": json.loads(compiled)})
+                f.write(data + "\n")
+                exported += 1
+        return exported
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "PersonaStore":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -0,0 +1,6 @@
+"""Scenarios module for decision simulator."""
+
+from .scenario import Scenario
+from .store import ScenarioStore
+
+__all__ = ["Scenario", "ScenarioStore"]
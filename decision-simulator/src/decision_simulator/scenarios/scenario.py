@@ -0,0 +1,43 @@
+"""Scenario class for decision simulator."""
+
+from dataclasses import dataclass, field
+from typing import Dict, Any, List
+
+
+@dataclass
+class Scenario:
+    """Pure data representation of a decision scenario."""
+
+    name: str
+    description: str
+    # Choices the personas decide between; empty means open-ended
+    options: List[str] = field(default_factory=list)
+    tags: List[str] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert scenario to dictionary for serialization."""
+        return {
+            "name": self.name,
+            "description": self.description,
+            "options": self.options,
+            "tags": self.tags,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Scenario":
+        """Create scenario from dictionary."""
+        return cls(**data)
+
+    def prompt(self) -> str:
+        """Scenario text as presented to personas."""
+        if not self.options:
+            return self.description
+        options = "\n".join(f"- {option}" for option in self.options)
+        return f"{self.description}\n\nOptions:\n{options}"
+
+    def summary(self) -> str:
+        """Get a brief summary of the scenario."""
+        parts = [f"{self.name}: {self.description}"]
+        if self.options:
+            parts.append(f"Options: {', '.join(self.options)}")
+        return " | ".join(parts)
@@ -0,0 +1,93 @@
+"""SQLite-backed scenario library."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import MutableMapping
+from typing import Iterator
+
+from .scenario import Scenario
+
+
+class ScenarioStore(MutableMapping):
+    """Persistent scenario library, usable as a dict of scenarios by name."""
+
+    def __init__(self, path: str):
+        """Open (and create if needed) the store.
+
+        Args:
+            path: SQLite database path, or ":memory:" for a throwaway store
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        # Experiment workers read from other threads; access is serialized by _lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS scenarios (
+                name TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )"""
+        )
+        self._db.commit()
+
+    def __getitem__(self, name: str) -> Scenario:
+        with self._lock:
+            row = self._db.execute("SELECT data FROM scenarios WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return Scenario.from_dict(json.loads(row[0]))
+
+    def __setitem__(self, name: str, scenario: Scenario):
+        if name != scenario.name:
+            raise ValueError(f"Scenario '{scenario.name}' cannot be stored under the name '{name}'")
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO scenarios (name, data, created_at, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET data = excluded.data, updated_at = excluded.updated_at",
+                (name, json.dumps(scenario.to_dict()), now, now)
+            )
+            self._db.commit()
+
+    def __delitem__(self, name: str):
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM scenarios WHERE name = ?", (name,)).rowcount
+            self._db.commit()
+        if not deleted:
+            raise KeyError(name)
+
+    def __contains__(self, name) -> bool:
+        with self._lock:
+            return self._db.execute("SELECT 1 FROM scenarios WHERE name = ?", (name,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            names = [row[0] for row in self._db.execute("SELECT name FROM scenarios ORDER BY name")]
+        return iter(names)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM scenarios").fetchone()[0]
+
+    def add(self, scenario: Scenario):
+        """Store a scenario under its own name, replacing any existing one."""
+        self[scenario.name] = scenario
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> "ScenarioStore":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
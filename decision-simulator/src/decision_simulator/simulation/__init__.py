@@ -0,0 +1,25 @@
+"""Simulation module for decision simulator."""
+
+from .engine import (
+    SimulationEngine,
+    SimulationResult,
+    PersonaDecision,
+    parse_decision,
+    normalize_decision,
+)
+from .experiment import ExperimentRunner
+from .results import ResultStore
+from .roundtable import RoundTable, RoundTableResult, Turn
+
+__all__ = [
+    "SimulationEngine",
+    "SimulationResult",
+    "PersonaDecision",
+    "parse_decision",
+    "normalize_decision",
+    "ExperimentRunner",
+    "ResultStore",
+    "RoundTable",
+    "RoundTableResult",
+    "Turn",
+]
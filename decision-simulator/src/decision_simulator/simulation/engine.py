@@ -0,0 +1,261 @@
+"""Run a scenario against many personas and aggregate their decisions."""
+
+import random
+import re
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..agent import CallEvent, capture_calls
+from ..personas import Persona, compile_system_prompt
+
+DECISION_FORMAT = """Format your response as:
+DECISION: [your decision]
+OUTCOME: [predicted outcome]
+REASONING: [brief explanation]"""
+
+PERSONA_DECISION_TEMPLATE = """Scenario: {scenario}
+
+Staying fully in character, decide what you would do in this scenario and what you expect to happen as a result.
+
+""" + DECISION_FORMAT
+
+# Minimum word overlap (Jaccard) for two outcomes to share a cluster
+OUTCOME_SIMILARITY = 0.5
+
+_FIELD_PATTERN = re.compile(r"^[\s*#>_-]*(DECISION|OUTCOME|REASONING)[\s*_]*:[\s*_]*(.*)$", re.IGNORECASE)
+_WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+def parse_decision(response: str) -> Dict[str, str]:
+    """Parse a DECISION/OUTCOME/REASONING reply into structured data.
+
+    Field labels may be in any case and wrapped in markdown emphasis; a field
+    that is missing from the reply is returned as an empty string.
+    """
+    result = {"decision": "", "outcome": "", "reasoning": ""}
+    for line in response.strip().split("\n"):
+        match = _FIELD_PATTERN.match(line)
+        if match:
+            result[match.group(1).lower()] = match.group(2).strip()
+    return result
+
+
+def call_usage(calls: List[CallEvent]) -> Dict[str, Any]:
+    """Model, token and latency totals for the calls behind one result."""
+    return {
+        "model": calls[-1].model if calls else "",
+        "prompt_tokens": sum(call.prompt_tokens for call in calls),
+        "completion_tokens": sum(call.completion_tokens for call in calls),
+        "latency": sum(call.latency for call in calls),
+    }
+
+
+def normalize_decision(decision: str) -> str:
+    """Canonical form of a decision for vote counting."""
+    return " ".join(_WORD_PATTERN.findall(decision.lower()))
+
+
+@dataclass
+class PersonaDecision:
+    """One persona's decision in a scenario."""
+    persona: str
+    decision: str = ""
+    outcome: str = ""
+    reasoning: str = ""
+    error: Optional[str] = None
+    # Usage of the decision call (prompt compilation is not included)
+    model: str = ""
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert decision to dictionary for serialization."""
+        return asdict(self)
+
+
+@dataclass
+class SimulationResult:
+    """All persona decisions for one scenario, with aggregate views."""
+    scenario: str
+    decisions: List[PersonaDecision] = field(default_factory=list)
+
+    @property
+    def completed(self) -> List[PersonaDecision]:
+        """Decisions from personas whose call succeeded."""
+        return [d for d in self.decisions if d.error is None]
+
+    @property
+    def failed(self) -> List[PersonaDecision]:
+        """Decisions from personas whose call failed."""
+        return [d for d in self.decisions if d.error is not None]
+
+    def votes(self) -> List[Dict[str, Any]]:
+        """Vote distribution over decisions, most common first.
+
+        Decisions differing only in case and punctuation count as the same
+        vote, labelled with the first wording seen.
+        """
+        counts = Counter()
+        labels: Dict[str, str] = {}
+        voters: Dict[str, List[str]] = {}
+        for d in self.completed:
+            key = normalize_decision(d.decision)
+            counts[key] += 1
+            labels.setdefault(key, d.decision)
+            voters.setdefault(key, []).append(d.persona)
+        total = sum(counts.values())
+        return [
+            {"decision": labels[key], "votes": count, "share": count / total, "personas": voters[key]}
+            for key, count in counts.most_common()
+        ]
+
+    def outcome_clusters(self, threshold: float = OUTCOME_SIMILARITY) -> List[Dict[str, Any]]:
+        """Group similar predicted outcomes, largest group first.
+
+        Each outcome joins the first cluster whose representative shares at
+        least threshold of its words (Jaccard similarity), or starts a new one.
+        """
+        clusters: List[Dict[str, Any]] = []
+        for d in self.completed:
+            words = set(_WORD_PATTERN.findall(d.outcome.lower()))
+            for cluster in clusters:
+                union = words | cluster["words"]
+                if union and len(words & cluster["words"]) / len(union) >= threshold:
+                    cluster["personas"].append(d.persona)
+                    break
+            else:
+                clusters.append({"outcome": d.outcome, "words": words, "personas": [d.persona]})
+        clusters.sort(key=lambda cluster: len(cluster["personas"]), reverse=True)
+        return [
+            {"outcome": cluster["outcome"], "size": len(cluster["personas"]), "personas": cluster["personas"]}
+            for cluster in clusters
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert result to dictionary for serialization."""
+        return {"scenario": self.scenario, "decisions": [d.to_dict() for d in self.decisions]}
+
+
+class SimulationEngine:
+    """Runs a scenario against many personas concurrently.
+
+    Each persona answers as its own agent, using the roleplay system prompt
+    compiled for the scenario. Compiled prompts are reused from the persona
+    and, when a store is given, saved back to it so later runs skip
+    compilation.
+    """
+
+    def __init__(self, runtime, max_in_flight: Optional[int] = None, store=None):
+        """Initialize the engine.
+
+        Args:
+            runtime: AgentRuntime used for all calls
+            max_in_flight: Maximum personas processed at once
+                (defaults to the runtime's max_concurrency)
+            store: PersonaStore to save newly compiled prompts to
+        """
+        if runtime is None:
+            raise ValueError("Runtime cannot be None")
+        if max_in_flight is None:
+            max_in_flight = runtime.max_concurrency
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.runtime = runtime
+        self.max_in_flight = max_in_flight
+        self.store = store
+        # Per-persona locks so concurrent calls for one persona compile its prompt once
+        self._compile_locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def system_prompt(self, persona: Persona, scenario: str) -> str:
+        """Compile (or reuse) the persona's prompt for a scenario, saving new work to the store."""
+        with self._locks_guard:
+            lock = self._compile_locks.setdefault(persona.name, threading.Lock())
+        with lock:
+            before = self._compiled_state(persona)
+            system_prompt = compile_system_prompt(persona, self.runtime, scenario, verbose=False)
+            if self.store is not None and self._compiled_state(persona) != before:
+                self.store.add(persona)
+        return system_prompt
+
+    @staticmethod
+    def _compiled_state(persona: Persona) -> Optional[Tuple[str, int]]:
+        compiled = persona.compiled
+        return (compiled.fingerprint, len(compiled.system_prompts)) if compiled is not None else None
+
+    def decide(self, scenario: str, persona: Persona, temperature: Optional[float] = None,
+               seed: Optional[int] = None) -> PersonaDecision:
+        """Get one persona's decision; failures are recorded on the result, not raised."""
+        try:
+            system_prompt = self.system_prompt(persona, scenario)
+            agent = self.runtime.create_agent(name=persona.name, instruction=system_prompt)
+            with capture_calls() as calls:
+                response = agent.send(
+                    PERSONA_DECISION_TEMPLATE.format(scenario=scenario),
+                    add_to_history=False,
+                    temperature=temperature,
+                    seed=seed
+                )
+        except Exception as e:
+            return PersonaDecision(persona=persona.name, error=str(e))
+        return PersonaDecision(persona=persona.name, **parse_decision(response), **call_usage(calls))
+
+    def run_iter(self, scenario: str, personas: Sequence[Persona], temperature: Optional[float] = None,
+                 seed: Optional[int] = None) -> Iterator[PersonaDecision]:
+        """Run the scenario and yield each persona's decision as it completes.
+
+        Args:
+            scenario: The decision scenario
+            personas: Personas to run it against
+            temperature: Sampling temperature for every persona
+            seed: Base seed; the i-th persona is sent with seed + i
+
+        Yields:
+            PersonaDecision objects in completion order
+        """
+        for _, decision in self._run_indexed(scenario, personas, temperature, seed):
+            yield decision
+
+    def _run_indexed(self, scenario: str, personas: Sequence[Persona], temperature: Optional[float],
+                     seed: Optional[int]) -> Iterator[Tuple[int, PersonaDecision]]:
+        """Yield (persona index, decision) tuples in completion order."""
+        if seed is None:
+            # Distinct requests per persona, so a response cache never merges runs
+            seed = random.randrange(2**31)
+        executor = ThreadPoolExecutor(max_workers=min(self.max_in_flight, max(len(personas), 1)))
+        try:
+            futures = {
+                executor.submit(self.decide, scenario, persona, temperature, seed + i): i
+                for i, persona in enumerate(personas)
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # Abandoning the generator early should not leave queued requests running
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, scenario: str, personas: Sequence[Persona], temperature: Optional[float] = None,
+            seed: Optional[int] = None,
+            on_decision: Optional[Callable[[PersonaDecision], None]] = None) -> SimulationResult:
+        """Run the scenario against every persona.
+
+        Args:
+            scenario: The decision scenario
+            personas: Personas to run it against
+            temperature: Sampling temperature for every persona
+            seed: Base seed; the i-th persona is sent with seed + i
+            on_decision: Called with each decision as it completes
+
+        Returns:
+            SimulationResult with decisions in persona order
+        """
+        decisions: List[Optional[PersonaDecision]] = [None] * len(personas)
+        for i, decision in self._run_indexed(scenario, personas, temperature, seed):
+            decisions[i] = decision
+            if on_decision is not None:
+                on_decision(decision)
+        return SimulationResult(scenario, decisions)
@@ -0,0 +1,306 @@
+"""Resumable scenarios x personas x iterations experiment runs."""
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .engine import SimulationEngine, SimulationResult, PersonaDecision
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class ExperimentRunner:
+    """Runs the full scenario x persona x iteration matrix as a resumable job.
+
+    Every cell of the matrix is a work item in SQLite. Workers claim pending
+    cells, run them through a SimulationEngine and record each result as soon
+    as it is in, so a crashed or interrupted run resumes from the cells that
+    had not finished. Cells keep the seed they were created with, so with a
+    response cache a resumed run reproduces the cells it re-runs.
+    """
+
+    def __init__(self, runtime, path: str, scenarios, personas, workers: Optional[int] = None,
+                 results=None):
+        """Initialize the runner.
+
+        Args:
+            runtime: AgentRuntime used for all calls
+            path: SQLite database path for experiments and their cells
+            scenarios: ScenarioStore the experiment's scenarios are read from
+            personas: PersonaStore the experiment's personas are read from
+            workers: Parallel workers draining the queue
+                (defaults to the runtime's max_concurrency)
+            results: ResultStore that also receives every finished cell, as a run
+                whose id is the experiment id
+        """
+        if runtime is None:
+            raise ValueError("Runtime cannot be None")
+        if workers is None:
+            workers = runtime.max_concurrency
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        self.runtime = runtime
+        self.scenarios = scenarios
+        self.personas = personas
+        self.workers = workers
+        self.result_store = results
+        self.engine = SimulationEngine(runtime, max_in_flight=workers, store=personas)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Workers record results from their own threads; access is serialized by _lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS experiments (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                config TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS experiment_cells (
+                experiment_id TEXT NOT NULL REFERENCES experiments (id),
+                scenario TEXT NOT NULL,
+                persona TEXT NOT NULL,
+                iteration INTEGER NOT NULL,
+                seed INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                decision TEXT,
+                outcome TEXT,
+                reasoning TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (experiment_id, scenario, persona, iteration)
+            )"""
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_experiment_cells_status ON experiment_cells (experiment_id, status)"
+        )
+        self._db.commit()
+
+    def create(self, scenario_names: Sequence[str], persona_names: Sequence[str], iterations: int = 1,
+               temperature: Optional[float] = None, seed: Optional[int] = None,
+               name: Optional[str] = None) -> str:
+        """Create an experiment and queue every cell of its matrix.
+
+        Args:
+            scenario_names: Scenarios to run, by name
+            persona_names: Personas to run them against, by name
+            iterations: Runs of each scenario/persona pair
+            temperature: Sampling temperature for every cell
+            seed: Base seed; each cell gets a distinct seed derived from it
+            name: Label for the experiment
+
+        Returns:
+            The experiment id
+        """
+        if iterations < 1:
+            raise ValueError("iterations must be at least 1")
+        if not scenario_names or not persona_names:
+            raise ValueError("An experiment needs at least one scenario and one persona")
+        missing = [n for n in scenario_names if n not in self.scenarios]
+        missing += [n for n in persona_names if n not in self.personas]
+        if missing:
+            raise ValueError(f"Unknown scenarios or personas: {', '.join(missing)}")
+        if seed is None:
+            seed = random.randrange(2**31)
+
+        experiment_id = uuid.uuid4().hex[:12]
+        config = {
+            "scenarios": list(scenario_names),
+            "personas": list(persona_names),
+            "iterations": iterations,
+            "temperature": temperature,
+            "seed": seed,
+        }
+        now = time.time()
+        cells = [
+            (experiment_id, scenario, persona, iteration, seed + ordinal, PENDING, now)
+            for ordinal, (scenario, persona, iteration) in enumerate(
+                (scenario, persona, iteration)
+                for scenario in scenario_names
+                for persona in persona_names
+                for iteration in range(iterations)
+            )
+        ]
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO experiments (id, name, config, created_at) VALUES (?, ?, ?, ?)",
+                (experiment_id, name or experiment_id, json.dumps(config), now)
+            )
+            self._db.executemany(
+                "INSERT INTO experiment_cells "
+                "(experiment_id, scenario, persona, iteration, seed, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                cells
+            )
+            self._db.commit()
+        return experiment_id
+
+    def experiments(self) -> List[Dict[str, Any]]:
+        """All experiments with their progress, newest first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, name, config, created_at FROM experiments ORDER BY created_at DESC"
+            ).fetchall()
+        return [
+            {"id": id_, "name": name, "config": json.loads(config), "created_at": created_at,
+             "progress": self.progress(id_)}
+            for id_, name, config, created_at in rows
+        ]
+
+    def config(self, experiment_id: str) -> Dict[str, Any]:
+        """The settings an experiment was created with."""
+        with self._lock:
+            row = self._db.execute("SELECT config FROM experiments WHERE id = ?", (experiment_id,)).fetchone()
+        if row is None:
+            raise ValueError(f"Unknown experiment: {experiment_id}")
+        return json.loads(row[0])
+
+    def progress(self, experiment_id: str) -> Dict[str, int]:
+        """Cell counts by status."""
+        counts = dict.fromkeys((PENDING, RUNNING, DONE, FAILED), 0)
+        with self._lock:
+            for status, count in self._db.execute(
+                "SELECT status, COUNT(*) FROM experiment_cells WHERE experiment_id = ? GROUP BY status",
+                (experiment_id,)
+            ):
+                counts[status] = count
+        counts["total"] = sum(counts.values())
+        return counts
+
+    def run(self, experiment_id: str, retry_failed: bool = False,
+            on_cell: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, int]:
+        """Run (or resume) an experiment until no pending cells remain.
+
+        Cells left running by an interrupted run are queued again, and cells
+        already done are skipped.
+
+        Args:
+            experiment_id: The experiment to run
+            retry_failed: Also queue cells that failed on an earlier run
+            on_cell: Called with each finished cell's record
+
+        Returns:
+            Cell counts by status once the queue is drained
+        """
+        config = self.config(experiment_id)
+        requeue = (RUNNING, FAILED) if retry_failed else (RUNNING,)
+        with self._lock:
+            self._db.execute(
+                f"UPDATE experiment_cells SET status = ? WHERE experiment_id = ? "
+                f"AND status IN ({', '.join('?' * len(requeue))})",
+                (PENDING, experiment_id, *requeue)
+            )
+            self._db.commit()
+
+        if self.result_store is not None:
+            self.result_store.start_run("experiment", config=config, run_id=experiment_id)
+        scenarios = {name: self.scenarios[name].prompt() for name in config["scenarios"]}
+        # Loaded once per run and shared by workers, so each persona's prompt compiles once
+        personas: Dict[str, Any] = {}
+        personas_lock = threading.Lock()
+
+        def persona(name: str):
+            with personas_lock:
+                if name not in personas:
+                    personas[name] = self.personas[name]
+                return personas[name]
+
+        stop = threading.Event()
+
+        def work():
+            while not stop.is_set():
+                cell = self._claim(experiment_id)
+                if cell is None:
+                    return
+                scenario, persona_name, iteration, seed = cell
+                try:
+                    decision = self.engine.decide(
+                        scenarios[scenario], persona(persona_name), config["temperature"], seed
+                    )
+                except Exception as e:
+                    # A persona deleted since the experiment was created, for example
+                    decision = PersonaDecision(persona=persona_name, error=str(e))
+                record = self._record(experiment_id, scenario, iteration, decision)
+                if on_cell is not None:
+                    on_cell(record)
+
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+        try:
+            futures = [executor.submit(work) for _ in range(self.workers)]
+            wait(futures, return_when=FIRST_EXCEPTION)
+            for future in futures:
+                if future.done():
+                    future.result()
+        finally:
+            # On an error or interrupt, workers finish their current cell and stop claiming
+            stop.set()
+            executor.shutdown(wait=True)
+        return self.progress(experiment_id)
+
+    def _claim(self, experiment_id: str) -> Optional[tuple]:
+        """Mark the next pending cell as running and return it."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT rowid, scenario, persona, iteration, seed FROM experiment_cells "
+                "WHERE experiment_id = ? AND status = ? LIMIT 1",
+                (experiment_id, PENDING)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE experiment_cells SET status = ?, attempts = attempts + 1, updated_at = ? WHERE rowid = ?",
+                (RUNNING, time.time(), row[0])
+            )
+            self._db.commit()
+        return row[1:]
+
+    def _record(self, experiment_id: str, scenario: str, iteration: int,
+                decision: PersonaDecision) -> Dict[str, Any]:
+        """Store a finished cell."""
+        status = DONE if decision.error is None else FAILED
+        with self._lock:
+            self._db.execute(
+                "UPDATE experiment_cells SET status = ?, decision = ?, outcome = ?, reasoning = ?, error = ?, "
+                "updated_at = ? WHERE experiment_id = ? AND scenario = ? AND persona = ? AND iteration = ?",
+                (status, decision.decision, decision.outcome, decision.reasoning, decision.error,
+                 time.time(), experiment_id, scenario, decision.persona, iteration)
+            )
+            self._db.commit()
+        record = {"scenario": scenario, "iteration": iteration, "status": status, **decision.to_dict()}
+        if self.result_store is not None:
+            self.result_store.append(experiment_id, [record])
+        return record
+
+    def results(self, experiment_id: str) -> Dict[str, SimulationResult]:
+        """Finished cells grouped by scenario, as SimulationResults."""
+        results: Dict[str, SimulationResult] = {}
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT scenario, persona, decision, outcome, reasoning, error FROM experiment_cells "
+                "WHERE experiment_id = ? AND status IN (?, ?) ORDER BY scenario, persona, iteration",
+                (experiment_id, DONE, FAILED)
+            ).fetchall()
+        for scenario, persona, decision, outcome, reasoning, error in rows:
+            result = results.setdefault(scenario, SimulationResult(scenario))
+            result.decisions.append(PersonaDecision(persona, decision or "", outcome or "", reasoning or "", error))
+        return results
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
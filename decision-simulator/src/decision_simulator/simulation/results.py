@@ -0,0 +1,324 @@
+"""Append-only warehouse of simulation results."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from .engine import SimulationResult, PersonaDecision, normalize_decision
+
+# Columns of a result row, in storage and export order
+RESULT_COLUMNS = (
+    "run_id", "scenario", "persona", "iteration", "decision", "decision_key", "outcome", "reasoning",
+    "error", "model", "prompt_tokens", "completion_tokens", "latency", "created_at",
+)
+
+# Rows fetched per round trip when streaming or exporting
+FETCH_SIZE = 5000
+
+
+class ResultStore:
+    """Append-only SQLite store of simulation results with aggregation queries.
+
+    Each run (one simulate call, one multi-persona simulation or one
+    experiment) is recorded with its metadata, and every decision in it is one
+    row with the model, tokens and latency of the call that produced it. Rows
+    are never updated. Aggregations run as SQL, so they do not need the rows
+    in memory. Queries by persona trait join against the persona store's
+    trait index and need the persona store in the same database.
+    """
+
+    def __init__(self, path: str):
+        """Open (and create if needed) the store.
+
+        Args:
+            path: SQLite database path, or ":memory:" for a throwaway store
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        # Simulations record results from worker threads; access is serialized by _lock
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS simulation_runs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                scenario TEXT,
+                config TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute(
+            """CREATE TABLE IF NOT EXISTS simulation_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_id TEXT NOT NULL REFERENCES simulation_runs (id),
+                scenario TEXT,
+                persona TEXT,
+                iteration INTEGER NOT NULL DEFAULT 0,
+                decision TEXT NOT NULL,
+                decision_key TEXT NOT NULL,
+                outcome TEXT NOT NULL,
+                reasoning TEXT NOT NULL,
+                error TEXT,
+                model TEXT,
+                prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                completion_tokens INTEGER NOT NULL DEFAULT 0,
+                latency REAL NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL
+            )"""
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_simulation_results_run ON simulation_results (run_id)")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_simulation_results_persona ON simulation_results (persona)"
+        )
+        self._db.commit()
+
+    def start_run(self, kind: str, scenario: Optional[str] = None, config: Optional[Dict[str, Any]] = None,
+                  run_id: Optional[str] = None) -> str:
+        """Record a new run and return its id.
+
+        Args:
+            kind: What produced the run (simulate, personas, experiment, ...)
+            scenario: Scenario text, when the whole run shares one
+            config: Run settings worth keeping (iterations, temperature, seed, ...)
+            run_id: Use this id instead of a generated one; an existing run is reused
+        """
+        run_id = run_id or uuid.uuid4().hex[:12]
+        with self._lock:
+            self._db.execute(
+                "INSERT OR IGNORE INTO simulation_runs (id, kind, scenario, config, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (run_id, kind, scenario, json.dumps(config or {}, default=str), time.time())
+            )
+            self._db.commit()
+        return run_id
+
+    def append(self, run_id: str, rows: Iterable[Dict[str, Any]]):
+        """Append result rows to a run.
+
+        Each row has at least decision, outcome and reasoning; scenario,
+        persona, iteration, error, model, prompt_tokens, completion_tokens and
+        latency are optional.
+        """
+        now = time.time()
+        records = [
+            (
+                run_id,
+                row.get("scenario"),
+                row.get("persona"),
+                row.get("iteration", 0),
+                row.get("decision", ""),
+                normalize_decision(row.get("decision", "")),
+                row.get("outcome", ""),
+                row.get("reasoning", ""),
+                row.get("error"),
+                row.get("model"),
+                row.get("prompt_tokens", 0),
+                row.get("completion_tokens", 0),
+                row.get("latency", 0.0),
+                now,
+            )
+            for row in rows
+        ]
+        with self._lock:
+            self._db.executemany(
+                f"INSERT INTO simulation_results ({', '.join(RESULT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(RESULT_COLUMNS))})",
+                records
+            )
+            self._db.commit()
+
+    def record(self, result: SimulationResult, kind: str = "personas",
+               config: Optional[Dict[str, Any]] = None) -> str:
+        """Store a multi-persona SimulationResult as a new run and return its id."""
+        run_id = self.start_run(kind, result.scenario, config)
+        self.append(run_id, ({"scenario": result.scenario, **d.to_dict()} for d in result.decisions))
+        return run_id
+
+    def runs(self, limit: int = 20, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Most recent runs first, with their row counts."""
+        query = (
+            "SELECT r.id, r.kind, r.scenario, r.config, r.created_at, "
+            "(SELECT COUNT(*) FROM simulation_results s WHERE s.run_id = r.id) "
+            "FROM simulation_runs r"
+        )
+        params: List[Any] = []
+        if kind is not None:
+            query += " WHERE r.kind = ?"
+            params.append(kind)
+        query += " ORDER BY r.created_at DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [
+            {"id": id_, "kind": kind_, "scenario": scenario, "config": json.loads(config),
+             "created_at": created_at, "rows": count}
+            for id_, kind_, scenario, config, created_at, count in rows
+        ]
+
+    def rows(self, run_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Stream result rows, optionally for one run, in insertion order."""
+        query = f"SELECT id, {', '.join(RESULT_COLUMNS)} FROM simulation_results WHERE id > ?"
+        if run_id is not None:
+            query += " AND run_id = ?"
+        query += " ORDER BY id LIMIT ?"
+        # Page by id so the lock is not held while the caller consumes rows
+        last_id = 0
+        while True:
+            params = (last_id, run_id, FETCH_SIZE) if run_id is not None else (last_id, FETCH_SIZE)
+            with self._lock:
+                page = self._db.execute(query, params).fetchall()
+            if not page:
+                return
+            for row in page:
+                yield dict(zip(RESULT_COLUMNS, row[1:]))
+            last_id = page[-1][0]
+
+    def load(self, run_id: str) -> SimulationResult:
+        """Rebuild the SimulationResult for a run."""
+        with self._lock:
+            run = self._db.execute("SELECT scenario FROM simulation_runs WHERE id = ?", (run_id,)).fetchone()
+        if run is None:
+            raise ValueError(f"Unknown run: {run_id}")
+        result = SimulationResult(run[0] or "")
+        fields = ("persona", "decision", "outcome", "reasoning", "error", "model",
+                  "prompt_tokens", "completion_tokens", "latency")
+        for row in self.rows(run_id):
+            result.decisions.append(PersonaDecision(**{key: row[key] for key in fields if row[key] is not None}))
+        return result
+
+    def decision_frequencies(self, run_id: Optional[str] = None, by: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Count decisions, optionally grouped by persona or persona trait.
+
+        Decisions are counted by their normalized form and labelled with one
+        of their wordings. Failed calls are excluded.
+
+        Args:
+            run_id: Only count this run's rows
+            by: None, "persona", "scenario" or "trait"
+
+        Returns:
+            Rows with the group (if any), decision, count and share of the group
+        """
+        groups = {None: None, "persona": "s.persona", "scenario": "s.scenario", "trait": "t.trait"}
+        if by not in groups:
+            raise ValueError(f"Cannot group decisions by {by}")
+        group = groups[by] or "''"
+        join = " JOIN persona_traits t ON t.name = s.persona" if by == "trait" else ""
+        where = "WHERE s.error IS NULL" + (" AND s.run_id = ?" if run_id else "")
+        query = f"""
+            WITH counts AS (
+                SELECT {group} AS grp, s.decision_key, MIN(s.decision) AS decision, COUNT(*) AS n
+                FROM simulation_results s{join}
+                {where}
+                GROUP BY grp, s.decision_key
+            )
+            SELECT grp, decision, n, CAST(n AS REAL) / SUM(n) OVER (PARTITION BY grp)
+            FROM counts
+            ORDER BY grp, n DESC
+        """
+        with self._lock:
+            rows = self._db.execute(query, (run_id,) if run_id else ()).fetchall()
+        return [
+            {**({by: grp} if by else {}), "decision": decision, "count": n, "share": share}
+            for grp, decision, n, share in rows
+        ]
+
+    def outcome_variance(self, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """How consistently each persona decides a scenario across iterations.
+
+        Returns:
+            Per scenario/persona rows with the number of iterations, distinct
+            decisions and distinct outcomes, and the modal decision's share
+            (1.0 means every iteration agreed); least consistent first
+        """
+        where = "WHERE error IS NULL" + (" AND run_id = ?" if run_id else "")
+        query = f"""
+            WITH counts AS (
+                SELECT scenario, persona, decision_key, COUNT(*) AS n
+                FROM simulation_results
+                {where}
+                GROUP BY scenario, persona, decision_key
+            ),
+            outcomes AS (
+                SELECT scenario, persona, COUNT(DISTINCT LOWER(TRIM(outcome))) AS distinct_outcomes
+                FROM simulation_results
+                {where}
+                GROUP BY scenario, persona
+            )
+            SELECT c.scenario, c.persona, SUM(c.n), COUNT(*), o.distinct_outcomes,
+                   CAST(MAX(c.n) AS REAL) / SUM(c.n) AS modal_share
+            FROM counts c JOIN outcomes o
+                ON o.scenario IS c.scenario AND o.persona IS c.persona
+            GROUP BY c.scenario, c.persona
+            ORDER BY modal_share, c.scenario, c.persona
+        """
+        params = (run_id, run_id) if run_id else ()
+        with self._lock:
+            rows = self._db.execute(query, params).fetchall()
+        return [
+            {"scenario": scenario, "persona": persona, "iterations": total, "distinct_decisions": decisions,
+             "distinct_outcomes": outcomes, "modal_share": share}
+            for scenario, persona, total, decisions, outcomes, share in rows
+        ]
+
+    def usage(self, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Token and latency totals per model."""
+        where = " WHERE run_id = ?" if run_id else ""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT model, COUNT(*), SUM(error IS NOT NULL), SUM(prompt_tokens), SUM(completion_tokens), "
+                f"SUM(latency), AVG(latency) FROM simulation_results{where} GROUP BY model ORDER BY model",
+                (run_id,) if run_id else ()
+            ).fetchall()
+        return [
+            {"model": model, "rows": n, "errors": errors, "prompt_tokens": prompt, "completion_tokens": completion,
+             "total_latency": total, "mean_latency": mean}
+            for model, n, errors, prompt, completion, total, mean in rows
+        ]
+
+    def export_parquet(self, path: str, run_id: Optional[str] = None) -> int:
+        """Write result rows to a Parquet file (requires the optional pyarrow package).
+
+        Rows are written in chunks, so the export never holds the whole table
+        in memory.
+
+        Returns:
+            Number of rows written
+        """
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ValueError("Parquet export requires the pyarrow package") from e
+
+        schema = pa.schema([
+            ("run_id", pa.string()), ("scenario", pa.string()), ("persona", pa.string()),
+            ("iteration", pa.int64()), ("decision", pa.string()), ("decision_key", pa.string()),
+            ("outcome", pa.string()), ("reasoning", pa.string()), ("error", pa.string()),
+            ("model", pa.string()), ("prompt_tokens", pa.int64()), ("completion_tokens", pa.int64()),
+            ("latency", pa.float64()), ("created_at", pa.float64()),
+        ])
+        written = 0
+        chunk: List[Dict[str, Any]] = []
+        with pq.ParquetWriter(path, schema) as writer:
+            for row in self.rows(run_id):
+                chunk.append(row)
+                if len(chunk) >= FETCH_SIZE:
+                    writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                    written += len(chunk)
+                    chunk = []
+            if chunk:
+                writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+                written += len(chunk)
+        return written
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,230 @@
+"""Round-table discussions where personas react to each other on a scenario."""
+
+import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..agent import capture_calls
+from ..personas import Persona
+from .engine import DECISION_FORMAT, PersonaDecision, SimulationEngine, SimulationResult, call_usage, parse_decision
+
+OPENING_TEMPLATE = """Scenario: {scenario}
+
+You are taking part in a round-table discussion of this scenario with {others} other participants. Staying fully in character, give your opening position in a few sentences."""
+
+TURN_TEMPLATE = """Scenario: {scenario}
+
+This is round {round} of a round-table discussion of this scenario. Your last position:
+{own}
+
+The latest positions of other participants:
+{view}
+
+Staying fully in character, respond to the others in a few sentences. You may change your mind."""
+
+CLOSING_TEMPLATE = """Scenario: {scenario}
+
+The round-table discussion of this scenario is over. Your last position:
+{own}
+
+The latest positions of other participants:
+{view}
+
+Staying fully in character, decide what you would do in this scenario and what you expect to happen as a result.
+
+""" + DECISION_FORMAT
+
+
+@dataclass
+class Turn:
+    """One participant's contribution to one round."""
+    round: int
+    speaker: str
+    content: str = ""
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert turn to dictionary for serialization."""
+        return asdict(self)
+
+
+@dataclass
+class RoundTableResult:
+    """The shared transcript of a discussion and the decisions that closed it."""
+    scenario: str
+    transcript: List[Turn] = field(default_factory=list)
+    decisions: Optional[SimulationResult] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert result to dictionary for serialization."""
+        return {
+            "scenario": self.scenario,
+            "transcript": [turn.to_dict() for turn in self.transcript],
+            "decisions": self.decisions.to_dict() if self.decisions is not None else None,
+        }
+
+
+class RoundTable:
+    """Runs a multi-round discussion between personas on a shared transcript.
+
+    In each round every participant responds to the positions from the end of
+    the previous round, so the turns of a round are independent and are sent
+    concurrently. Participants keep no conversation history: each turn sends
+    the persona's system prompt plus a compact view holding the speaker's own
+    last position and the latest position of up to view_size others, each cut
+    to excerpt_chars. The prompt size per turn is bounded regardless of how
+    many rounds have been played, rather than growing with the transcript.
+    """
+
+    def __init__(self, runtime, max_in_flight: Optional[int] = None, store=None, rounds: int = 3,
+                 view_size: int = 12, excerpt_chars: int = 400):
+        """Initialize the round table.
+
+        Args:
+            runtime: AgentRuntime used for all calls
+            max_in_flight: Maximum turns sent at once
+                (defaults to the runtime's max_concurrency)
+            store: PersonaStore to save newly compiled prompts to
+            rounds: Discussion rounds, including the opening round
+            view_size: Most other participants' positions shown in one turn
+            excerpt_chars: Longest excerpt of any one position shown to others
+        """
+        if rounds < 1:
+            raise ValueError("rounds must be at least 1")
+        if view_size < 1:
+            raise ValueError("view_size must be at least 1")
+        if excerpt_chars < 1:
+            raise ValueError("excerpt_chars must be at least 1")
+        self.engine = SimulationEngine(runtime, max_in_flight=max_in_flight, store=store)
+        self.runtime = runtime
+        self.rounds = rounds
+        self.view_size = view_size
+        self.excerpt_chars = excerpt_chars
+
+    def _excerpt(self, text: str) -> str:
+        text = " ".join(text.split())
+        if len(text) <= self.excerpt_chars:
+            return text
+        return text[:self.excerpt_chars - 3].rstrip() + "..."
+
+    def view(self, index: int, names: Sequence[str], latest: Dict[str, Turn]) -> str:
+        """The other participants' latest positions as seen by the participant at index.
+
+        With more participants than view_size, each participant sees the
+        view_size participants seated after it, so every position still
+        reaches someone in every round.
+        """
+        lines = []
+        for offset in range(1, len(names)):
+            if len(lines) == self.view_size:
+                break
+            name = names[(index + offset) % len(names)]
+            turn = latest.get(name)
+            if turn is not None:
+                lines.append(f"- {name}: {self._excerpt(turn.content)}")
+        return "\n".join(lines) or "(no positions yet)"
+
+    def run(self, scenario: str, personas: Sequence[Persona], temperature: Optional[float] = None,
+            seed: Optional[int] = None, decide: bool = True,
+            on_turn: Optional[Callable[[Turn], None]] = None) -> RoundTableResult:
+        """Run the discussion.
+
+        Args:
+            scenario: The decision scenario
+            personas: Participants, in seating order
+            temperature: Sampling temperature for every turn
+            seed: Base seed; every turn is sent with a distinct seed derived from it
+            decide: Close the discussion with a round in which every participant
+                gives a DECISION/OUTCOME/REASONING answer
+            on_turn: Called with each turn as it completes
+
+        Returns:
+            RoundTableResult with the transcript in round then seating order
+        """
+        names = [persona.name for persona in personas]
+        if len(set(names)) != len(names):
+            raise ValueError("Participants must have distinct names")
+        if seed is None:
+            seed = random.randrange(2**31)
+
+        result = RoundTableResult(scenario)
+        agents: List[Any] = [None] * len(personas)
+        errors: Dict[int, str] = {}
+        # Each participant's most recent successful turn; views are built from
+        # this rather than from the whole transcript
+        latest: Dict[str, Turn] = {}
+        decisions: List[Optional[PersonaDecision]] = [None] * len(personas)
+        total = self.rounds + (1 if decide else 0)
+
+        executor = ThreadPoolExecutor(max_workers=min(self.engine.max_in_flight, max(len(personas), 1)))
+        try:
+            compiling = {
+                executor.submit(self.engine.system_prompt, persona, scenario): i
+                for i, persona in enumerate(personas)
+            }
+            for future in as_completed(compiling):
+                i = compiling[future]
+                try:
+                    agents[i] = self.runtime.create_agent(name=names[i], instruction=future.result())
+                except Exception as e:
+                    # Participants whose prompt cannot be compiled sit the discussion out
+                    errors[i] = str(e)
+
+            for round_number in range(1, total + 1):
+                closing = decide and round_number == total
+                futures = {}
+                for i, agent in enumerate(agents):
+                    if agent is None:
+                        continue
+                    own = latest.get(names[i])
+                    prompt = self._prompt(round_number, closing, scenario, len(names) - 1,
+                                          own.content if own else "(none yet)", self.view(i, names, latest))
+                    turn_seed = seed + (round_number - 1) * len(personas) + i
+                    futures[executor.submit(self._send, agent, prompt, temperature, turn_seed)] = i
+
+                turns: List[Optional[Turn]] = [None] * len(personas)
+                for future in as_completed(futures):
+                    i = futures[future]
+                    response, error, calls = future.result()
+                    turn = Turn(round_number, names[i], response or "", error)
+                    turns[i] = turn
+                    if closing:
+                        decisions[i] = (
+                            PersonaDecision(persona=names[i], error=error) if error is not None else
+                            PersonaDecision(persona=names[i], **parse_decision(response), **call_usage(calls))
+                        )
+                    if on_turn is not None:
+                        on_turn(turn)
+
+                # The round's positions become visible together, once every turn is in
+                for turn in turns:
+                    if turn is None:
+                        continue
+                    result.transcript.append(turn)
+                    if turn.error is None:
+                        latest[turn.speaker] = turn
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if decide:
+            for i, error in errors.items():
+                decisions[i] = PersonaDecision(persona=names[i], error=error)
+            result.decisions = SimulationResult(scenario, decisions)
+        return result
+
+    def _prompt(self, round_number: int, closing: bool, scenario: str, others: int, own: str, view: str) -> str:
+        if closing:
+            return CLOSING_TEMPLATE.format(scenario=scenario, own=own, view=view)
+        if round_number == 1:
+            return OPENING_TEMPLATE.format(scenario=scenario, others=others)
+        return TURN_TEMPLATE.format(scenario=scenario, round=round_number, own=own, view=view)
+
+    def _send(self, agent, prompt: str, temperature: Optional[float], seed: int):
+        """Send one turn; failures are returned, not raised."""
+        with capture_calls() as calls:
+            try:
+                response = agent.send(prompt, add_to_history=False, temperature=temperature, seed=seed)
+            except Exception as e:
+                return None, str(e), calls
+        return response, None, calls
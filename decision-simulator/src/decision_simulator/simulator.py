@@ -1,62 +1,233 @@
-from typing import List, Dict, Any
-from fast_agent import Agent
+import random
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple, Union
+from .agent import AgentRuntime, LLMConfig, capture_calls
+from .simulation.engine import parse_decision, call_usage
 
 
 class DecisionSimulator:
-    """Simulates decision outcomes using fast-agent."""
+    """Simulates decision outcomes using the agent runtime."""
 
-    def __init__(self, verbose: bool = False):
+    def __init__(self, verbose: bool = False, runtime: Optional[AgentRuntime] = None, results=None):
+        """
+        Initialize the simulator.
+
+        Args:
+            verbose: Print progress
+            runtime: AgentRuntime to use (defaults to one for gpt-3.5-turbo)
+            results: ResultStore that records every iteration; each simulate call is one run
+        """
         self.verbose = verbose
-        self.agent = Agent(
-            model="gpt-3.5-turbo",
-            system_prompt="You are a decision outcome simulator. Given a scenario, analyze potential decisions and their likely outcomes.",
+        self.results = results
+        if runtime is None:
+            runtime = AgentRuntime.create(LLMConfig(model="gpt-3.5-turbo"))
+        self.runtime = runtime
+        self.agent = runtime.create_agent(
+            name="Decision Simulator",
+            instruction="You are a decision outcome simulator. Given a scenario, analyze potential decisions and their likely outcomes.",
         )
 
-    def simulate(self, scenario: str, iterations: int = 1) -> List[Dict[str, Any]]:
+    def simulate(
+        self,
+        scenario: str,
+        iterations: int = 1,
+        parallel: bool = False,
+        max_in_flight: Optional[int] = None,
+        temperature: Optional[Union[float, Sequence[float]]] = None,
+        seed: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
         """
         Simulate decision outcomes for a given scenario.
 
         Args:
             scenario: The decision scenario to simulate
             iterations: Number of simulation iterations
+            parallel: Run iterations concurrently instead of one at a time
+            max_in_flight: Maximum concurrent iterations in parallel mode
+                (defaults to the runtime's max_concurrency)
+            temperature: Sampling temperature for every iteration, or one per iteration
+            seed: Base seed; iteration i is sent with seed + i
 
         Returns:
-            List of simulation results
+            List of simulation results, in iteration order
         """
-        results = []
+        seed = self._base_seed(seed)
+        if not parallel:
+            run_id = self._start_run("simulate", scenario, iterations, temperature, seed)
+            return [
+                self._run_iteration(scenario, i, temperature, seed, run_id)
+                for i in range(iterations)
+            ]
+
+        results: List[Optional[Dict[str, Any]]] = [None] * iterations
+        for i, result in self.simulate_iter(
+            scenario, iterations, max_in_flight=max_in_flight, temperature=temperature, seed=seed
+        ):
+            results[i] = result
+        return results
 
-        for _ in range(iterations):
-            prompt = f"""
+    def simulate_iter(
+        self,
+        scenario: str,
+        iterations: int = 1,
+        max_in_flight: Optional[int] = None,
+        temperature: Optional[Union[float, Sequence[float]]] = None,
+        seed: Optional[int] = None,
+    ) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Run iterations concurrently and yield results as they complete.
+
+        Args:
+            scenario: The decision scenario to simulate
+            iterations: Number of simulation iterations
+            max_in_flight: Maximum concurrent iterations
+                (defaults to the runtime's max_concurrency)
+            temperature: Sampling temperature for every iteration, or one per iteration
+            seed: Base seed; iteration i is sent with seed + i
+
+        Yields:
+            (iteration index, result) tuples in completion order
+        """
+        seed = self._base_seed(seed)
+        if max_in_flight is None:
+            max_in_flight = self.runtime.max_concurrency
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+
+        run_id = self._start_run("simulate", scenario, iterations, temperature, seed)
+        executor = ThreadPoolExecutor(max_workers=min(max_in_flight, max(iterations, 1)))
+        try:
+            futures = {
+                executor.submit(self._run_iteration, scenario, i, temperature, seed, run_id): i
+                for i in range(iterations)
+            }
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+        finally:
+            # Abandoning the generator early should not leave queued requests running
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def simulate_batch(
+        self,
+        scenario: str,
+        iterations: int = 1,
+        temperature: Optional[Union[float, Sequence[float]]] = None,
+        seed: Optional[int] = None,
+        poll_interval: float = 30.0,
+        timeout: Optional[float] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Run all iterations as one offline batch job.
+
+        Slower to return than simulate, but batch pricing and separate rate
+        limits make it the cheaper choice for large overnight sweeps.
+
+        Args:
+            scenario: The decision scenario to simulate
+            iterations: Number of simulation iterations
+            temperature: Sampling temperature for every iteration, or one per iteration
+            seed: Base seed; iteration i is sent with seed + i
+            poll_interval: Seconds between batch status checks
+            timeout: Give up on the batch after this many seconds
+
+        Returns:
+            List of simulation results, in iteration order
+        """
+        seed = self._base_seed(seed)
+        prompt = self._build_prompt(scenario)
+        with capture_calls() as calls:
+            with self.runtime.batch(poll_interval=poll_interval, timeout=timeout) as batch:
+                pending = [
+                    batch.submit(
+                        self.agent,
+                        prompt,
+                        add_to_history=False,
+                        temperature=self._iteration_temperature(temperature, i),
+                        seed=seed + i,
+                    )
+                    for i in range(iterations)
+                ]
+        results = [self._parse_response(p.result()) for p in pending]
+        run_id = self._start_run("simulate_batch", scenario, iterations, temperature, seed)
+        if run_id is not None:
+            # The batch reports one call event per request, in submission order
+            self.results.append(run_id, [
+                {"scenario": scenario, "iteration": i, **result, **call_usage([call])}
+                for i, (result, call) in enumerate(zip(results, calls))
+            ])
+        return results
+
+    def _iteration_temperature(
+        self, temperature: Optional[Union[float, Sequence[float]]], iteration: int
+    ) -> Optional[float]:
+        """Resolve the temperature for one iteration."""
+        if temperature is not None and not isinstance(temperature, (int, float)):
+            return temperature[iteration]
+        return temperature
+
+    def _base_seed(self, seed: Optional[int]) -> int:
+        """Pick a random base seed when none is given.
+
+        Every iteration is then a distinct request, so a response cache replays a
+        seeded run exactly but never collapses the iterations of an unseeded one.
+        """
+        if seed is None:
+            return random.randrange(2**31)
+        return seed
+
+    def _start_run(
+        self,
+        kind: str,
+        scenario: str,
+        iterations: int,
+        temperature: Optional[Union[float, Sequence[float]]],
+        seed: int,
+    ) -> Optional[str]:
+        """Record a run in the result store, if there is one."""
+        if self.results is None:
+            return None
+        config = {"iterations": iterations, "temperature": temperature, "seed": seed}
+        return self.results.start_run(kind, scenario, config)
+
+    def _run_iteration(
+        self,
+        scenario: str,
+        iteration: int,
+        temperature: Optional[Union[float, Sequence[float]]],
+        seed: int,
+        run_id: Optional[str] = None,
+    ) -> Dict[str, str]:
+        """Run a single independent iteration of the simulation."""
+        with capture_calls() as calls:
+            response = self.agent.send(
+                self._build_prompt(scenario),
+                add_to_history=False,
+                temperature=self._iteration_temperature(temperature, iteration),
+                seed=seed + iteration,
+            )
+        result = self._parse_response(response)
+        if run_id is not None:
+            self.results.append(run_id, [
+                {"scenario": scenario, "iteration": iteration, **result, **call_usage(calls)}
+            ])
+        return result
+
+    def _build_prompt(self, scenario: str) -> str:
+        """Build the simulation prompt for a scenario."""
+        return f"""
             Scenario: {scenario}
-            
+
             Please analyze this scenario and provide:
             1. A recommended decision
             2. The likely outcome of that decision
             3. Brief reasoning for this prediction
-            
+
             Format your response as:
             DECISION: [your decision]
             OUTCOME: [predicted outcome]
             REASONING: [brief explanation]
             """
 
-            response = self.agent.run(prompt)
-            result = self._parse_response(response)
-            results.append(result)
-
-        return results
-
     def _parse_response(self, response: str) -> Dict[str, str]:
         """Parse the agent's response into structured data."""
-        lines = response.strip().split("\n")
-        result = {"decision": "", "outcome": "", "reasoning": ""}
-
-        for line in lines:
-            if line.startswith("DECISION:"):
-                result["decision"] = line.replace("DECISION:", "").strip()
-            elif line.startswith("OUTCOME:"):
-                result["outcome"] = line.replace("OUTCOME:", "").strip()
-            elif line.startswith("REASONING:"):
-                result["reasoning"] = line.replace("REASONING:", "").strip()
-
-        return result
+        return parse_decision(response)
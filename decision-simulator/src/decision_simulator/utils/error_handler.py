@@ -1,79 +1,274 @@
-"""Centralized error handling with detailed logging."""
+"""Centralized error handling with detailed, bounded crash reports."""
 
-import traceback
-import sys
+import json
 import linecache
+import os
+import re
+import reprlib
+import sys
+import threading
+import traceback
+import types
+from dataclasses import fields, is_dataclass
 from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Directory for JSON crash records; unset means reports are printed instead
+DEFAULT_CRASH_DIR = os.getenv("DECISION_SIMULATOR_CRASH_DIR")
+
+REDACTED = "<redacted>"
+
+# Names whose values are never rendered (api_key, auth_token, password, ...);
+# anchored at the end so that counts such as prompt_tokens are still shown
+_SECRET_NAME = re.compile(r"(^|_)(api_?key|secret|password|passwd|token|auth|authorization|credentials?)$",
+                          re.IGNORECASE)
+# Secrets embedded in rendered text, e.g. an API key quoted in an error message
+_SECRET_VALUE = re.compile(r"\b(sk-[A-Za-z0-9_\-]{8,}|Bearer\s+[A-Za-z0-9._\-]{8,})")
+
+
+def is_secret_name(name: Any) -> bool:
+    """Whether a variable, key or field name looks like it holds a secret."""
+    return isinstance(name, str) and _SECRET_NAME.search(name) is not None
+
+
+def redact(text: str) -> str:
+    """Mask API keys and bearer tokens in text."""
+    return _SECRET_VALUE.sub(REDACTED, text)
+
+
+class _BoundedRepr(reprlib.Repr):
+    """reprlib.Repr that never renders more than its limits allow.
+
+    Builtin containers and strings are cut to the limits before they are
+    rendered, dataclasses are rendered field by field under the same limits
+    (with secret fields masked), and any other object is shown by type and id
+    rather than by calling its __repr__, which could be arbitrarily large or
+    slow.
+    """
+
+    def __init__(self, max_string: int, max_items: int, max_depth: int):
+        super().__init__()
+        self.maxstring = max_string
+        self.maxother = max_string
+        self.maxlong = max_string
+        self.maxlevel = max_depth
+        self.maxlist = self.maxtuple = self.maxset = self.maxfrozenset = self.maxdeque = max_items
+        self.maxarray = self.maxdict = max_items
+
+    def repr_dict(self, x, level):
+        if not x:
+            return "{}"
+        if level <= 0:
+            return "{...}"
+        pieces = []
+        for i, (key, value) in enumerate(x.items()):
+            if i == self.maxdict:
+                pieces.append("...")
+                break
+            rendered = repr(REDACTED) if is_secret_name(key) else self.repr1(value, level - 1)
+            pieces.append(f"{self.repr1(key, level - 1)}: {rendered}")
+        return "{" + ", ".join(pieces) + "}"
+
+    def repr_instance(self, x, level):
+        cls = type(x)
+        if is_dataclass(x):
+            if level <= 0:
+                return f"{cls.__name__}(...)"
+            pieces = []
+            for i, f in enumerate(fields(x)):
+                if i == self.maxdict:
+                    pieces.append("...")
+                    break
+                value = getattr(x, f.name, None)
+                rendered = repr(REDACTED) if is_secret_name(f.name) and value else self.repr1(value, level - 1)
+                pieces.append(f"{f.name}={rendered}")
+            return f"{cls.__name__}({', '.join(pieces)})"
+        # None, numbers, types and functions have short reprs of their own
+        if isinstance(x, (bool, float, complex, type(None), type, types.FunctionType, types.MethodType,
+                          types.BuiltinFunctionType, types.ModuleType, BaseException)):
+            return super().repr_instance(x, level)
+        return f"<{cls.__module__}.{cls.__qualname__} object at {id(x):#x}>"
+
+
+class CrashReporter:
+    """Uncaught-exception hook that reports crashes within fixed size limits.
+
+    Every value in a report goes through a bounded reprlib renderer, so the
+    cost of a report does not depend on how large the failing frame's locals
+    are (a long history or a big results list is shown as its first few items),
+    and names or text that look like secrets are masked. With a crash_dir,
+    the report is a JSON record written to a file from a background thread,
+    and the console only gets a one-line pointer to it.
+    """
+
+    def __init__(self, crash_dir: Optional[str] = None, max_string: int = 200, max_items: int = 10,
+                 max_depth: int = 3, max_locals: int = 50, max_frames: int = 50):
+        """Initialize the reporter.
+
+        Args:
+            crash_dir: Directory to write JSON crash records to, instead of printing reports
+            max_string: Longest rendering of any one string or value
+            max_items: Most items shown of any list, dict or other container
+            max_depth: Deepest nesting of containers shown
+            max_locals: Most local variables shown from the failing frame
+            max_frames: Most stack frames kept, the innermost ones
+        """
+        if min(max_string, max_items, max_depth, max_locals, max_frames) < 1:
+            raise ValueError("Crash report limits must be at least 1")
+        self.crash_dir = crash_dir
+        self.max_string = max_string
+        self.max_locals = max_locals
+        self.max_frames = max_frames
+        self._repr = _BoundedRepr(max_string, max_items, max_depth)
+
+    def format_value(self, value: Any) -> str:
+        """Render a value within the reporter's limits, with secrets masked."""
+        try:
+            return redact(self._repr.repr(value))
+        except Exception:
+            return f"<unrenderable {type(value).__name__}>"
+
+    def _text(self, text: str, limit: int) -> str:
+        if len(text) > limit:
+            text = text[:limit] + "..."
+        return redact(text)
+
+    def record(self, exc_type, exc_value, exc_traceback) -> Dict[str, Any]:
+        """Build the structured report of an exception.
+
+        Returns:
+            A JSON-serializable dict with the exception, its location, the
+            failing frame's locals and the stack trace
+        """
+        report: Dict[str, Any] = {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "pid": os.getpid(),
+            "type": exc_type.__name__,
+            "message": self._text(str(exc_value), self.max_string * 5),
+            "location": None,
+            "locals": {},
+        }
+
+        if exc_traceback:
+            tb = exc_traceback
+            # Get to the actual error frame (not our error handler)
+            while tb.tb_next:
+                tb = tb.tb_next
+            frame = tb.tb_frame
+            filename = frame.f_code.co_filename
+            report["location"] = {
+                "file": filename,
+                "line": tb.tb_lineno,
+                "function": frame.f_code.co_name,
+                "code": self._text(linecache.getline(filename, tb.tb_lineno).strip(), self.max_string),
+            }
+            for i, (name, value) in enumerate(frame.f_locals.items()):
+                if i == self.max_locals:
+                    report["locals"]["..."] = f"{len(frame.f_locals) - i} more"
+                    break
+                report["locals"][name] = REDACTED if is_secret_name(name) else self.format_value(value)
+
+        # Only the innermost frames are formatted, so a deep recursion stays cheap
+        trace = traceback.format_exception(exc_type, exc_value, exc_traceback, limit=-self.max_frames)
+        report["traceback"] = [self._text(line, self.max_string * 10) for line in trace]
+        return report
+
+    def print_report(self, report: Dict[str, Any]):
+        """Print a report to the console."""
+        print("\n" + "=" * 80)
+        print("🔴 EXCEPTION INTERCEPTED")
+        print("=" * 80)
+        print(f"Time: {report['time']}")
+        print(f"Exception Type: {report['type']}")
+        print(f"Exception Message: {report['message']}")
+
+        location = report["location"]
+        if location:
+            print(f"\n📍 Error Location:")
+            print(f"  File: {location['file']}")
+            print(f"  Line: {location['line']}")
+            print(f"  Function: {location['function']}")
+            if location["code"]:
+                print(f"  Code: {location['code']}")
+
+            print(f"\n📊 Local Variables at Error:")
+            for name, value in report["locals"].items():
+                print(f"  {name} = {value}")
+
+        print("\n📜 Full Stack Trace:")
+        print("-" * 80)
+        print("".join(report["traceback"]))
+        print("=" * 80)
+
+    def write_report(self, report: Dict[str, Any]) -> threading.Thread:
+        """Write a report to crash_dir as JSON from a background thread.
+
+        The thread is not a daemon, so the interpreter finishes the write
+        before it exits.
+
+        Returns:
+            The writer thread
+        """
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = os.path.join(self.crash_dir, f"crash-{stamp}-{report['pid']}.json")
+
+        def write():
+            os.makedirs(self.crash_dir, exist_ok=True)
+            # Written under a temporary name, so a crash record on disk is always complete
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            os.replace(path + ".tmp", path)
+
+        thread = threading.Thread(target=write, name="crash-report")
+        thread.start()
+        print(f"\n🔴 {report['type']}: {report['message']}")
+        print(f"   Crash report: {path}")
+        return thread
+
+    def __call__(self, exc_type, exc_value, exc_traceback):
+        """Report an uncaught exception, then exit with an error code."""
+        # Skip KeyboardInterrupt to allow Ctrl+C to work normally
+        if issubclass(exc_type, KeyboardInterrupt):
+            sys.__excepthook__(exc_type, exc_value, exc_traceback)
+            return
+
+        report = self.record(exc_type, exc_value, exc_traceback)
+        if self.crash_dir:
+            self.write_report(report)
+        else:
+            self.print_report(report)
+
+        # Still exit with error code
+        sys.exit(1)
 
 
 def custom_exception_handler(exc_type, exc_value, exc_traceback):
-    """Custom exception handler that logs all uncaught exceptions with details.
+    """Custom exception handler that prints a bounded report of uncaught exceptions.
 
     Args:
         exc_type: Exception type
         exc_value: Exception instance
         exc_traceback: Traceback object
     """
-    # Skip KeyboardInterrupt to allow Ctrl+C to work normally
-    if issubclass(exc_type, KeyboardInterrupt):
-        sys.__excepthook__(exc_type, exc_value, exc_traceback)
-        return
-
-    # Get the full traceback
-    tb_lines = traceback.format_exception(exc_type, exc_value, exc_traceback)
-
-    print("\n" + "=" * 80)
-    print("🔴 EXCEPTION INTERCEPTED")
-    print("=" * 80)
-    print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Exception Type: {exc_type.__name__}")
-    print(f"Exception Message: {str(exc_value)}")
-
-    # Extract the exact error location from the last frame
-    if exc_traceback:
-        tb = exc_traceback
-        # Get to the actual error frame (not our error handler)
-        while tb.tb_next:
-            tb = tb.tb_next
-
-        frame = tb.tb_frame
-        filename = frame.f_code.co_filename
-        lineno = tb.tb_lineno
-        function = frame.f_code.co_name
-
-        print(f"\n📍 Error Location:")
-        print(f"  File: {filename}")
-        print(f"  Line: {lineno}")
-        print(f"  Function: {function}")
-
-        # Show the actual line of code
-        try:
-            line = linecache.getline(filename, lineno).strip()
-            if line:
-                print(f"  Code: {line}")
-        except:
-            pass
-
-        # Show local variables in the error frame
-        print(f"\n📊 Local Variables at Error:")
-        for var_name, var_value in frame.f_locals.items():
-            # Skip very large objects
-            var_str = str(var_value)
-            if len(var_str) > 200:
-                var_str = var_str[:200] + "..."
-            print(f"  {var_name} = {var_str}")
-
-    print("\n📜 Full Stack Trace:")
-    print("-" * 80)
-    print("".join(tb_lines))
-    print("=" * 80)
-
-    # Still exit with error code
-    sys.exit(1)
-
-
-def install_error_handler():
-    """Install the custom exception handler for the entire application."""
-    sys.excepthook = custom_exception_handler
+    CrashReporter()(exc_type, exc_value, exc_traceback)
+
+
+def install_error_handler(crash_dir: Optional[str] = DEFAULT_CRASH_DIR, **limits) -> CrashReporter:
+    """Install the crash reporter for the entire application.
+
+    Args:
+        crash_dir: Directory to write JSON crash records to
+            (defaults to $DECISION_SIMULATOR_CRASH_DIR; unset prints reports instead)
+        **limits: Size limits passed to CrashReporter
+
+    Returns:
+        The installed reporter
+    """
+    reporter = CrashReporter(crash_dir, **limits)
+    sys.excepthook = reporter
     print("✅ Enhanced error logging enabled")
-    print("   All exceptions will be logged with detailed context\n")
+    if crash_dir:
+        print(f"   Crash reports will be written to {crash_dir}\n")
+    else:
+        print("   All exceptions will be logged with detailed context\n")
+    return reporter
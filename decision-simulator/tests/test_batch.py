@@ -0,0 +1,45 @@
+"""Batch sessions against the fake backend."""
+
+import pytest
+
+from src.decision_simulator.agent import AgentRuntime, LLMConfig, capture_calls
+
+
+def make_runtime():
+    return AgentRuntime.create(LLMConfig(provider="fake", options={"responder": lambda messages, params: "ok"}))
+
+
+def test_batch_resolves_handles_and_records_history():
+    runtime = make_runtime()
+    agents = [runtime.create_agent(name=f"Agent {i}", instruction="Answer briefly.") for i in range(3)]
+
+    with runtime.batch(poll_interval=0) as batch:
+        pending = [batch.submit(agent, "Hello?") for agent in agents]
+
+    assert [handle.result() for handle in pending] == ["ok"] * 3
+    for agent in agents:
+        assert [message["role"] for message in agent.history] == ["user", "assistant"]
+
+
+def test_failed_batch_job_resolves_every_handle_with_its_error():
+    runtime = make_runtime()
+    agents = [runtime.create_agent(name=f"Agent {i}", instruction="Answer briefly.") for i in range(3)]
+
+    def run_batch(requests, poll_interval, completion_window, timeout):
+        raise TimeoutError("Batch job did not finish in time")
+
+    runtime.provider.backend.run_batch = run_batch
+    batch = runtime.batch(poll_interval=0)
+    pending = [batch.submit(agent, "Hello?") for agent in agents]
+
+    with capture_calls() as calls, pytest.raises(TimeoutError):
+        batch.run()
+
+    assert len(batch) == 0
+    for handle in pending:
+        assert handle.done
+        with pytest.raises(RuntimeError, match="Batch job did not finish in time"):
+            handle.result()
+    assert [call.error for call in calls] == ["Batch job did not finish in time"] * 3
+    # Failed requests record nothing
+    assert all(not agent.history for agent in agents)